@@ -64,6 +64,13 @@ class ActionInfo:
                     f"Modified file '{self.item_name}' in '{self.source_path}'"
                 )
 
+            # Deleted items moved to the trash can be restored from there
+            if (
+                self.action_type in (ActionType.DELETE_FILE, ActionType.DELETE_FOLDER)
+                and self.target_path
+            ):
+                self.description += f" (in trash at '{self.target_path}')"
+
     def to_dict(self) -> dict:
         """Convert the ActionInfo to a dictionary for JSON serialization."""
         return {
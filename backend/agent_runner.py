@@ -1,7 +1,8 @@
 import uuid
-from dataclasses import dataclass
-from typing import Optional, Dict, Any, List
-from langchain_core.messages.ai import AIMessage
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Callable, Literal
+from langchain_core.messages import ToolMessage
+from langchain_core.messages.ai import AIMessage, AIMessageChunk
 from tools import get_directory_tree
 import config
 from graph import graph
@@ -20,13 +21,46 @@ class RunResult:
     actions: List[ActionInfo]
 
 
+@dataclass
+class StreamEvent:
+    """Something happening during a run, reported while the graph is still running."""
+
+    kind: Literal["token", "tool_start", "tool_end", "progress"]
+    text: str = ""
+    tool_name: Optional[str] = None
+    tool_call_id: Optional[str] = None
+    tool_args: Dict[str, Any] = field(default_factory=dict)
+    is_error: bool = False
+
+
+def _get_text(content: Any) -> str:
+    """Return the text of a message content, which may be a list of content blocks."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+            if not isinstance(block, dict) or block.get("type") == "text"
+        )
+    return ""
+
+
 class AgentRunner:
-    def __init__(self, working_directory: str, debug: bool = False):
+    def __init__(
+        self,
+        working_directory: str,
+        debug: bool = False,
+        thread_id: Optional[str] = None,
+        agent: Optional[Any] = None,
+    ):
         """Initialize the AgentRunner with a working directory and debug flag.
 
         Args:
             working_directory (str): The initial working directory
             debug (bool): Whether to print debug information
+            thread_id (Optional[str]): Conversation to resume from its latest checkpoint. If None, starts a new one
+            agent (Optional[Any]): The compiled graph to run, defaults to the application graph
         """
         self.working_directory = working_directory
         self.debug = debug
@@ -34,8 +68,9 @@ class AgentRunner:
         self.file_metadata = {}
         self.analysis_tokens = 0
         self.actions = []
-        self.thread_id = str(uuid.uuid4())
-        self.agent = graph
+        self.thread_id = thread_id or str(uuid.uuid4())
+        self.agent = agent or graph
+        self.resumed = False
 
         self.memory_config = {
             "configurable": {
@@ -44,6 +79,28 @@ class AgentRunner:
             "recursion_limit": config.RECURSION_LIMIT,
         }
 
+        if thread_id:
+            self._restore_state()
+
+    def _restore_state(self) -> None:
+        """Load the state of the conversation from its latest checkpoint.
+
+        Only the latest checkpoint is read; the conversation is not replayed.
+        """
+        snapshot = self.agent.get_state(self.memory_config)
+        values = snapshot.values if snapshot else None
+        if not values:
+            return
+
+        self.working_directory = values.get("working_directory", self.working_directory)
+        self.affected_files = values.get("affected_files", [])
+        self.file_metadata = values.get("file_metadata", {})
+        self.analysis_tokens = values.get("analysis_tokens", 0)
+        self.resumed = True
+        self._print_debug(
+            f"Resumed conversation {self.thread_id} with {len(values.get('messages', []))} messages"
+        )
+
     def _print_debug(self, message: str, color: str = "\033[94m"):
         """Print debug message if debug is enabled.
 
@@ -54,32 +111,103 @@ class AgentRunner:
         if self.debug:
             print(color + message + "\033[0m")
 
-    def run(self, user_input: str) -> RunResult:
+    def _emit_stream_events(
+        self, mode: str, chunk: Any, on_event: Callable[[StreamEvent], None]
+    ) -> None:
+        """Turn a chunk of the "messages", "updates" or "custom" stream into events.
+
+        Args:
+            mode (str): The stream mode the chunk comes from
+            chunk (Any): The streamed chunk
+            on_event (Callable[[StreamEvent], None]): Callback receiving the events
+        """
+        if mode == "messages":
+            message, metadata = chunk
+            # Only the assistant's own tokens, not those of the analysis tools
+            if metadata.get("langgraph_node") == "assistant" and isinstance(
+                message, AIMessageChunk
+            ):
+                text = _get_text(message.content)
+                if text:
+                    on_event(StreamEvent(kind="token", text=text))
+        elif mode == "custom":
+            if isinstance(chunk, dict) and "progress" in chunk:
+                on_event(StreamEvent(kind="progress", text=str(chunk["progress"])))
+        elif mode == "updates":
+            for node, update in chunk.items():
+                messages = (
+                    (update or {}).get("messages") if isinstance(update, dict) else None
+                )
+                if messages is None:
+                    continue
+                if not isinstance(messages, list):
+                    messages = [messages]
+                for message in messages:
+                    if isinstance(message, AIMessage):
+                        # Answers of the plan mode nodes are not streamed token by token
+                        text = _get_text(message.content)
+                        if node != "assistant" and text:
+                            on_event(StreamEvent(kind="token", text=text))
+                        for tool_call in message.tool_calls:
+                            on_event(
+                                StreamEvent(
+                                    kind="tool_start",
+                                    tool_name=tool_call["name"],
+                                    tool_call_id=tool_call["id"],
+                                    tool_args=tool_call["args"],
+                                )
+                            )
+                    elif isinstance(message, ToolMessage):
+                        on_event(
+                            StreamEvent(
+                                kind="tool_end",
+                                text=_get_text(message.content),
+                                tool_name=message.name,
+                                tool_call_id=message.tool_call_id,
+                                is_error=message.status == "error",
+                            )
+                        )
+
+    def run(
+        self,
+        user_input: str,
+        on_event: Optional[Callable[[StreamEvent], None]] = None,
+    ) -> RunResult:
         """Run the model with the given user input.
 
         Args:
             user_input (str): The user's input to process
+            on_event (Optional[Callable[[StreamEvent], None]]): If given, called with the assistant's
+                tokens as they are generated and with the start and end of each tool call
 
         Returns:
             RunResult: A structured result containing the last AI message, state, and token counts
         """
-        events = self.agent.stream(
+        stream_modes = ["values"]
+        if on_event:
+            stream_modes += ["messages", "updates", "custom"]
+
+        chunks = self.agent.stream(
             {
                 "messages": [("user", user_input)],
                 "working_directory": self.working_directory,
-                "affected_files": self.affected_files,
-                "file_metadata": self.file_metadata,
+                # affected_files and file_metadata are restored from the
+                # checkpoint; sending them again would add them twice
                 "analysis_tokens": self.analysis_tokens,
                 "actions": ClearList(),
             },
             self.memory_config,
-            stream_mode="values",
+            stream_mode=stream_modes,
         )
 
         last_event = None
         event_counter = 1
 
-        for event in events:
+        for mode, event in chunks:
+            if mode != "values":
+                self._emit_stream_events(mode, event, on_event)
+                continue
+
             event_str = f"\nEvent {event_counter}:"
 
             # Handle different types of events
@@ -135,10 +263,16 @@ class AgentRunner:
             self.analysis_tokens = last_event["analysis_tokens"]
 
             # Display folder content
-            self._print_debug(
-                get_directory_tree(self.working_directory, self.affected_files),
-                "\033[93m",
-            )
+            if self.debug:
+                self._print_debug(
+                    get_directory_tree(
+                        self.working_directory,
+                        self.affected_files,
+                        recursive=True,
+                        max_depth=config.DIRECTORY_TREE_MAX_DEPTH,
+                    ),
+                    "\033[93m",
+                )
 
             self._print_debug(f"Instruction tokens used: {instruction_tokens}")
             self._print_debug(f"Analysis tokens used: {self.analysis_tokens}")
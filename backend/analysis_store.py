@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+
+from utils import hash_file
+from config import ANALYSIS_STORE_ENABLED, ANALYSIS_STORE_PATH
+
+
+class AnalysisStore:
+    """Durable store of document analysis results.
+
+    Results are keyed by the SHA-256 hash of the document content, the field
+    name and a variant string: the category set version for "category", the
+    question text for "question_answer", and empty for the other fields. An
+    unchanged or identical file is therefore never analyzed twice, across
+    sessions, working directories and file locations.
+    """
+
+    def __init__(self, db_path: str, enabled: bool = True):
+        """Initialize the store.
+
+        Args:
+            db_path (str): Path of the SQLite database file
+            enabled (bool): Whether the store is used at all
+        """
+        self.db_path = db_path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use and create the schema if needed."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS file_hashes (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL
+                )
+                """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    content_hash TEXT NOT NULL,
+                    field TEXT NOT NULL,
+                    variant TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    PRIMARY KEY (content_hash, field, variant)
+                )
+                """)
+            self._conn.commit()
+        return self._conn
+
+    def get_content_hash(self, full_path: str) -> Optional[str]:
+        """Return the content hash of a file, hashing it only when it changed.
+
+        Args:
+            full_path (str): Path to the file
+
+        Returns:
+            Optional[str]: Hex digest of the file content, or None if the store is disabled
+        """
+        if not self.enabled:
+            return None
+
+        abs_path = os.path.abspath(full_path)
+        stat = os.stat(abs_path)
+
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT content_hash FROM file_hashes "
+                    "WHERE path = ? AND size = ? AND mtime_ns = ?",
+                    (abs_path, stat.st_size, stat.st_mtime_ns),
+                )
+                .fetchone()
+            )
+        if row:
+            return row[0]
+
+        content_hash = hash_file(abs_path)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, content_hash) "
+                "VALUES (?, ?, ?, ?)",
+                (abs_path, stat.st_size, stat.st_mtime_ns, content_hash),
+            )
+            conn.commit()
+        return content_hash
+
+    def get_results(
+        self, content_hash: Optional[str], variants: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """Look up stored results for the requested fields.
+
+        Args:
+            content_hash (Optional[str]): Hash of the document content
+            variants (Dict[str, str]): Requested field names mapped to their variant
+
+        Returns:
+            Dict[str, Any]: The fields that were found, mapped to their values
+        """
+        if not self.enabled or not content_hash or not variants:
+            return {}
+
+        results = {}
+        with self._lock:
+            conn = self._connect()
+            for field, variant in variants.items():
+                row = conn.execute(
+                    "SELECT value FROM results "
+                    "WHERE content_hash = ? AND field = ? AND variant = ?",
+                    (content_hash, field, variant),
+                ).fetchone()
+                if row:
+                    results[field] = json.loads(row[0])
+        return results
+
+    def save_results(
+        self,
+        content_hash: Optional[str],
+        results: Dict[str, Any],
+        variants: Dict[str, str],
+    ) -> None:
+        """Store analysis results for a document.
+
+        Args:
+            content_hash (Optional[str]): Hash of the document content
+            results (Dict[str, Any]): Field names mapped to their values
+            variants (Dict[str, str]): Field names mapped to their variant
+        """
+        if not self.enabled or not content_hash:
+            return
+
+        created = time.time()
+        rows = [
+            (content_hash, field, variants[field], json.dumps(value), created)
+            for field, value in results.items()
+            if field in variants
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO results "
+                "(content_hash, field, variant, value, created) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+
+
+analysis_store = AnalysisStore(ANALYSIS_STORE_PATH, enabled=ANALYSIS_STORE_ENABLED)
@@ -0,0 +1,70 @@
+import threading
+from typing import Dict, Optional
+
+import boto3
+from botocore.config import Config
+
+from config import (
+    AWS_DEFAULT_REGION,
+    BEDROCK_ENDPOINT_URL,
+    BEDROCK_MAX_POOL_CONNECTIONS,
+    BEDROCK_TCP_KEEPALIVE,
+    BEDROCK_CONNECT_TIMEOUT,
+    BEDROCK_READ_TIMEOUT,
+    BEDROCK_MAX_RETRY_ATTEMPTS,
+)
+
+_clients: Dict[str, object] = {}
+_clients_lock = threading.Lock()
+
+
+def create_bedrock_client(
+    region: str = AWS_DEFAULT_REGION, endpoint_url: Optional[str] = BEDROCK_ENDPOINT_URL
+):
+    """Create a new bedrock-runtime client with a tuned connection pool.
+
+    Args:
+        region (str): AWS region of the Bedrock endpoint
+        endpoint_url (Optional[str]): Custom endpoint URL, e.g. a local stub
+
+    Returns:
+        A boto3 bedrock-runtime client
+    """
+    client_config = Config(
+        max_pool_connections=BEDROCK_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=BEDROCK_TCP_KEEPALIVE,
+        connect_timeout=BEDROCK_CONNECT_TIMEOUT,
+        read_timeout=BEDROCK_READ_TIMEOUT,
+        retries={"max_attempts": BEDROCK_MAX_RETRY_ATTEMPTS, "mode": "adaptive"},
+    )
+    # A dedicated session keeps client creation safe when called from worker threads
+    session = boto3.session.Session()
+    return session.client(
+        "bedrock-runtime",
+        region_name=region,
+        endpoint_url=endpoint_url,
+        config=client_config,
+    )
+
+
+def get_bedrock_client(region: str = AWS_DEFAULT_REGION):
+    """Return the process-wide bedrock-runtime client for a region.
+
+    The client is created on first use and shared afterwards, so credential
+    resolution, endpoint setup and TLS connections are reused across calls.
+    boto3 clients are thread-safe, so the same client can serve concurrent tools.
+
+    Args:
+        region (str): AWS region of the Bedrock endpoint
+
+    Returns:
+        A boto3 bedrock-runtime client
+    """
+    client = _clients.get(region)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(region)
+            if client is None:
+                client = create_bedrock_client(region)
+                _clients[region] = client
+    return client
@@ -0,0 +1,81 @@
+"""Measure the per-document client overhead of TextAnalyzer against a local stub.
+
+A local HTTP server stands in for the bedrock-runtime endpoint, so the numbers
+show the cost of client creation and connection setup rather than model latency.
+
+Usage:
+    python benchmarks/bench_bedrock_client.py [documents]
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Dummy credentials, the stub does not check signatures
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+
+from bedrock_client import create_bedrock_client
+from text_analysis import TextAnalyzer
+
+STUB_RESPONSE = json.dumps(
+    {
+        "content": [{"type": "text", "text": "<category>N/A</category>"}],
+        "usage": {"input_tokens": 100, "output_tokens": 5},
+    }
+).encode("utf-8")
+
+
+class StubBedrockHandler(BaseHTTPRequestHandler):
+    """Answer every InvokeModel request with a fixed response."""
+
+    protocol_version = "HTTP/1.1"  # Allow keep-alive connections
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(STUB_RESPONSE)))
+        self.end_headers()
+        self.wfile.write(STUB_RESPONSE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run(documents: int, endpoint_url: str):
+    prompt = "Categorize this document."
+
+    start = time.perf_counter()
+    for _ in range(documents):
+        # Previous behavior: a new analyzer and client for every document
+        analyzer = TextAnalyzer(client=create_bedrock_client(endpoint_url=endpoint_url))
+        analyzer.invoke_model(prompt)
+    per_call_ms = (time.perf_counter() - start) * 1000 / documents
+
+    shared = TextAnalyzer(client=create_bedrock_client(endpoint_url=endpoint_url))
+    shared.invoke_model(prompt)  # Warm up the connection pool
+    start = time.perf_counter()
+    for _ in range(documents):
+        shared.invoke_model(prompt)
+    shared_ms = (time.perf_counter() - start) * 1000 / documents
+
+    print(f"new client per document: {per_call_ms:8.2f} ms/document")
+    print(f"shared pooled client:    {shared_ms:8.2f} ms/document")
+    print(f"overhead saved:          {per_call_ms - shared_ms:8.2f} ms/document")
+
+
+if __name__ == "__main__":
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubBedrockHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        run(documents, f"http://127.0.0.1:{server.server_address[1]}")
+    finally:
+        server.shutdown()
@@ -0,0 +1,109 @@
+"""Compare full and delta-encoded checkpoints of the large state channels.
+
+A conversation state is filled with affected files and file metadata, then a
+series of graph steps each adds a few files and their metadata. With delta
+channels, a checkpoint stores the changes of its step instead of a copy of
+both collections, and a full copy every snapshot_interval checkpoints.
+
+Usage:
+    python benchmarks/bench_checkpoints.py [entries] [steps] [batch]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langgraph.graph import StateGraph, START, END
+
+from config import CHECKPOINT_DELTA_CHANNELS
+from sqlite_checkpointer import SqliteCheckpointSaver
+from state import State
+
+
+def make_names(first: int, count: int):
+    return [f"folder{idx // 100}/file{idx}.pdf" for idx in range(first, first + count)]
+
+
+def make_graph(saver, batch: int):
+    def organize(state):
+        names = make_names(len(state["affected_files"]), batch)
+        return {
+            "affected_files": names,
+            "file_metadata": {
+                name: {"category": "Leases", "summary": "Lease of the premises"}
+                for name in names
+            },
+        }
+
+    builder = StateGraph(State)
+    builder.add_node("organize", organize)
+    builder.add_edge(START, "organize")
+    builder.add_edge("organize", END)
+    return builder.compile(checkpointer=saver)
+
+
+def simulate(saver, entries: int, steps: int, batch: int):
+    graph = make_graph(saver, batch)
+    config = {"configurable": {"thread_id": "bench"}}
+    names = make_names(0, entries)
+    graph.invoke(
+        {
+            "messages": [],
+            "analysis_tokens": 0,
+            "affected_files": names,
+            "file_metadata": {
+                name: {"category": "Leases", "summary": "Lease of the premises"}
+                for name in names
+            },
+        },
+        config,
+    )
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        graph.invoke({"analysis_tokens": 0}, config)
+    step_s = (time.perf_counter() - start) / steps
+    size = sum(
+        os.path.getsize(path)
+        for path in (saver.db_path, saver.db_path + "-wal")
+        if os.path.exists(path)
+    )
+
+    start = time.perf_counter()
+    state = make_graph(SqliteCheckpointSaver(saver.db_path), batch).get_state(config)
+    load_s = time.perf_counter() - start
+    assert len(state.values["file_metadata"]) == entries + (steps + 1) * batch
+    return step_s, load_s, size
+
+
+def run(sizes, steps: int, batch: int):
+    print(f"{steps} steps of {batch} entries, 2 checkpoints per step")
+    work = tempfile.mkdtemp()
+    try:
+        for entries in sizes:
+            for label, delta_channels in (
+                ("full", ()),
+                ("delta", CHECKPOINT_DELTA_CHANNELS),
+            ):
+                db_path = os.path.join(work, f"{label}{entries}.db")
+                saver = SqliteCheckpointSaver(db_path, delta_channels=delta_channels)
+                step_s, load_s, size = simulate(saver, entries, steps, batch)
+                print(
+                    f"{entries:>7} entries  {label:<5}  step: {step_s * 1e3:7.1f} ms  "
+                    f"resume: {load_s * 1e3:7.1f} ms  database: {size / 1e6:6.1f} MB"
+                )
+    finally:
+        shutil.rmtree(work)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(
+        [int(args[0])] if len(args) > 0 else [10000, 100000],
+        int(args[1]) if len(args) > 1 else 50,
+        int(args[2]) if len(args) > 2 else 5,
+    )
@@ -0,0 +1,97 @@
+"""Compare the piece table .doc extractor with the legacy regex scan.
+
+Usage:
+    python benchmarks/bench_doc_extractor.py [folder_with_doc_files]
+
+Without a folder, synthetic WordDocument streams are generated in memory and
+both approaches are timed on the stream bytes directly.
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import truncate_chunks
+from doc_extractor import extract_doc_text, iter_word_stream_text
+from content_extractor import extract_text_from_doc_regex, scan_doc_text
+
+BUDGET_WORDS = 2000
+BUDGET_CHARS = 8000
+
+
+def time_call(func, repeat: int = 5) -> float:
+    """Return the best wall time of several calls, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench_synthetic():
+    from tests.word_streams import build_word_streams
+
+    paragraph = (
+        "This Agreement is made and entered into as of 4 March 2021 by and between "
+        "Acme Holdings Ltd. and Société Générale, with respect to the shares. \r"
+    )
+    for paragraphs in (100, 2000, 20000):
+        pieces = [(paragraph * (paragraphs // 2), True)]
+        pieces.append((paragraph * (paragraphs // 2), False))
+        word_stream, table_stream = build_word_streams(pieces)
+        data = word_stream.getvalue()
+
+        def piece_table():
+            word_stream.seek(0)
+            table_stream.seek(0)
+            truncate_chunks(
+                iter_word_stream_text(word_stream, table_stream),
+                BUDGET_WORDS,
+                BUDGET_CHARS,
+            )
+
+        legacy_ms = time_call(lambda: scan_doc_text(data))
+        piece_ms = time_call(piece_table)
+        full_ms = time_call(
+            lambda: (
+                word_stream.seek(0),
+                table_stream.seek(0),
+                "".join(iter_word_stream_text(word_stream, table_stream)),
+            )
+        )
+        print(
+            f"{len(data) / 1024:10.0f} KiB  regex {legacy_ms:8.2f} ms  "
+            f"piece table (budget) {piece_ms:8.2f} ms  "
+            f"piece table (full) {full_ms:8.2f} ms"
+        )
+
+
+def bench_folder(folder: str):
+    files = [
+        os.path.join(root, name)
+        for root, _, names in os.walk(folder)
+        for name in names
+        if name.lower().endswith((".doc", ".dot"))
+    ]
+    legacy_total = piece_total = 0.0
+    legacy_chars = piece_chars = 0
+    for file_path in files:
+        legacy_total += time_call(lambda: extract_text_from_doc_regex(file_path), 1)
+        piece_total += time_call(
+            lambda: extract_doc_text(file_path, BUDGET_WORDS, BUDGET_CHARS), 1
+        )
+        legacy_chars += len(extract_text_from_doc_regex(file_path))
+        piece_chars += len(extract_doc_text(file_path, BUDGET_WORDS, BUDGET_CHARS))
+
+    print(f"{len(files)} files")
+    print(f"regex:       {legacy_total:10.1f} ms, {legacy_chars} chars")
+    print(f"piece table: {piece_total:10.1f} ms, {piece_chars} chars")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        bench_folder(sys.argv[1])
+    else:
+        bench_synthetic()
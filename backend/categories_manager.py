@@ -1,4 +1,5 @@
 import json
+import hashlib
 from typing import Dict, List, Optional
 import os
 
@@ -7,6 +8,7 @@ class CategoriesManager:
     def __init__(self, categories_file: str = "categories.json"):
         self.categories_file = categories_file
         self.categories: Dict[str, List[str]] = {}
+        self._version: Optional[str] = None
         print(f"Initializing CategoriesManager with file: {self.categories_file}")
         self._load_categories()
 
@@ -30,9 +32,11 @@ class CategoriesManager:
         else:
             print(f"Categories file not found at: {self.categories_file}")
             self.categories = {}
+        self._version = None
 
     def _save_categories(self) -> None:
         """Save categories to JSON file."""
+        self._version = None
         with open(self.categories_file, "w") as f:
             json.dump(self.categories, f, indent=2)
 
@@ -82,3 +86,14 @@ class CategoriesManager:
     def get_category(self, name: str) -> Optional[List[str]]:
         """Get values for a specific category."""
         return self.categories.get(name)
+
+    def get_version(self) -> str:
+        """Get a short hash identifying the current set of categories.
+
+        Results that depend on the categories (such as a document's category)
+        remain valid only as long as the version is unchanged.
+        """
+        if self._version is None:
+            serialized = json.dumps(self.categories, sort_keys=True)
+            self._version = hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:16]
+        return self._version
@@ -3,6 +3,8 @@ import os
 # Run Configuration
 DEBUG_LLM = False
 DEBUG_GRAPH = True
+# Print the assistant's response and tool calls in the REPL as they happen
+STREAM_OUTPUT = True
 
 # AWS Bedrock Configuration
 AWS_DEFAULT_REGION = "us-east-1"
@@ -11,6 +13,14 @@ BEDROCK_TEXT_MODEL_ID = (
     "us.anthropic.claude-3-5-haiku-20241022-v1:0"  # "amazon.titan-text-lite-v1"
 )
 
+# Bedrock client connection settings, shared by the agent and document analysis
+BEDROCK_ENDPOINT_URL = None  # Override to point at a local stub
+BEDROCK_MAX_POOL_CONNECTIONS = 32
+BEDROCK_TCP_KEEPALIVE = True
+BEDROCK_CONNECT_TIMEOUT = 10
+BEDROCK_READ_TIMEOUT = 120
+BEDROCK_MAX_RETRY_ATTEMPTS = 4
+
 
 # Model Configuration
 MODEL_KWARGS = {
@@ -25,16 +35,157 @@ WORKING_DIRECTORY = os.path.join(
     os.path.expanduser("~"), "folder_bot_workspace"
 ).replace("/", "\\")
 
+# Local data directory for caches and indexes
+APP_DATA_DIRECTORY = os.path.join(os.path.expanduser("~"), ".file_flow_ai")
+
+# Extraction cache configuration
+EXTRACTION_CACHE_ENABLED = True
+EXTRACTION_CACHE_PATH = os.path.join(APP_DATA_DIRECTORY, "extraction_cache.db")
+EXTRACTION_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Whether to include a hash of the file content in the cache key (slower, but
+# robust against tools that preserve size and mtime)
+EXTRACTION_CACHE_HASH_CONTENT = False
+
+# Stream document analysis responses and stop once all requested fields arrived
+ANALYSIS_STREAMING = True
+
+# Durable store of analysis results, keyed by document content hash
+ANALYSIS_STORE_ENABLED = True
+ANALYSIS_STORE_PATH = os.path.join(APP_DATA_DIRECTORY, "analysis_store.db")
+
+# Number of documents analyzed concurrently by the bulk analysis tool
+ANALYSIS_MAX_WORKERS = 8
+# Maximum number of documents analyzed by a single bulk analysis call
+BULK_ANALYSIS_MAX_FILES = 1000
+
+# Small documents analyzed in bulk are packed into shared model requests
+PACKED_PROMPT_TOKEN_BUDGET = 12000  # Estimated tokens of packed document content
+PACKED_DOCUMENT_MAX_TOKENS = 1500  # Larger documents get a request of their own
+PACKED_MAX_DOCUMENTS = 10
+
+# Summaries and questions on long documents are answered by analyzing chunks in
+# parallel and merging the partial results, instead of reading only the start
+LONG_DOCUMENT_MAP_REDUCE = True
+LONG_DOCUMENT_TOKEN_BUDGET = 50000  # Estimated tokens of document content analyzed
+LONG_DOCUMENT_CHUNK_TOKENS = 2000  # Estimated tokens of content per chunk
+LONG_DOCUMENT_CHUNK_OVERLAP_TOKENS = 100
+LONG_DOCUMENT_MAX_WORKERS = 8  # Concurrent chunk requests per document
+
+# Documents whose file name or text clearly contains the values of a category
+# are categorized locally; the model is only asked when the confidence of the
+# keyword match is below KEYWORD_CLASSIFIER_MIN_CONFIDENCE
+KEYWORD_CLASSIFIER_ENABLED = True
+KEYWORD_CLASSIFIER_MIN_CONFIDENCE = 0.8
+KEYWORD_CLASSIFIER_NAME_WEIGHT = 3  # A value in the file name counts this many times
+KEYWORD_CLASSIFIER_STRONG_SCORE = 4  # Score giving full confidence to a lone match
+
+# Fill document titles from the document properties and dates from the file
+# name or an early "dated as of" line, instead of asking the model
+LOCAL_METADATA_EXTRACTION = True
+LOCAL_DATE_SEARCH_CHARS = (
+    3000  # Characters at the start of the text searched for a date
+)
+
+# Persistent index of directory listings used by the listing tools
+DIRECTORY_INDEX_ENABLED = True
+DIRECTORY_INDEX_PATH = os.path.join(APP_DATA_DIRECTORY, "directory_index.db")
+# Follow filesystem events with the optional watchdog package. Disable for
+# network shares that are changed from other machines, whose events are not seen
+DIRECTORY_INDEX_WATCH = True
+# Seconds a listing is reused without checking the directory mtime
+DIRECTORY_INDEX_VERIFY_INTERVAL = 2.0
+
+# Maximum number of items returned by one list_items call
+LIST_ITEMS_PAGE_SIZE = 200
+
+# Directory tree displayed after each run: subfolders with affected files are
+# expanded up to this depth, and at most this many entries are shown per folder
+DIRECTORY_TREE_MAX_DEPTH = 4
+DIRECTORY_TREE_MAX_ENTRIES = 100
+
+# Maximum number of operations in one batch_operations call
+BATCH_OPERATIONS_MAX = 1000
+# Number of independent operations of a batch executed concurrently
+BATCH_OPERATIONS_MAX_WORKERS = 8
+
+# Number of tool calls of one assistant message executed concurrently. Calls
+# reading or writing overlapping paths run one after the other, in order
+TOOL_SCHEDULER_MAX_WORKERS = 8
+
+# Copy files with reflinks or copy_file_range where supported, and copy the
+# files of a folder concurrently; disable to use shutil.copy2/copytree
+COPY_ENGINE_ENABLED = True
+COPY_ENGINE_MAX_WORKERS = 16
+COPY_PROGRESS_INTERVAL = 0.5  # Seconds between two progress reports of a folder copy
+
+# "trash" moves deleted items into a trash folder at the workspace root,
+# from which a background reaper removes them after the retention time;
+# "immediate" removes them inline
+DELETE_MODE = "trash"
+TRASH_DIRECTORY_NAME = ".file_flow_trash"
+TRASH_RETENTION_SECONDS = 15 * 60
+TRASH_REAPER_INTERVAL = 30  # Seconds between two runs of the reaper
+TRASH_REAPER_MAX_WORKERS = 8  # Files removed concurrently
+
+# Local full-text index of document contents used by the search tool
+SEARCH_INDEX_ENABLED = True
+SEARCH_INDEX_PATH = os.path.join(APP_DATA_DIRECTORY, "search_index.db")
+SEARCH_INDEX_EXTENSIONS = {
+    ".txt",
+    ".md",
+    ".doc",
+    ".docx",
+    ".pdf",
+    ".pptx",
+    ".rtf",
+    ".csv",
+    ".html",
+    ".htm",
+    ".xml",
+    ".json",
+    ".eml",
+}
+SEARCH_INDEX_MAX_CHARS = 200000  # Characters of each document indexed
+SEARCH_INDEX_MAX_WORKERS = 8  # Documents extracted concurrently
+# Seconds after a refresh during which a folder is searched without rescanning
+SEARCH_INDEX_REFRESH_INTERVAL = 10
+# Seconds a search waits for a running refresh before answering from the
+# documents indexed so far
+SEARCH_INDEX_WAIT_SECONDS = 5
+
+# Conversation checkpoints: "sqlite" keeps them on disk so sessions can be
+# resumed after a restart, "memory" keeps them in the process
+CHECKPOINT_BACKEND = "sqlite"
+CHECKPOINT_DB_PATH = os.path.join(APP_DATA_DIRECTORY, "checkpoints.db")
+CHECKPOINT_KEEP_LAST = 10  # Checkpoints kept per conversation
+CHECKPOINT_THREAD_TTL_SECONDS = 30 * 24 * 3600  # Idle conversations are removed
+CHECKPOINT_COMPRESS_MIN_BYTES = 1024  # Larger serialized values are compressed
+# State channels stored as changes against the previous checkpoint
+CHECKPOINT_DELTA_CHANNELS = ("affected_files", "file_metadata")
+CHECKPOINT_SNAPSHOT_INTERVAL = 20  # Deltas between two full copies of a delta channel
+
 # Allow changing to directories anywhere on the system
 ALLOW_EXTERNAL_DIRECTORIES = True
 
 # Recursion limit for the graph
 RECURSION_LIMIT = 500
 
+# "react" calls the model after every tool step; "plan" has the model plan all
+# the tool calls of a request at once, runs the plan without calling the model
+# and only plans again when a step fails or its result is needed to decide
+AGENT_MODE = "react"
+PLAN_MAX_ROUNDS = 10  # Plans made for one request before giving up
+
 # Agent Configuration
 AGENT_VERBOSE = True
 # Whether to filter out affected_files and actions from prompt messages
 FILTER_PROMPT_MESSAGES = True
+# Estimated tokens of conversation history sent to the model per step. Older
+# turns beyond the budget are replaced by a summary; tool results of past turns
+# are shortened to CONTEXT_OLD_TOOL_RESULT_TOKENS
+CONTEXT_TOKEN_BUDGET = 30000
+CONTEXT_OLD_TOOL_RESULT_TOKENS = 300
+CONTEXT_SUMMARY_MAX_TOKENS = 2000
 
 SYSTEM_MESSAGE = """
 You are a helpful assistant that can help with tasks in a file system.
@@ -1,12 +1,43 @@
 import os
 import re
+import struct
 import olefile
 from markitdown import MarkItDown
-from utils import truncate_text
+from typing import Optional
+from utils import truncate_text, read_truncated_text, MAX_WORDS, MAX_CHARS
+from extraction_cache import extraction_cache
+from doc_extractor import extract_doc_text, DocFormatError
 
 
-def extract_text_from_doc(file_path: str) -> str:
-    """Extract text content from .doc and .dot files.
+def scan_doc_text(data: bytes) -> str:
+    """Extract the runs of ASCII text from the bytes of a WordDocument stream.
+
+    Args:
+        data (bytes): Content of the WordDocument stream
+
+    Returns:
+        str: Extracted text content
+    """
+    text = re.findall(b"[\x20-\x7e\r\n]{4,}", data)
+
+    # Decode and join the extracted text
+    decoded_text = [t.decode("ascii", errors="ignore") for t in text]
+    result = "\n".join(
+        line
+        for i, line in enumerate(decoded_text)
+        if i == 0 or line.strip() != decoded_text[i - 1].strip()
+    )
+
+    result = re.sub(r"\s{2,}", " ", result)
+    result = re.sub(r"\n{3,}", "\n\n", result)
+    return result.strip()
+
+
+def extract_text_from_doc_regex(file_path: str) -> str:
+    """Extract text content from .doc and .dot files by scanning for ASCII runs.
+
+    Used as a fallback for files whose piece table cannot be read, such as
+    documents saved by Word 95 and earlier.
 
     Args:
         file_path (str): Path to the document file
@@ -26,62 +57,127 @@ def extract_text_from_doc(file_path: str) -> str:
     # Read the WordDocument stream
     word_stream = ole.openstream("WordDocument")
     data = word_stream.read()
+    ole.close()
+    return scan_doc_text(data)
 
-    text = re.findall(b"[\x20-\x7e\r\n]{4,}", data)
 
-    # Decode and join the extracted text
-    decoded_text = [t.decode("ascii", errors="ignore") for t in text]
-    result = "\n".join(
-        line
-        for i, line in enumerate(decoded_text)
-        if i == 0 or line.strip() != decoded_text[i - 1].strip()
-    )
+def extract_text_from_doc(
+    file_path: str,
+    max_words: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> str:
+    """Extract text content from .doc and .dot files.
 
-    result = re.sub(r"\s{2,}", " ", result)
-    result = re.sub(r"\n{3,}", "\n\n", result)
-    ole.close()
-    return result.strip()
+    Args:
+        file_path (str): Path to the document file
+        max_words (Optional[int]): Maximum number of words to return
+        max_chars (Optional[int]): Maximum number of characters to return
+
+    Returns:
+        str: Extracted text content
+    """
+    try:
+        return extract_doc_text(file_path, max_words, max_chars)
+    except (DocFormatError, struct.error) as e:
+        print(f"Falling back to regex extraction for '{file_path}': {str(e)}")
+        return truncate_text(
+            extract_text_from_doc_regex(file_path), max_words, max_chars
+        )
+
+
+def _convert_with_markitdown(file_path: str) -> str:
+    """Convert a markitdown supported file to text.
+
+    Args:
+        file_path (str): Full path to the file
 
+    Returns:
+        str: Full extracted text content
+    """
+    md = MarkItDown()
+    result = md.convert(file_path)
+    return result.text_content
+
+
+def _read_plaintext(file_path: str) -> str:
+    """Read the full content of a UTF-8 text file.
+
+    Args:
+        file_path (str): Full path to the file
+
+    Returns:
+        str: File content
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        return f.read()
 
-def extract_text_from_markdown(file_path: str, path: str) -> str:
+
+def extract_text_from_markdown(
+    file_path: str,
+    path: str,
+    max_words: Optional[int] = MAX_WORDS,
+    max_chars: Optional[int] = MAX_CHARS,
+) -> str:
     """Extract text content from markdown supported files.
 
     Args:
         file_path (str): Full path to the file
         path (str): Original path relative to working directory
+        max_words (Optional[int]): Maximum number of words to return
+        max_chars (Optional[int]): Maximum number of characters to return
 
     Returns:
         str: Extracted text content
     """
-    md = MarkItDown()
-    result = md.convert(file_path)
-    return f"Content of '{path}':\n{truncate_text(result.text_content)}"
+    text = extraction_cache.get_or_extract(file_path, _convert_with_markitdown)
+    return f"Content of '{path}':\n{truncate_text(text, max_words, max_chars)}"
 
 
-def extract_text_from_plaintext(file_path: str, path: str) -> str:
+def extract_text_from_plaintext(
+    file_path: str,
+    path: str,
+    max_words: Optional[int] = MAX_WORDS,
+    max_chars: Optional[int] = MAX_CHARS,
+) -> str:
     """Extract text content from plain text files.
 
+    When both limits are set, the file is streamed in chunks and reading stops
+    as soon as the budget is met, so memory use does not depend on file size.
+
     Args:
         file_path (str): Full path to the file
         path (str): Original path relative to working directory
+        max_words (Optional[int]): Maximum number of words to return
+        max_chars (Optional[int]): Maximum number of characters to return
 
     Returns:
         str: Extracted text content or error message
     """
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-            return f"Content of '{path}':\n{content}"
+        if max_words and max_chars:
+            # A bounded read is cheaper than the cache, so it bypasses it
+            with open(file_path, "r", encoding="utf-8") as f:
+                content = read_truncated_text(f, max_words, max_chars)
+        else:
+            content = extraction_cache.get_or_extract(file_path, _read_plaintext)
+        return f"Content of '{path}':\n{content}"
     except Exception as e:
         return f"Error reading file '{path}': {str(e)}"
 
 
-def get_content(working_directory: str, path: str) -> str:
+def get_content(
+    working_directory: str,
+    path: str,
+    max_words: Optional[int] = MAX_WORDS,
+    max_chars: Optional[int] = MAX_CHARS,
+) -> str:
     """Read and return the content of a file.
 
     Args:
         working_directory (str): Base directory where operations are performed
         path (str): Path to the file, relative to working_directory
+        max_words (Optional[int]): Maximum number of words to return
+        max_chars (Optional[int]): Maximum number of characters to return
 
     Returns:
         str: File content or error message
@@ -106,8 +202,12 @@ def get_content(working_directory: str, path: str) -> str:
 
     file_ext = os.path.splitext(full_path)[1].lower()
     if file_ext in word_supported_extensions:
-        return extract_text_from_doc(full_path)
+        return extraction_cache.get_or_extract(
+            full_path,
+            lambda file_path: extract_text_from_doc(file_path, max_words, max_chars),
+            variant=f"words={max_words},chars={max_chars}",
+        )
     if file_ext in markitdown_supported_extensions:
-        return extract_text_from_markdown(full_path, path)
+        return extract_text_from_markdown(full_path, path, max_words, max_chars)
     else:
-        return extract_text_from_plaintext(full_path, path)
+        return extract_text_from_plaintext(full_path, path, max_words, max_chars)
@@ -0,0 +1,288 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.graph.message import AnyMessage
+
+from config import (
+    CONTEXT_TOKEN_BUDGET,
+    CONTEXT_OLD_TOOL_RESULT_TOKENS,
+    CONTEXT_SUMMARY_MAX_TOKENS,
+)
+from message_utils import filter_message
+
+# Rough number of characters per token, used to estimate prompt sizes
+CHARS_PER_TOKEN = 4
+# Tokens added per message for roles and formatting
+MESSAGE_OVERHEAD_TOKENS = 4
+# Maximum number of entries kept in each cache
+MAX_CACHED_MESSAGES = 50000
+
+SUMMARY_HEADER = "[Summary of the earlier conversation]"
+SUMMARY_FOOTER = "[End of summary]"
+
+
+def _get_text(content: Any) -> str:
+    """Return the text of a message content, which may be a list of content blocks."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+        ).strip()
+    return str(content)
+
+
+def _shorten(text: str, max_chars: int) -> str:
+    """Cut a text to a number of characters, marking it as shortened."""
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rstrip() + " ... [shortened]"
+
+
+def count_tokens(msg: AnyMessage) -> int:
+    """Estimate the tokens taken by a message in the prompt."""
+    chars = len(_get_text(msg.content))
+    tool_calls = getattr(msg, "tool_calls", None)
+    if tool_calls:
+        chars += len(json.dumps(tool_calls, default=str))
+    return chars // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+
+
+def _replace_content(msg: AnyMessage, content: Any) -> AnyMessage:
+    """Return a copy of a message with another content."""
+    return msg.__class__(
+        content=content, **{k: v for k, v in msg.__dict__.items() if k != "content"}
+    )
+
+
+class ConversationContext:
+    """Builds the bounded message history sent to the model at each step.
+
+    Filtered and shortened messages are memoized by message id, so a step only
+    processes the messages added since the previous one. The current turn is
+    sent in full unless it alone exceeds the token budget, in which case its
+    older tool results are shortened too; earlier turns are sent newest first
+    while they fit the token budget, with their tool results shortened. The
+    turns that do not fit are replaced by a summary, built from cached per-turn
+    digests without a model call and prepended to the first human message sent.
+    Cuts only happen at human messages, so tool calls always stay paired with
+    their results.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = CONTEXT_TOKEN_BUDGET,
+        old_tool_result_tokens: int = CONTEXT_OLD_TOOL_RESULT_TOKENS,
+        summary_max_tokens: int = CONTEXT_SUMMARY_MAX_TOKENS,
+    ):
+        """Initialize the context builder.
+
+        Args:
+            token_budget (int): Estimated tokens of history sent to the model
+            old_tool_result_tokens (int): Estimated tokens kept of each tool result of past turns
+            summary_max_tokens (int): Estimated tokens of the summary of the omitted turns
+        """
+        self.token_budget = token_budget
+        self.old_tool_result_tokens = old_tool_result_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self._lock = threading.Lock()
+        self._prepared: OrderedDict = OrderedDict()
+        self._digests: OrderedDict = OrderedDict()
+        self._summaries: OrderedDict = OrderedDict()
+
+    def _memoize(
+        self, cache: OrderedDict, key: Optional[Any], build: Callable[[], Any]
+    ) -> Any:
+        """Return a cached value, building and caching it on a miss."""
+        if key is None:
+            return build()
+        with self._lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+        value = build()
+        with self._lock:
+            cache[key] = value
+            if len(cache) > MAX_CACHED_MESSAGES:
+                cache.popitem(last=False)
+        return value
+
+    def _prepare(self, msg: AnyMessage, past: bool) -> Tuple[AnyMessage, int]:
+        """Return a message as sent to the model, with its estimated tokens.
+
+        Args:
+            msg (AnyMessage): The message from the history
+            past (bool): Whether the message belongs to a past turn, whose tool results are shortened
+
+        Returns:
+            Tuple[AnyMessage, int]: The filtered message and its estimated tokens
+        """
+
+        def build() -> Tuple[AnyMessage, int]:
+            prepared = filter_message(msg)
+            max_chars = self.old_tool_result_tokens * CHARS_PER_TOKEN
+            if (
+                past
+                and isinstance(prepared, ToolMessage)
+                and len(_get_text(prepared.content)) > max_chars
+            ):
+                prepared = _replace_content(
+                    prepared, _shorten(_get_text(prepared.content), max_chars)
+                )
+            return prepared, count_tokens(prepared)
+
+        msg_id = getattr(msg, "id", None)
+        return self._memoize(self._prepared, (msg_id, past) if msg_id else None, build)
+
+    def _prepare_current_turn(
+        self, turn: List[AnyMessage], budget: int
+    ) -> List[Tuple[AnyMessage, int]]:
+        """Prepare the messages of the current turn to fit the budget if possible.
+
+        A long request makes many tool calls in one turn, so when the turn
+        exceeds the budget its tool results are shortened like those of past
+        turns, oldest first. The results of the latest tool calls are kept in
+        full, as the model decides the next step from them.
+
+        Args:
+            turn (List[AnyMessage]): The messages of the current turn
+            budget (int): Estimated tokens available for the turn
+
+        Returns:
+            List[Tuple[AnyMessage, int]]: The prepared messages with their estimated tokens
+        """
+        prepared = [self._prepare(msg, past=False) for msg in turn]
+        total = sum(tokens for _, tokens in prepared)
+        latest_call = max(
+            (
+                idx
+                for idx, msg in enumerate(turn)
+                if isinstance(msg, AIMessage) and msg.tool_calls
+            ),
+            default=0,
+        )
+        for idx in range(latest_call):
+            if total <= budget:
+                break
+            if isinstance(turn[idx], ToolMessage):
+                shortened = self._prepare(turn[idx], past=True)
+                total += shortened[1] - prepared[idx][1]
+                prepared[idx] = shortened
+        return prepared
+
+    def _digest(self, turn: List[AnyMessage]) -> str:
+        """Describe a turn in a few lines: the request, the tools used and the answer."""
+
+        def build() -> str:
+            request = ""
+            answer = ""
+            tool_counts = {}
+            for msg in turn:
+                if isinstance(msg, HumanMessage) and not request:
+                    request = _get_text(msg.content)
+                elif isinstance(msg, AIMessage):
+                    for tool_call in msg.tool_calls:
+                        name = tool_call["name"]
+                        tool_counts[name] = tool_counts.get(name, 0) + 1
+                    if _get_text(msg.content):
+                        answer = _get_text(msg.content)
+
+            lines = [f"- User: {_shorten(request, 300)}"]
+            if tool_counts:
+                tools = ", ".join(
+                    name if count == 1 else f"{name} x{count}"
+                    for name, count in tool_counts.items()
+                )
+                lines.append(f"  Tools used: {tools}")
+            if answer:
+                lines.append(f"  Assistant: {_shorten(answer, 300)}")
+            return "\n".join(lines)
+
+        return self._memoize(self._digests, getattr(turn[0], "id", None), build)
+
+    def _summarize(self, messages: List[AnyMessage]) -> str:
+        """Summarize omitted messages, keeping the digests of the latest turns."""
+
+        def build() -> str:
+            turns = []
+            for msg in messages:
+                if isinstance(msg, HumanMessage) or not turns:
+                    turns.append([])
+                turns[-1].append(msg)
+
+            max_chars = self.summary_max_tokens * CHARS_PER_TOKEN
+            digests = []
+            used = 0
+            for turn in reversed(turns):
+                digest = self._digest(turn)
+                if used + len(digest) > max_chars:
+                    break
+                digests.insert(0, digest)
+                used += len(digest) + 1
+            omitted = len(turns) - len(digests)
+            if omitted:
+                digests.insert(0, f"({omitted} earlier requests not shown)")
+            return "\n".join(digests)
+
+        # The omitted messages are always a prefix of the history, so the last
+        # one identifies them
+        return self._memoize(self._summaries, getattr(messages[-1], "id", None), build)
+
+    def _with_summary(self, msg: AnyMessage, summary: str) -> AnyMessage:
+        """Return a copy of a human message preceded by the summary."""
+        header = f"{SUMMARY_HEADER}\n{summary}\n{SUMMARY_FOOTER}\n\n"
+        if isinstance(msg.content, list):
+            return _replace_content(
+                msg, [{"type": "text", "text": header}] + msg.content
+            )
+        return _replace_content(msg, header + msg.content)
+
+    def build(self, messages: List[AnyMessage]) -> List[AnyMessage]:
+        """Build the messages to send to the model.
+
+        Args:
+            messages (List[AnyMessage]): The whole conversation history
+
+        Returns:
+            List[AnyMessage]: The messages fitting the token budget, starting with a human message
+        """
+        if not messages:
+            return []
+
+        # The current turn starts with the last human message
+        start = len(messages) - 1
+        while start > 0 and not isinstance(messages[start], HumanMessage):
+            start -= 1
+        # A summary is only sent when there are earlier turns
+        budget = self.token_budget - (self.summary_max_tokens if start > 0 else 0)
+        current = self._prepare_current_turn(messages[start:], budget)
+        result = [msg for msg, _ in current]
+        budget -= sum(tokens for _, tokens in current)
+        kept_start = start
+        while kept_start > 0:
+            turn_start = kept_start - 1
+            while turn_start > 0 and not isinstance(messages[turn_start], HumanMessage):
+                turn_start -= 1
+            turn = [
+                self._prepare(msg, past=True) for msg in messages[turn_start:kept_start]
+            ]
+            turn_tokens = sum(tokens for _, tokens in turn)
+            if turn_tokens > budget:
+                break
+            budget -= turn_tokens
+            result = [msg for msg, _ in turn] + result
+            kept_start = turn_start
+
+        if kept_start > 0 and isinstance(result[0], HumanMessage):
+            result[0] = self._with_summary(
+                result[0], self._summarize(messages[:kept_start])
+            )
+        return result
+
+
+conversation_context = ConversationContext()
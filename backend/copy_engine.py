@@ -0,0 +1,183 @@
+import os
+import errno
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from config import COPY_ENGINE_ENABLED, COPY_ENGINE_MAX_WORKERS
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+# ioctl request cloning the extents of one file into another (Linux, Btrfs/XFS)
+FICLONE = 0x40049409
+
+# Largest number of bytes requested from a single copy_file_range call
+COPY_RANGE_CHUNK = 1 << 30
+
+# Errors meaning a copy method is not supported between two files
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.EOPNOTSUPP,
+    errno.ENOTTY,
+    errno.EBADF,
+    errno.EPERM,
+}
+
+
+@dataclass
+class CopyProgress:
+    """Progress of a copy operation."""
+
+    total_files: int = 0
+    total_bytes: int = 0
+    copied_files: int = 0
+    copied_bytes: int = 0
+
+
+# (method, source device, destination device) combinations known not to work
+_unsupported: set = set()
+
+
+def _try_reflink(source_fd: int, dest_fd: int, devices: Tuple[int, int]) -> bool:
+    """Clone the source file into the destination; returns whether it worked."""
+    if fcntl is None or ("reflink", *devices) in _unsupported:
+        return False
+    try:
+        fcntl.ioctl(dest_fd, FICLONE, source_fd)
+        return True
+    except OSError as e:
+        if e.errno not in _UNSUPPORTED_ERRNOS:
+            raise
+        _unsupported.add(("reflink", *devices))
+        return False
+
+
+def _try_copy_range(source_fd: int, dest_fd: int, devices: Tuple[int, int]) -> bool:
+    """Copy with copy_file_range, in the kernel or on the file server; returns whether it worked."""
+    if not hasattr(os, "copy_file_range") or ("copy_range", *devices) in _unsupported:
+        return False
+
+    copied = 0
+    while True:
+        try:
+            count = os.copy_file_range(source_fd, dest_fd, COPY_RANGE_CHUNK)
+        except OSError as e:
+            # Only an unsupported first call can fall back, later errors are real
+            if copied or e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+            _unsupported.add(("copy_range", *devices))
+            return False
+        if count == 0:
+            return copied > 0 or os.fstat(source_fd).st_size == 0
+        copied += count
+
+
+def copy_file(source: str, dest: str) -> int:
+    """Copy a file with its metadata, like shutil.copy2, using the fastest available method.
+
+    A reflink is tried first, then copy_file_range, and finally shutil.copyfile,
+    which uses sendfile on Linux and a plain read/write loop elsewhere.
+
+    Args:
+        source (str): Path of the file to copy
+        dest (str): Path of the new file
+
+    Returns:
+        int: The number of bytes copied
+    """
+    if not COPY_ENGINE_ENABLED:
+        shutil.copy2(source, dest)
+        return os.path.getsize(dest)
+
+    with open(source, "rb") as source_file, open(dest, "wb") as dest_file:
+        source_stat = os.fstat(source_file.fileno())
+        devices = (source_stat.st_dev, os.fstat(dest_file.fileno()).st_dev)
+        copied = _try_reflink(
+            source_file.fileno(), dest_file.fileno(), devices
+        ) or _try_copy_range(source_file.fileno(), dest_file.fileno(), devices)
+
+    if not copied:
+        shutil.copyfile(source, dest)
+    shutil.copystat(source, dest)
+    return source_stat.st_size
+
+
+def copy_tree(
+    source: str,
+    dest: str,
+    max_workers: int = COPY_ENGINE_MAX_WORKERS,
+    progress: Optional[Callable[[CopyProgress], None]] = None,
+) -> CopyProgress:
+    """Copy a folder tree like shutil.copytree, copying its files concurrently.
+
+    Folders are created first, then the files are copied on a thread pool, and
+    finally the folder metadata is copied, deepest folders first.
+
+    Args:
+        source (str): Path of the folder to copy
+        dest (str): Path of the new folder, which must not exist
+        max_workers (int): Number of files copied concurrently
+        progress (Optional[Callable[[CopyProgress], None]]): Called after each copied file,
+            or once at the end when the copy engine is disabled
+
+    Returns:
+        CopyProgress: The number of files and bytes copied
+    """
+    if not COPY_ENGINE_ENABLED:
+        shutil.copytree(source, dest)
+        stats = CopyProgress()
+        for root, _, files in os.walk(dest):
+            stats.copied_files += len(files)
+            stats.copied_bytes += sum(
+                os.path.getsize(os.path.join(root, name)) for name in files
+            )
+        stats.total_files, stats.total_bytes = stats.copied_files, stats.copied_bytes
+        if progress:
+            progress(stats)
+        return stats
+
+    folders: List[Tuple[str, str]] = []
+    files: List[Tuple[str, str]] = []
+    stats = CopyProgress()
+
+    # Scan the tree and create the folders, following symbolic links like copytree
+    pending = [(source, dest)]
+    while pending:
+        source_dir, dest_dir = pending.pop()
+        os.makedirs(dest_dir)
+        folders.append((source_dir, dest_dir))
+        with os.scandir(source_dir) as entries:
+            for entry in entries:
+                target = os.path.join(dest_dir, entry.name)
+                if entry.is_dir():
+                    pending.append((entry.path, target))
+                else:
+                    files.append((entry.path, target))
+                    stats.total_files += 1
+                    stats.total_bytes += entry.stat().st_size
+
+    lock = threading.Lock()
+
+    def copy_one(paths: Tuple[str, str]) -> None:
+        copied_bytes = copy_file(*paths)
+        with lock:
+            stats.copied_files += 1
+            stats.copied_bytes += copied_bytes
+            if progress:
+                progress(stats)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Consume the results so that the first error is raised
+        for _ in executor.map(copy_one, files):
+            pass
+
+    for source_dir, dest_dir in reversed(folders):
+        shutil.copystat(source_dir, dest_dir)
+    return stats
@@ -0,0 +1,397 @@
+import os
+import time
+import sqlite3
+import threading
+from stat import S_ISDIR
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import (
+    DIRECTORY_INDEX_ENABLED,
+    DIRECTORY_INDEX_PATH,
+    DIRECTORY_INDEX_WATCH,
+    DIRECTORY_INDEX_VERIFY_INTERVAL,
+)
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # Optional, listings are then verified by directory mtime
+    FileSystemEventHandler = object
+    Observer = None
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    """A file or folder recorded in the directory index.
+
+    The size and mtime are those seen when the parent folder was listed. A
+    file edited in place does not change the mtime of its folder, so they can
+    be stale; stat the file when the current values matter.
+    """
+
+    path: str
+    name: str
+    is_dir: bool
+    is_link: bool
+    size: int
+    mtime_ns: int
+    inode: int
+
+
+def _normalize(path: str) -> str:
+    """Return the absolute, normalized form of a path used as index key."""
+    return os.path.normpath(os.path.abspath(path))
+
+
+def _entry_from_stat(path: str, stat: os.stat_result, is_link: bool) -> IndexEntry:
+    """Build an index entry from the result of os.stat."""
+    return IndexEntry(
+        path=path,
+        name=os.path.basename(path),
+        is_dir=S_ISDIR(stat.st_mode),
+        is_link=is_link,
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        inode=stat.st_ino,
+    )
+
+
+class _InvalidationHandler(FileSystemEventHandler):
+    """Forward filesystem events to the index."""
+
+    def __init__(self, index: "DirectoryIndex"):
+        self.index = index
+
+    def on_any_event(self, event):
+        if event.event_type in ("opened", "closed", "closed_no_write"):
+            return
+        if event.event_type == "modified":
+            # A modified folder changed its children; a modified file changed its size
+            self.index.mark_stale(
+                event.src_path
+                if event.is_directory
+                else os.path.dirname(event.src_path)
+            )
+            return
+        self.index.invalidate(event.src_path)
+        if getattr(event, "dest_path", None):
+            self.index.invalidate(event.dest_path)
+
+
+class DirectoryIndex:
+    """Persistent index of directory listings.
+
+    The children of every listed directory are stored with their type, size,
+    mtime and inode, in memory and in a SQLite database, together with the
+    mtime of the directory at the time it was read. A later listing reuses the
+    stored children as long as the directory mtime is unchanged, so only
+    directories that gained, lost or renamed children are read again.
+
+    Listings are trusted without any check while a watchdog observer covers
+    them or for a short interval after they were verified. The file operation
+    tools invalidate the paths they change, so their own changes are always
+    visible immediately.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        enabled: bool = True,
+        watch: bool = False,
+        verify_interval: float = 0.0,
+    ):
+        """Initialize the index.
+
+        Args:
+            db_path (str): Path of the SQLite database file
+            enabled (bool): Whether listings are indexed at all
+            watch (bool): Whether to follow filesystem events of watched directories
+            verify_interval (float): Seconds a verified listing is reused without checking the directory mtime
+        """
+        self.db_path = db_path
+        self.enabled = enabled
+        self.watch_enabled = watch and Observer is not None
+        self.verify_interval = verify_interval
+        self._lock = threading.RLock()
+        self._conn = None
+        # Directory -> (mtime_ns when read, children by name)
+        self._children: Dict[str, Tuple[int, Dict[str, IndexEntry]]] = {}
+        # Directory -> monotonic time its listing was last verified
+        self._verified: Dict[str, float] = {}
+        self._observers: Dict[str, object] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use and create the schema if needed."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    path TEXT PRIMARY KEY,
+                    parent TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    is_dir INTEGER NOT NULL,
+                    is_link INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    inode INTEGER NOT NULL
+                )
+                """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_parent ON entries (parent)"
+            )
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS directories (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL
+                )
+                """)
+            self._conn.commit()
+        return self._conn
+
+    def _is_trusted(self, directory: str) -> bool:
+        """Whether the cached listing of a directory can be used without checking it."""
+        verified = self._verified.get(directory)
+        if verified is None:
+            return False
+        if time.monotonic() - verified < self.verify_interval:
+            return True
+        return any(
+            directory == root or directory.startswith(os.path.join(root, ""))
+            for root in self._observers
+        )
+
+    def _load(self, directory: str, mtime_ns: int) -> Optional[Dict[str, IndexEntry]]:
+        """Read the stored children of a directory if they are still current."""
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT mtime_ns FROM directories WHERE path = ?", (directory,)
+        ).fetchone()
+        if not row or row[0] != mtime_ns:
+            return None
+
+        rows = conn.execute(
+            "SELECT path, name, is_dir, is_link, size, mtime_ns, inode "
+            "FROM entries WHERE parent = ?",
+            (directory,),
+        ).fetchall()
+        return {
+            name: IndexEntry(
+                path, name, bool(is_dir), bool(is_link), size, mtime, inode
+            )
+            for path, name, is_dir, is_link, size, mtime, inode in rows
+        }
+
+    def _scan(self, directory: str) -> Dict[str, IndexEntry]:
+        """Read the children of a directory from the filesystem."""
+        children = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    # Broken symbolic link
+                    stat = entry.stat(follow_symlinks=False)
+                children[entry.name] = _entry_from_stat(
+                    entry.path, stat, entry.is_symlink()
+                )
+        return children
+
+    def _store(
+        self, directory: str, mtime_ns: int, children: Dict[str, IndexEntry]
+    ) -> None:
+        """Record the children of a directory in memory and on disk."""
+        self._children[directory] = (mtime_ns, children)
+        self._verified[directory] = time.monotonic()
+
+        conn = self._connect()
+        conn.execute("DELETE FROM entries WHERE parent = ?", (directory,))
+        conn.executemany(
+            "INSERT OR REPLACE INTO entries "
+            "(path, parent, name, is_dir, is_link, size, mtime_ns, inode) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    entry.path,
+                    directory,
+                    entry.name,
+                    entry.is_dir,
+                    entry.is_link,
+                    entry.size,
+                    entry.mtime_ns,
+                    entry.inode,
+                )
+                for entry in children.values()
+            ],
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO directories (path, mtime_ns) VALUES (?, ?)",
+            (directory, mtime_ns),
+        )
+        conn.commit()
+
+    def _list(self, directory: str) -> Dict[str, IndexEntry]:
+        """Return the children of a normalized directory path by name.
+
+        Raises:
+            OSError: If the directory cannot be read
+        """
+        if not self.enabled:
+            return self._scan(directory)
+
+        with self._lock:
+            cached = self._children.get(directory)
+            if cached and self._is_trusted(directory):
+                return cached[1]
+
+        mtime_ns = os.stat(directory).st_mtime_ns
+        with self._lock:
+            if cached and cached[0] == mtime_ns:
+                self._verified[directory] = time.monotonic()
+                return cached[1]
+            children = self._load(directory, mtime_ns)
+            if children is not None:
+                self._children[directory] = (mtime_ns, children)
+                self._verified[directory] = time.monotonic()
+                return children
+
+        children = self._scan(directory)
+        with self._lock:
+            self._store(directory, mtime_ns, children)
+        return children
+
+    def scandir(self, directory: str) -> List[IndexEntry]:
+        """List the children of a directory, sorted by name.
+
+        Args:
+            directory (str): Path of the directory
+
+        Returns:
+            List[IndexEntry]: The files and folders in the directory
+
+        Raises:
+            OSError: If the directory cannot be read
+        """
+        children = self._list(_normalize(directory))
+        return [children[name] for name in sorted(children)]
+
+    def walk(self, top: str) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """Walk a directory tree top-down like os.walk, with sorted names.
+
+        Symbolic links to folders are listed but not followed, and folders that
+        cannot be read are skipped.
+
+        Args:
+            top (str): Path of the directory to walk
+
+        Yields:
+            Tuple[str, List[str], List[str]]: The directory path, its folder names and its file names
+        """
+        stack = [_normalize(top)]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = self.scandir(directory)
+            except OSError:
+                continue
+            dirnames = [entry.name for entry in entries if entry.is_dir]
+            filenames = [entry.name for entry in entries if not entry.is_dir]
+            yield directory, dirnames, filenames
+
+            stack.extend(
+                entry.path
+                for entry in reversed(entries)
+                if entry.is_dir and not entry.is_link
+            )
+
+    def invalidate(self, path: str) -> None:
+        """Forget a path that was created, deleted or moved, with everything below it.
+
+        Args:
+            path (str): Path of the changed file or folder
+        """
+        if not self.enabled:
+            return
+
+        path = _normalize(path)
+        prefix = os.path.join(path, "")
+        with self._lock:
+            for directory in [
+                d for d in self._children if d == path or d.startswith(prefix)
+            ]:
+                del self._children[directory]
+                self._verified.pop(directory, None)
+
+            conn = self._connect()
+            # Paths below the changed one sort between "<path>/" and "<path>0"
+            below = (prefix, prefix[:-1] + chr(ord(os.sep) + 1))
+            conn.execute(
+                "DELETE FROM entries WHERE path = ? OR (path >= ? AND path < ?)",
+                (path, *below),
+            )
+            conn.execute(
+                "DELETE FROM directories WHERE path = ? OR (path >= ? AND path < ?)",
+                (path, *below),
+            )
+            conn.commit()
+        self.mark_stale(os.path.dirname(path))
+
+    def mark_stale(self, directory: str) -> None:
+        """Force the listing of a directory to be read again.
+
+        Args:
+            directory (str): Path of the directory whose children changed
+        """
+        if not self.enabled:
+            return
+
+        directory = _normalize(directory)
+        with self._lock:
+            self._children.pop(directory, None)
+            self._verified.pop(directory, None)
+            conn = self._connect()
+            conn.execute("DELETE FROM directories WHERE path = ?", (directory,))
+            conn.commit()
+
+    def watch(self, root: str) -> bool:
+        """Follow filesystem events below a directory, if watchdog is available.
+
+        Args:
+            root (str): Path of the directory to watch
+
+        Returns:
+            bool: Whether the directory is watched
+        """
+        if not self.enabled or not self.watch_enabled:
+            return False
+
+        root = _normalize(root)
+        with self._lock:
+            if any(
+                root == watched or root.startswith(os.path.join(watched, ""))
+                for watched in self._observers
+            ):
+                return True
+            try:
+                observer = Observer()
+                observer.daemon = True
+                observer.schedule(_InvalidationHandler(self), root, recursive=True)
+                observer.start()
+            except Exception:
+                return False
+            self._observers[root] = observer
+            # Listings read before the observer started may already be outdated
+            for directory in list(self._verified):
+                if directory == root or directory.startswith(os.path.join(root, "")):
+                    del self._verified[directory]
+        return True
+
+
+directory_index = DirectoryIndex(
+    DIRECTORY_INDEX_PATH,
+    enabled=DIRECTORY_INDEX_ENABLED,
+    watch=DIRECTORY_INDEX_WATCH,
+    verify_interval=DIRECTORY_INDEX_VERIFY_INTERVAL,
+)
@@ -0,0 +1,303 @@
+import re
+import struct
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, List, Optional
+
+import olefile
+
+from utils import truncate_chunks
+
+# File Information Block (FIB) constants, see [MS-DOC] 2.5
+WORD_BINARY_IDENT = 0xA5EC
+MIN_SUPPORTED_NFIB = 0x00C1  # Word 97 and later
+FIB_BASE_SIZE = 32
+FIB_FLAG_ENCRYPTED = 0x0100
+FIB_FLAG_WHICH_TABLE_STREAM = 0x0200
+FIB_RGLW_CCP_TEXT = 3
+FIB_RGFCLCB_CLX = 33
+
+# Clx entry types, see [MS-DOC] 2.9.38
+CLXT_PRC = 0x01
+CLXT_PCDT = 0x02
+PCD_SIZE = 8
+FC_COMPRESSED_FLAG = 0x40000000
+FC_MASK = 0x3FFFFFFF
+
+# Number of characters decoded at a time, so callers can stop early
+DECODE_CHUNK_CHARS = 16 * 1024
+
+# Special characters of the document text
+FIELD_BEGIN = "\x13"
+FIELD_SEPARATOR = "\x14"
+FIELD_END = "\x15"
+FIELD_MARKS = re.compile("[\x13\x14\x15]")
+SPECIAL_CHAR_REPLACEMENTS = {
+    "\x0b": "\n",  # Line break
+    "\x0c": "\n",  # Page or section break
+    "\x0e": "\n",  # Column break
+    "\x07": "\t",  # Table cell or row mark
+    "\x1e": "-",  # Non-breaking hyphen
+    "\xa0": " ",  # Non-breaking space
+}
+# Object anchors, note references, optional hyphens and other control characters
+SPECIAL_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x12\x16-\x1f\xa0]")
+
+
+class DocFormatError(ValueError):
+    """Raised when a Word binary document cannot be parsed."""
+
+
+@dataclass
+class FibInfo:
+    """The parts of the File Information Block needed to read the text."""
+
+    n_fib: int
+    table_stream_name: str
+    ccp_text: int
+    fc_clx: int
+    lcb_clx: int
+
+
+@dataclass
+class Piece:
+    """A run of consecutive characters stored contiguously in the WordDocument stream."""
+
+    cp_start: int
+    cp_end: int
+    byte_offset: int
+    compressed: bool
+
+
+def read_fib(word_stream: BinaryIO) -> FibInfo:
+    """Read the File Information Block at the start of the WordDocument stream.
+
+    Args:
+        word_stream (BinaryIO): The WordDocument stream
+
+    Returns:
+        FibInfo: The location of the piece table and the length of the main text
+    """
+    word_stream.seek(0)
+    base = word_stream.read(FIB_BASE_SIZE)
+    if len(base) < FIB_BASE_SIZE:
+        raise DocFormatError("WordDocument stream is too short")
+
+    ident, n_fib = struct.unpack_from("<HH", base, 0)
+    (flags,) = struct.unpack_from("<H", base, 0x0A)
+    if ident != WORD_BINARY_IDENT:
+        raise DocFormatError(f"Unexpected FIB identifier 0x{ident:04X}")
+    if n_fib < MIN_SUPPORTED_NFIB:
+        raise DocFormatError(f"Unsupported Word version (nFib 0x{n_fib:04X})")
+    if flags & FIB_FLAG_ENCRYPTED:
+        raise DocFormatError("Document is encrypted")
+
+    (csw,) = struct.unpack("<H", word_stream.read(2))
+    word_stream.seek(csw * 2, 1)
+    (cslw,) = struct.unpack("<H", word_stream.read(2))
+    fib_rg_lw = word_stream.read(cslw * 4)
+    (cb_rg_fc_lcb,) = struct.unpack("<H", word_stream.read(2))
+    fib_rg_fc_lcb = word_stream.read(cb_rg_fc_lcb * 8)
+
+    if cslw <= FIB_RGLW_CCP_TEXT or cb_rg_fc_lcb <= FIB_RGFCLCB_CLX:
+        raise DocFormatError("FIB is missing the text length or piece table location")
+
+    (ccp_text,) = struct.unpack_from("<i", fib_rg_lw, FIB_RGLW_CCP_TEXT * 4)
+    fc_clx, lcb_clx = struct.unpack_from("<II", fib_rg_fc_lcb, FIB_RGFCLCB_CLX * 8)
+
+    return FibInfo(
+        n_fib=n_fib,
+        table_stream_name=(
+            "1Table" if flags & FIB_FLAG_WHICH_TABLE_STREAM else "0Table"
+        ),
+        ccp_text=max(ccp_text, 0),
+        fc_clx=fc_clx,
+        lcb_clx=lcb_clx,
+    )
+
+
+def read_piece_table(table_stream: BinaryIO, fib: FibInfo) -> List[Piece]:
+    """Read the piece table (PlcPcd) from the Clx structure in the table stream.
+
+    Args:
+        table_stream (BinaryIO): The 0Table or 1Table stream
+        fib (FibInfo): The parsed File Information Block
+
+    Returns:
+        List[Piece]: The pieces in character position order
+    """
+    if not fib.lcb_clx:
+        raise DocFormatError("Document has no piece table")
+
+    table_stream.seek(fib.fc_clx)
+    clx = table_stream.read(fib.lcb_clx)
+    if len(clx) < fib.lcb_clx:
+        raise DocFormatError("Piece table extends beyond the table stream")
+
+    # Skip the property modifiers (Prc) that precede the piece table
+    pos = 0
+    while pos < len(clx) and clx[pos] == CLXT_PRC:
+        (cb_grpprl,) = struct.unpack_from("<h", clx, pos + 1)
+        pos += 3 + cb_grpprl
+
+    if pos >= len(clx) or clx[pos] != CLXT_PCDT:
+        raise DocFormatError("Piece table descriptor not found")
+
+    (lcb,) = struct.unpack_from("<I", clx, pos + 1)
+    plc = clx[pos + 5 : pos + 5 + lcb]
+    if len(plc) < lcb or (lcb - 4) % (4 + PCD_SIZE):
+        raise DocFormatError("Malformed piece table")
+
+    count = (lcb - 4) // (4 + PCD_SIZE)
+    cps = struct.unpack_from(f"<{count + 1}I", plc, 0)
+    pcd_offset = (count + 1) * 4
+
+    pieces = []
+    for idx in range(count):
+        (fc,) = struct.unpack_from("<I", plc, pcd_offset + idx * PCD_SIZE + 2)
+        compressed = bool(fc & FC_COMPRESSED_FLAG)
+        fc &= FC_MASK
+        pieces.append(
+            Piece(
+                cp_start=cps[idx],
+                cp_end=cps[idx + 1],
+                byte_offset=fc // 2 if compressed else fc,
+                compressed=compressed,
+            )
+        )
+    return pieces
+
+
+def iter_raw_text(
+    word_stream: BinaryIO, pieces: List[Piece], ccp_text: int
+) -> Iterator[str]:
+    """Decode the main document text piece by piece, in bounded chunks.
+
+    Args:
+        word_stream (BinaryIO): The WordDocument stream
+        pieces (List[Piece]): The piece table
+        ccp_text (int): Number of characters in the main document
+
+    Yields:
+        str: Consecutive chunks of raw document text, including special characters
+    """
+    for piece in pieces:
+        if piece.cp_start >= ccp_text:
+            break
+
+        remaining = min(piece.cp_end, ccp_text) - piece.cp_start
+        char_size = 1 if piece.compressed else 2
+        encoding = "cp1252" if piece.compressed else "utf-16-le"
+        word_stream.seek(piece.byte_offset)
+
+        while remaining > 0:
+            count = min(remaining, DECODE_CHUNK_CHARS)
+            data = word_stream.read(count * char_size)
+            if not data:
+                break
+            yield data.decode(encoding, errors="ignore")
+            remaining -= count
+
+
+def _replace_special_chars(text: str) -> str:
+    """Map paragraph marks and other special characters to plain text."""
+    text = text.replace("\r", "\n")
+    return SPECIAL_CHARS.sub(
+        lambda match: SPECIAL_CHAR_REPLACEMENTS.get(match.group(), ""), text
+    )
+
+
+def iter_clean_text(raw_chunks: Iterator[str]) -> Iterator[str]:
+    """Remove field instructions and map special characters to plain text.
+
+    Field codes look like BEGIN instructions SEPARATOR result END and may be
+    nested; only the displayed result is kept.
+
+    Args:
+        raw_chunks (Iterator[str]): Raw document text as produced by iter_raw_text
+
+    Yields:
+        str: Chunks of readable text
+    """
+    # One entry per open field: True once its separator has been seen
+    field_stack = []
+
+    for chunk in raw_chunks:
+        if not field_stack and FIELD_BEGIN not in chunk:
+            yield _replace_special_chars(chunk)
+            continue
+
+        visible = []
+        pos = 0
+        for match in FIELD_MARKS.finditer(chunk):
+            if all(field_stack):
+                visible.append(chunk[pos : match.start()])
+            mark = match.group()
+            if mark == FIELD_BEGIN:
+                field_stack.append(False)
+            elif mark == FIELD_SEPARATOR and field_stack:
+                field_stack[-1] = True
+            elif mark == FIELD_END and field_stack:
+                field_stack.pop()
+            pos = match.end()
+        if all(field_stack):
+            visible.append(chunk[pos:])
+
+        yield _replace_special_chars("".join(visible))
+
+
+def iter_word_stream_text(
+    word_stream: BinaryIO, table_stream: BinaryIO, fib: Optional[FibInfo] = None
+) -> Iterator[str]:
+    """Yield the readable main document text from the WordDocument and table streams.
+
+    Args:
+        word_stream (BinaryIO): The WordDocument stream
+        table_stream (BinaryIO): The table stream named in the FIB
+        fib (Optional[FibInfo]): The parsed FIB, read from word_stream if not given
+
+    Yields:
+        str: Chunks of readable text
+    """
+    fib = fib or read_fib(word_stream)
+    pieces = read_piece_table(table_stream, fib)
+    yield from iter_clean_text(iter_raw_text(word_stream, pieces, fib.ccp_text))
+
+
+def extract_doc_text(
+    file_path: str,
+    max_words: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> str:
+    """Extract the main text of a Word 97-2003 (.doc/.dot) file using its piece table.
+
+    Decoding stops as soon as the requested budget is met, so only the
+    beginning of large documents is decoded.
+
+    Args:
+        file_path (str): Path to the document file
+        max_words (Optional[int]): Maximum number of words to return
+        max_chars (Optional[int]): Maximum number of characters to return
+
+    Returns:
+        str: Extracted text content, or an empty string if the file is not a Word document
+    """
+    if not olefile.isOleFile(file_path):
+        return ""
+
+    with olefile.OleFileIO(file_path) as ole:
+        if not ole.exists("WordDocument"):
+            return ""
+
+        word_stream = ole.openstream("WordDocument")
+        fib = read_fib(word_stream)
+        if not ole.exists(fib.table_stream_name):
+            raise DocFormatError(f"Table stream '{fib.table_stream_name}' is missing")
+        table_stream = ole.openstream(fib.table_stream_name)
+
+        text = truncate_chunks(
+            iter_word_stream_text(word_stream, table_stream, fib), max_words, max_chars
+        )
+
+    text = re.sub(r"[ \t]+\n", "\n", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
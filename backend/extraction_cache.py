@@ -0,0 +1,210 @@
+import os
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from typing import Callable, Optional
+
+from utils import hash_file
+from config import (
+    EXTRACTION_CACHE_ENABLED,
+    EXTRACTION_CACHE_PATH,
+    EXTRACTION_CACHE_MAX_BYTES,
+    EXTRACTION_CACHE_HASH_CONTENT,
+)
+
+
+class ExtractionCache:
+    """On-disk cache of extracted document text.
+
+    Entries are keyed by the absolute path, size and modification time of the
+    source file (and optionally a hash of its content), plus a variant naming
+    the extraction options (e.g. a character budget), stored zlib-compressed
+    in a SQLite database and evicted in least-recently-used order once the
+    total compressed size exceeds the configured cap.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_bytes: int = EXTRACTION_CACHE_MAX_BYTES,
+        hash_content: bool = False,
+        enabled: bool = True,
+    ):
+        """Initialize the cache.
+
+        Args:
+            db_path (str): Path of the SQLite database file
+            max_bytes (int): Maximum total size of the compressed entries
+            hash_content (bool): Whether to include a content hash in the cache key
+            enabled (bool): Whether caching is enabled at all
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hash_content = hash_content
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use and create the schema if needed."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS extractions (
+                    key TEXT NOT NULL,
+                    variant TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    data BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (key, variant)
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS extractions_last_access ON extractions (last_access)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS extractions_path ON extractions (path)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def make_key(self, full_path: str) -> str:
+        """Build the cache key for a file from its path, size and mtime.
+
+        Args:
+            full_path (str): Path to the source file
+
+        Returns:
+            str: Hex digest identifying the current version of the file
+        """
+        abs_path = os.path.abspath(full_path)
+        stat = os.stat(abs_path)
+        parts = [abs_path, str(stat.st_size), str(stat.st_mtime_ns)]
+        if self.hash_content:
+            parts.append(hash_file(abs_path))
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str, variant: str = "") -> Optional[str]:
+        """Return the cached text for a key, or None if it is not cached."""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT data FROM extractions WHERE key = ? AND variant = ?",
+                (key, variant),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE extractions SET last_access = ? WHERE key = ? AND variant = ?",
+                (time.time(), key, variant),
+            )
+            conn.commit()
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, key: str, full_path: str, text: str, variant: str = "") -> None:
+        """Store extracted text and evict old entries if the cache is full."""
+        data = zlib.compress(text.encode("utf-8"))
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            conn = self._connect()
+            # Drop entries for older versions of the same file
+            conn.execute(
+                "DELETE FROM extractions WHERE path = ? AND key != ?",
+                (os.path.abspath(full_path), key),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO extractions "
+                "(key, variant, path, data, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    variant,
+                    os.path.abspath(full_path),
+                    data,
+                    len(data),
+                    time.time(),
+                ),
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Remove least recently used entries until the size cap is respected."""
+        total = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM extractions"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = conn.execute(
+            "SELECT key, variant, size FROM extractions ORDER BY last_access ASC"
+        ).fetchall()
+        expired = []
+        for key, variant, size in rows:
+            if total <= self.max_bytes:
+                break
+            expired.append((key, variant))
+            total -= size
+        conn.executemany(
+            "DELETE FROM extractions WHERE key = ? AND variant = ?", expired
+        )
+
+    def get_or_extract(
+        self,
+        full_path: str,
+        extractor: Callable[[str], str],
+        variant: str = "",
+    ) -> str:
+        """Return the cached text for a file, running the extractor on a miss.
+
+        Args:
+            full_path (str): Path to the source file
+            extractor (Callable[[str], str]): Function extracting the text from the file
+            variant (str): Identifies extraction options that change the extracted text
+
+        Returns:
+            str: Extracted text content
+        """
+        if not self.enabled:
+            return extractor(full_path)
+
+        try:
+            key = self.make_key(full_path)
+            cached = self.get(key, variant)
+        except (OSError, sqlite3.Error, zlib.error) as e:
+            print(f"Extraction cache unavailable for '{full_path}': {str(e)}")
+            return extractor(full_path)
+
+        if cached is not None:
+            return cached
+
+        text = extractor(full_path)
+        try:
+            self.put(key, full_path, text, variant)
+        except sqlite3.Error as e:
+            print(f"Could not cache extracted text for '{full_path}': {str(e)}")
+        return text
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM extractions")
+            conn.commit()
+
+
+extraction_cache = ExtractionCache(
+    EXTRACTION_CACHE_PATH,
+    max_bytes=EXTRACTION_CACHE_MAX_BYTES,
+    hash_content=EXTRACTION_CACHE_HASH_CONTENT,
+    enabled=EXTRACTION_CACHE_ENABLED,
+)
@@ -1,16 +1,37 @@
 import os
 import re
+import errno
+import time
 import shutil
 import json
-from typing import List, Optional, Union, Literal
+import fnmatch
+import itertools
+from stat import S_ISDIR
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Union, Literal
+from typing_extensions import TypedDict
 from markitdown import MarkItDown
 from langchain_core.tools import tool
+from langgraph.config import get_stream_writer
 import olefile
 
 from utils import truncate_text
-from config import WORKING_DIRECTORY, ALLOW_EXTERNAL_DIRECTORIES
+from config import (
+    WORKING_DIRECTORY,
+    ALLOW_EXTERNAL_DIRECTORIES,
+    LIST_ITEMS_PAGE_SIZE,
+    BATCH_OPERATIONS_MAX,
+    BATCH_OPERATIONS_MAX_WORKERS,
+    DELETE_MODE,
+    TRASH_DIRECTORY_NAME,
+    COPY_PROGRESS_INTERVAL,
+)
 from content_extractor import get_content
 from action_types import ActionInfo, ActionType
+from directory_index import directory_index
+from copy_engine import CopyProgress, copy_file, copy_tree
+from trash import trash
+from search_index import search_index
 
 
 def _get_full_path(working_directory: str, folder_path: Optional[str] = None) -> str:
@@ -30,6 +51,65 @@ def _get_full_path(working_directory: str, folder_path: Optional[str] = None) ->
     )
 
 
+def _makedirs(path: str) -> None:
+    """Create a folder and its missing parents, keeping the directory index current.
+
+    Args:
+        path (str): Full path of the folder to create
+    """
+    if os.path.isdir(path):
+        return
+
+    # The topmost missing folder is the one its parent listing is missing
+    top = path
+    while not os.path.exists(os.path.dirname(top)):
+        top = os.path.dirname(top)
+    os.makedirs(path, exist_ok=True)
+    directory_index.invalidate(top)
+
+
+def _copy_progress_reporter() -> Optional[Callable[[CopyProgress], None]]:
+    """Return a callback sending the progress of a copy to the graph's custom stream.
+
+    The stream writer is looked up here, as the callback is called from the
+    threads copying the files. Reports are sent at most every
+    COPY_PROGRESS_INTERVAL seconds, and once the last file is copied.
+
+    Returns:
+        Optional[Callable[[CopyProgress], None]]: The callback, or None if the tool does not run in a graph
+    """
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return None
+
+    last_report = [0.0]
+
+    def report(stats: CopyProgress) -> None:
+        now = time.monotonic()
+        done = stats.copied_files == stats.total_files
+        if not done and now - last_report[0] < COPY_PROGRESS_INTERVAL:
+            return
+        last_report[0] = now
+        writer(
+            {
+                "progress": f"Copied {stats.copied_files} of {stats.total_files} files ({stats.copied_bytes} of {stats.total_bytes} bytes)"
+            }
+        )
+
+    return report
+
+
+def _record_changes(paths: List[str]) -> None:
+    """Update the directory index for paths created, deleted or moved by a tool.
+
+    Args:
+        paths (List[str]): Full paths of the changed files and folders
+    """
+    for changed_path in paths:
+        directory_index.invalidate(changed_path)
+
+
 @tool
 def create_item(
     working_directory: str,
@@ -55,7 +135,7 @@ def create_item(
     affected_files = []
 
     if not os.path.exists(parent_full_path):
-        os.makedirs(parent_full_path)
+        _makedirs(parent_full_path)
 
     if os.path.exists(new_path):
         return {
@@ -67,6 +147,7 @@ def create_item(
     if item_type == "folder":
         os.makedirs(new_path)
         affected_files.append(new_path)
+        _record_changes(affected_files)
         action = ActionInfo(
             action_type=ActionType.CREATE_FOLDER,
             item_name=name,
@@ -82,6 +163,7 @@ def create_item(
             if content:
                 f.write(content)
         affected_files.append(new_path)
+        _record_changes(affected_files)
         action = ActionInfo(
             action_type=ActionType.CREATE_FILE,
             item_name=name,
@@ -114,24 +196,29 @@ def copy_item(
     dest_full_path = _get_full_path(working_directory, dest_path)
     affected_files = []
 
-    if not os.path.exists(source_full_path):
+    # Checked on the filesystem: a trusted listing may miss changes made outside the tools.
+    # Symbolic links are followed, as the copy copies their target
+    try:
+        source_stat = os.stat(source_full_path)
+    except OSError:
         return {
             "message": f"Source path '{source_path}' does not exist",
             "affected_files": [],
         }
 
-    is_file = os.path.isfile(source_full_path)
+    is_file = not S_ISDIR(source_stat.st_mode)
 
-    if os.path.exists(dest_full_path):
+    if os.path.lexists(dest_full_path):
         return {
             "message": f"Destination path '{dest_path}' already exists",
             "affected_files": [],
         }
 
     if is_file:
-        os.makedirs(os.path.dirname(dest_full_path), exist_ok=True)
-        shutil.copy2(source_full_path, dest_full_path)
+        _makedirs(os.path.dirname(dest_full_path))
+        copy_file(source_full_path, dest_full_path)
         affected_files.extend([source_full_path, dest_full_path])
+        directory_index.invalidate(dest_full_path)
         action = ActionInfo(
             action_type=ActionType.MOVE_FILE if is_file else ActionType.MOVE_FOLDER,
             item_name=os.path.basename(source_path),
@@ -144,8 +231,12 @@ def copy_item(
             "action": action.to_dict(),
         }
     else:
-        shutil.copytree(source_full_path, dest_full_path)
+        _makedirs(os.path.dirname(dest_full_path))
+        stats = copy_tree(
+            source_full_path, dest_full_path, progress=_copy_progress_reporter()
+        )
         affected_files.extend([source_full_path, dest_full_path])
+        directory_index.invalidate(dest_full_path)
         action = ActionInfo(
             action_type=ActionType.MOVE_FILE if is_file else ActionType.MOVE_FOLDER,
             item_name=os.path.basename(source_path),
@@ -153,7 +244,7 @@ def copy_item(
             target_path=dest_full_path,
         )
         return {
-            "message": f"Copied folder from '{source_path}' to '{dest_path}'",
+            "message": f"Copied folder from '{source_path}' to '{dest_path}' ({stats.copied_files} files, {stats.copied_bytes} bytes)",
             "affected_files": affected_files,
             "action": action.to_dict(),
         }
@@ -179,25 +270,29 @@ def move_item(
     dest_full_path = _get_full_path(working_directory, dest_path)
     affected_files = []
 
-    if not os.path.exists(source_full_path):
+    # Checked on the filesystem: a trusted listing may miss changes made outside the tools
+    try:
+        source_stat = os.lstat(source_full_path)
+    except OSError:
         return {
             "message": f"Source path '{source_path}' does not exist",
             "affected_files": [],
             "action": None,
         }
 
-    is_file = os.path.isfile(source_full_path)
+    is_file = not S_ISDIR(source_stat.st_mode)
 
-    if os.path.exists(dest_full_path):
+    if os.path.lexists(dest_full_path):
         return {
             "message": f"Destination path '{dest_path}' already exists",
             "affected_files": [],
             "action": None,
         }
 
-    os.makedirs(os.path.dirname(dest_full_path), exist_ok=True)
+    _makedirs(os.path.dirname(dest_full_path))
     shutil.move(source_full_path, dest_full_path)
     affected_files.extend([source_full_path, dest_full_path])
+    _record_changes(affected_files)
 
     action = ActionInfo(
         action_type=ActionType.MOVE_FILE if is_file else ActionType.MOVE_FOLDER,
@@ -250,14 +345,44 @@ def delete_item(
         }
 
     affected_files.append(full_path)
+
+    # Moving the item into the trash is a single rename; the reaper removes it later.
+    # Items the trash cannot hold, because they contain it or are on another
+    # filesystem, are deleted permanently
+    trash_entry = None
+    if (
+        DELETE_MODE == "trash"
+        and not trash.is_in_trash(full_path)
+        and not _is_same_or_inside(trash.get_trash_dir(), os.path.abspath(full_path))
+    ):
+        try:
+            trash_entry = trash.move_to_trash(full_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                return {
+                    "message": f"Error moving '{path}' to the trash: {str(e)}",
+                    "affected_files": [],
+                    "action": None,
+                }
+
     action = ActionInfo(
         action_type=ActionType.DELETE_FILE if is_file else ActionType.DELETE_FOLDER,
         item_name=os.path.basename(path),
         source_path=full_path,
+        target_path=trash_entry.trash_path if trash_entry else None,
     )
 
+    if trash_entry:
+        _record_changes([full_path, trash_entry.trash_path])
+        return {
+            "message": f"Moved {'file' if is_file else 'folder'} '{path}' to the trash",
+            "affected_files": affected_files,
+            "action": action.to_dict(),
+        }
+
     if is_file:
         os.remove(full_path)
+        _record_changes(affected_files)
         return {
             "message": f"Deleted file '{path}'",
             "affected_files": affected_files,
@@ -265,6 +390,7 @@ def delete_item(
         }
     else:
         shutil.rmtree(full_path)
+        _record_changes(affected_files)
         return {
             "message": f"Deleted folder '{path}' and its contents",
             "affected_files": affected_files,
@@ -295,6 +421,7 @@ def rename_item(working_directory: str, old_path: str, new_name: str) -> dict:
 
     os.rename(full_old_path, new_path)
     affected_files.extend([full_old_path, new_path])
+    _record_changes(affected_files)
     is_file = os.path.isfile(new_path)
 
     action = ActionInfo(
@@ -311,50 +438,518 @@ def rename_item(working_directory: str, old_path: str, new_name: str) -> dict:
     }
 
 
+class FileOperation(TypedDict, total=False):
+    """A single operation of a batch_operations call."""
+
+    operation: Literal["move", "copy", "rename", "create", "delete"]
+    source_path: str
+    dest_path: str
+    new_name: str
+    item_type: Literal["file", "folder"]
+    content: str
+
+
+class _BatchPlan:
+    """Simulates a batch of operations to validate them before anything runs.
+
+    Paths created, removed or moved by earlier operations of the batch are
+    tracked in an overlay on top of the filesystem, so later operations
+    are checked against the state the batch will have produced by then.
+    """
+
+    def __init__(self):
+        # Full path -> None if removed, else (kind, real path it was moved or copied from)
+        self.overlay: Dict[str, Optional[tuple]] = {}
+
+    def _resolve(self, path: str) -> tuple:
+        """Return the kind of a path ("file", "folder" or None) and the real path backing it."""
+        node = path
+        while True:
+            if node in self.overlay:
+                entry = self.overlay[node]
+                if entry is None:
+                    return None, None
+                kind, origin = entry
+                if node == path:
+                    return kind, origin
+                if origin is None:
+                    # Folders created by the batch start empty
+                    return None, None
+                path = os.path.join(origin, os.path.relpath(path, node))
+                break
+            parent = os.path.dirname(node)
+            if parent == node:
+                break
+            node = parent
+
+        # Stat the real path: a trusted listing may miss changes made outside the tools
+        try:
+            stat = os.lstat(path)
+        except OSError:
+            return None, None
+        return ("folder" if S_ISDIR(stat.st_mode) else "file"), path
+
+    def kind(self, path: str) -> Optional[str]:
+        """Return "file" or "folder" if the path exists at this point of the batch."""
+        return self._resolve(path)[0]
+
+    def add(self, path: str, kind: str, origin_path: Optional[str] = None) -> None:
+        """Record a path created by the batch, as a copy of origin_path if given."""
+        origin = self._resolve(origin_path)[1] if origin_path else None
+        self.overlay[path] = (kind, origin)
+
+    def remove(self, path: str) -> None:
+        """Record a path removed by the batch."""
+        self.overlay[path] = None
+
+
+def _is_same_or_inside(path: str, other: str) -> bool:
+    """Whether path equals other or lies inside it."""
+    return path == other or path.startswith(os.path.join(other, ""))
+
+
+def _validate_operation(
+    working_directory: str, plan: _BatchPlan, operation: FileOperation
+) -> tuple:
+    """Check one operation against the planned state and apply it to the plan.
+
+    Args:
+        working_directory (str): Base directory where operations are performed
+        plan (_BatchPlan): State of the batch before this operation
+        operation (FileOperation): The operation to check
+
+    Returns:
+        tuple: An error message or None, and the full paths touched by the operation
+    """
+    kind_name = operation.get("operation")
+    source_path = operation.get("source_path")
+    dest_path = operation.get("dest_path")
+
+    def full(path: str) -> str:
+        return os.path.normpath(
+            os.path.abspath(_get_full_path(working_directory, path))
+        )
+
+    if kind_name in ("move", "copy", "rename", "delete"):
+        if not source_path:
+            return f"'{kind_name}' requires source_path", []
+        source = full(source_path)
+        source_kind = plan.kind(source)
+        if source_kind is None:
+            return f"Source path '{source_path}' does not exist", []
+
+    if kind_name in ("move", "copy"):
+        if not dest_path:
+            return f"'{kind_name}' requires dest_path", []
+        dest = full(dest_path)
+    elif kind_name == "rename":
+        new_name = operation.get("new_name")
+        if not new_name or os.sep in new_name or "/" in new_name:
+            return "'rename' requires a new_name without path separators", []
+        dest = os.path.join(os.path.dirname(source), new_name)
+    elif kind_name == "create":
+        if not dest_path:
+            return "'create' requires dest_path", []
+        dest = full(dest_path)
+        if operation.get("item_type", "file") not in ("file", "folder"):
+            return "'create' requires item_type 'file' or 'folder'", []
+    elif kind_name == "delete":
+        item_type = operation.get("item_type")
+        if item_type and item_type != source_kind:
+            return f"Path '{source_path}' is not a {item_type}", []
+        plan.remove(source)
+        return None, [source]
+    else:
+        return f"Unknown operation '{kind_name}'", []
+
+    if plan.kind(dest) is not None:
+        return f"Destination path '{dest_path or dest}' already exists", []
+    if kind_name != "create" and _is_same_or_inside(dest, source):
+        return f"Cannot {kind_name} '{source_path}' into itself", []
+    if plan.kind(os.path.dirname(dest)) == "file":
+        return f"Parent of '{dest_path or dest}' is a file", []
+
+    if kind_name == "create":
+        plan.add(dest, operation.get("item_type", "file"))
+        return None, [dest]
+
+    plan.add(dest, source_kind, origin_path=source)
+    if kind_name != "copy":
+        plan.remove(source)
+    return None, [source, dest]
+
+
+def _run_operation(working_directory: str, operation: FileOperation) -> dict:
+    """Execute one validated operation with the matching single-item tool."""
+    kind_name = operation["operation"]
+    try:
+        if kind_name == "move":
+            return move_item.func(
+                working_directory, operation["source_path"], operation["dest_path"]
+            )
+        if kind_name == "copy":
+            return copy_item.func(
+                working_directory, operation["source_path"], operation["dest_path"]
+            )
+        if kind_name == "rename":
+            return rename_item.func(
+                working_directory, operation["source_path"], operation["new_name"]
+            )
+        if kind_name == "delete":
+            return delete_item.func(
+                working_directory,
+                operation["source_path"],
+                operation.get("item_type"),
+            )
+        parent_path, name = os.path.split(operation["dest_path"])
+        return create_item.func(
+            working_directory,
+            name,
+            operation.get("item_type", "file"),
+            parent_path or None,
+            operation.get("content"),
+        )
+    except Exception as e:
+        return {"message": f"Error: {str(e)}", "affected_files": []}
+
+
+@tool
+def batch_operations(
+    working_directory: str,
+    operations: List[FileOperation],
+) -> dict:
+    """Execute a list of file operations in one call, e.g. to reorganize many files at once.
+
+    All operations are validated before any of them runs; if one is invalid,
+    nothing is changed. Operations are applied in order, and operations on
+    unrelated paths run in parallel.
+
+    Each operation is a dictionary with an "operation" key and its arguments:
+    - move: source_path, dest_path
+    - copy: source_path, dest_path
+    - rename: source_path, new_name
+    - create: dest_path (path of the new item), item_type ("file" or "folder"), optional content
+    - delete: source_path, optional item_type
+
+    Args:
+        working_directory (str): Base directory where operations are performed
+        operations (List[FileOperation]): The operations to perform, with paths relative to working_directory
+
+    Returns:
+        dict: Dictionary containing the outcome, affected files and actions
+    """
+    if not operations:
+        return {"message": "No operations given", "affected_files": [], "actions": []}
+    if len(operations) > BATCH_OPERATIONS_MAX:
+        return {
+            "message": f"Too many operations ({len(operations)}), the maximum is {BATCH_OPERATIONS_MAX}",
+            "affected_files": [],
+            "actions": [],
+        }
+
+    # Validate everything against the state the batch produces step by step
+    plan = _BatchPlan()
+    errors = []
+    touched_paths = []
+    for idx, operation in enumerate(operations, 1):
+        error, paths = _validate_operation(working_directory, plan, operation)
+        if error:
+            errors.append(f"Operation {idx}: {error}")
+        touched_paths.append(paths)
+    if errors:
+        return {
+            "message": "No operations were performed:\n" + "\n".join(errors),
+            "affected_files": [],
+            "actions": [],
+        }
+
+    # An operation runs after every earlier operation touching an overlapping path
+    waves: List[List[int]] = []
+    wave_of = []
+    for idx, paths in enumerate(touched_paths):
+        wave = 0
+        for earlier in range(idx):
+            if wave_of[earlier] >= wave and any(
+                _is_same_or_inside(path, other) or _is_same_or_inside(other, path)
+                for path in paths
+                for other in touched_paths[earlier]
+            ):
+                wave = wave_of[earlier] + 1
+        wave_of.append(wave)
+        if wave == len(waves):
+            waves.append([])
+        waves[wave].append(idx)
+
+    results: List[Optional[dict]] = [None] * len(operations)
+    failed = False
+    with ThreadPoolExecutor(max_workers=BATCH_OPERATIONS_MAX_WORKERS) as executor:
+        for wave in waves:
+            futures = {
+                executor.submit(_run_operation, working_directory, operations[idx]): idx
+                for idx in wave
+            }
+            for future, idx in futures.items():
+                results[idx] = future.result()
+                if not results[idx].get("affected_files"):
+                    failed = True
+            # Later operations may depend on the failed one
+            if failed:
+                break
+
+    affected_files = []
+    actions = []
+    lines = []
+    for idx, result in enumerate(results, 1):
+        if result is None:
+            lines.append(f"{idx}. Skipped after an earlier failure")
+            continue
+        lines.append(f"{idx}. {result['message']}")
+        affected_files.extend(result.get("affected_files", []))
+        if result.get("action"):
+            actions.append(result["action"])
+
+    succeeded = sum(1 for result in results if result and result.get("affected_files"))
+    summary = f"Completed {succeeded} of {len(operations)} operations"
+    return {
+        "message": summary + "\n" + "\n".join(lines),
+        "affected_files": affected_files,
+        "actions": actions,
+    }
+
+
+def _listing_key(working_directory: str, full_path: str) -> tuple:
+    """Split a path into its components relative to the working directory."""
+    rel_path = os.path.relpath(full_path, working_directory)
+    return () if rel_path == "." else tuple(rel_path.split(os.sep))
+
+
+def _iter_listing(
+    working_directory: str,
+    search_path: str,
+    max_depth: Optional[int],
+    cursor: Optional[tuple] = None,
+) -> Iterator[tuple]:
+    """Lazily yield the entries below a directory in listing order.
+
+    Each directory's children are listed together, sorted by name, followed by
+    the listings of its subfolders in the same order. Entries up to and
+    including the cursor are skipped without reading the folders that only
+    contain such entries.
+
+    Args:
+        working_directory (str): Base directory where operations are performed
+        search_path (str): Full path of the directory to list
+        max_depth (Optional[int]): Number of folder levels to list, None for all
+        cursor (Optional[tuple]): Parent key and name of the last entry already listed
+
+    Yields:
+        tuple: The key of the parent folder and the IndexEntry of each item
+    """
+    stack = [(search_path, 1)]
+    while stack:
+        directory, depth = stack.pop()
+        parent = _listing_key(working_directory, directory)
+        # Folders sorting before the cursor that do not contain it were listed entirely
+        if cursor and parent < cursor[0] and cursor[0][: len(parent)] != parent:
+            continue
+
+        try:
+            entries = directory_index.scandir(directory)
+        except OSError:
+            continue
+
+        entries = [entry for entry in entries if entry.name != TRASH_DIRECTORY_NAME]
+
+        if not cursor or parent > cursor[0]:
+            yield from ((parent, entry) for entry in entries)
+        elif parent == cursor[0]:
+            yield from ((parent, entry) for entry in entries if entry.name > cursor[1])
+
+        if max_depth is None or depth < max_depth:
+            stack.extend(
+                (entry.path, depth + 1)
+                for entry in reversed(entries)
+                if entry.is_dir and not entry.is_link
+            )
+
+
 @tool
 def list_items(
     working_directory: str,
     path: Optional[str] = None,
     item_type: Optional[Literal["files", "folders", "all"]] = "all",
     recursive: bool = False,
+    pattern: Optional[str] = None,
+    extensions: Optional[List[str]] = None,
+    max_depth: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    output_format: Literal["lines", "grouped"] = "lines",
 ) -> str:
-    """List files and folders in a directory.
+    """List files and folders in a directory, one page at a time.
 
     Args:
         working_directory (str): Base directory where operations are performed
         path (Optional[str]): Path to list items from, relative to working_directory. If None, uses working_directory
         item_type (Optional[Literal["files", "folders", "all"]]): Filter results by type
         recursive (bool): If True, lists items in subdirectories as well
+        pattern (Optional[str]): Glob pattern the item names must match (e.g. "*lease*"). Matched against the relative path if it contains a path separator
+        extensions (Optional[List[str]]): Only list files with these extensions (e.g. [".pdf", ".docx"])
+        max_depth (Optional[int]): Number of folder levels to list (1 lists only the folder itself). Implies recursive when above 1
+        limit (Optional[int]): Maximum number of items to return. Defaults to the configured page size
+        cursor (Optional[str]): Continue a previous listing after this item, as given at the end of that listing
+        output_format (Literal["lines", "grouped"]): "lines" lists one relative path per line; "grouped" lists each folder once, followed by the names of its items
 
     Returns:
-        str: Formatted string listing all items found, with icons for files (📄) and folders (📁)
+        str: Formatted string listing the items found, with icons for files (📄) and folders (📁), and the cursor of the next page if there are more items
     """
     search_path = _get_full_path(working_directory, path)
 
     if not os.path.exists(search_path):
         return f"Path '{path if path else 'working directory'}' does not exist"
 
-    items = []
-    if recursive:
-        for root, dirs, files in os.walk(search_path):
-            rel_root = os.path.relpath(root, working_directory)
-            if item_type in ["folders", "all"] and rel_root != ".":
-                items.append(f"📁 {rel_root}")
-            if item_type in ["files", "all"]:
-                items.extend(f"📄 {os.path.join(rel_root, f)}" for f in files)
-    else:
-        with os.scandir(search_path) as entries:
-            for entry in entries:
-                rel_path = os.path.relpath(entry.path, working_directory)
-                if entry.is_file() and item_type in ["files", "all"]:
-                    items.append(f"📄 {rel_path}")
-                elif entry.is_dir() and item_type in ["folders", "all"]:
-                    items.append(f"📁 {rel_path}")
-
-    if not items:
+    directory_index.watch(working_directory)
+
+    if max_depth is None and not recursive:
+        max_depth = 1
+    limit = limit or LIST_ITEMS_PAGE_SIZE
+    extensions = {
+        ext.lower() if ext.startswith(".") else f".{ext.lower()}"
+        for ext in extensions or []
+    }
+    cursor_key = None
+    if cursor:
+        cursor_parts = _listing_key(
+            working_directory, _get_full_path(working_directory, cursor)
+        )
+        cursor_key = (cursor_parts[:-1], cursor_parts[-1])
+
+    def matches(parent: tuple, entry) -> bool:
+        if entry.is_dir:
+            if item_type not in ["folders", "all"] or extensions:
+                return False
+        elif item_type not in ["files", "all"]:
+            return False
+        elif extensions and os.path.splitext(entry.name)[1].lower() not in extensions:
+            return False
+        if pattern:
+            if "/" in pattern or os.sep in pattern:
+                rel_path = "/".join(parent + (entry.name,))
+                return fnmatch.fnmatch(rel_path, pattern.replace(os.sep, "/"))
+            return fnmatch.fnmatch(entry.name, pattern)
+        return True
+
+    matching = (
+        (parent, entry)
+        for parent, entry in _iter_listing(
+            working_directory, search_path, max_depth, cursor_key
+        )
+        if matches(parent, entry)
+    )
+    # One item more than the page shows whether there is a next page
+    page = list(itertools.islice(matching, limit + 1))
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    if not page:
+        if cursor:
+            return f"No more {item_type} found after '{cursor}'"
         return f"No {item_type} found in {path if path else 'working directory'}"
 
-    return "\n".join(sorted(items))
+    lines = []
+    if output_format == "grouped":
+        current_parent = None
+        for parent, entry in page:
+            if parent != current_parent:
+                lines.append(f"📁 {os.path.join(*parent, '') if parent else './'}")
+                current_parent = parent
+            lines.append(f"  {'📁' if entry.is_dir else '📄'} {entry.name}")
+    else:
+        for parent, entry in page:
+            rel_path = os.path.join(*parent, entry.name)
+            lines.append(f"{'📁' if entry.is_dir else '📄'} {rel_path}")
+
+    if has_more:
+        last_parent, last_entry = page[-1]
+        next_cursor = os.path.join(*last_parent, last_entry.name)
+        lines.append(
+            f"... more items not shown. Call again with cursor='{next_cursor}' for the next page"
+        )
+
+    return "\n".join(lines)
+
+
+@tool
+def trash_status(working_directory: str) -> str:
+    """Show the deleted items that are still in the trash and can be restored.
+
+    Args:
+        working_directory (str): Base directory where operations are performed
+
+    Returns:
+        str: One line per item with its original path, its trash location and when it will be removed
+    """
+    entries = trash.list_entries()
+    if not entries:
+        return "The trash is empty"
+
+    lines = []
+    for entry in entries:
+        if entry.state == "reaping":
+            status = "being removed"
+        else:
+            remaining = entry.trashed_at + trash.retention_seconds - time.time()
+            status = f"removed in {max(int(remaining // 60), 0)} min"
+        lines.append(
+            f"{'📁' if entry.item_type == 'folder' else '📄'} {entry.original_path} -> {entry.trash_path} ({status})"
+        )
+    return "\n".join(lines)
+
+
+@tool
+def search_documents(
+    working_directory: str,
+    query: str,
+    path: Optional[str] = None,
+    limit: int = 10,
+    match_all: bool = False,
+) -> str:
+    """Search the contents and names of the documents in a directory and its subdirectories.
+
+    Uses a local full-text index, so it is fast and suited to finding the documents
+    to analyze before calling the analysis tools on the top results only.
+
+    Args:
+        working_directory (str): Base directory where operations are performed
+        query (str): Words to search for
+        path (Optional[str]): Path to search in, relative to working_directory. If None, uses working_directory
+        limit (int): Maximum number of documents to return
+        match_all (bool): If True, only return documents containing every word of the query
+
+    Returns:
+        str: The matching documents, best first, one per line with a snippet of the matching text
+    """
+    search_path = _get_full_path(working_directory, path)
+
+    if not search_index.enabled:
+        return "Document search is disabled"
+    if not os.path.isdir(search_path):
+        return f"Path '{path if path else 'working directory'}' does not exist"
+
+    complete = search_index.ensure_fresh(search_path)
+    hits = search_index.search(search_path, query, limit=limit, match_all=match_all)
+
+    lines = [
+        f"📄 {os.path.relpath(hit.path, working_directory)}: {hit.snippet}"
+        for hit in hits
+    ]
+    if not lines:
+        lines.append(f"No documents found matching '{query}'")
+    if not complete:
+        lines.append(
+            "... indexing is still in progress, call again later for complete results"
+        )
+    return "\n".join(lines)
 
 
 @tool
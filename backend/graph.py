@@ -6,16 +6,22 @@ from langchain_core.runnables import Runnable, RunnableLambda
 from langgraph.checkpoint.memory import MemorySaver
 from prompts import primary_assistant_prompt
 from llm import llm
-from config import WORKING_DIRECTORY
+from config import (
+    WORKING_DIRECTORY,
+    CHECKPOINT_BACKEND,
+    CHECKPOINT_DB_PATH,
+    AGENT_MODE,
+)
+from sqlite_checkpointer import SqliteCheckpointSaver
 from tools import (
     create_tool_node_with_fallback,
     safe_tools,
     sensitive_tools,
-    sensitive_tool_names,
     process_tools_output,
 )
 from state import State
-from message_utils import filter_messages
+from conversation_context import conversation_context
+from planner import Plan, add_plan_nodes
 
 
 class Assistant:
@@ -24,8 +30,9 @@ class Assistant:
 
     def __call__(self, state: State):
         current_wd = state.get("working_directory", WORKING_DIRECTORY)
-        # Filter messages before passing to the prompt
-        filtered_state = {**state, "messages": filter_messages(state["messages"])}
+        # Send the filtered history that fits the token budget
+        messages = conversation_context.build(state["messages"])
+        filtered_state = {**state, "messages": messages}
         current_runnable = (
             primary_assistant_prompt.partial(working_directory=current_wd)
             | self.runnable
@@ -39,7 +46,7 @@ class Assistant:
             or isinstance(result.content, list)
             and not result.content[0].get("text")
         ):
-            messages = state["messages"] + [("user", "Respond with a real output.")]
+            messages = messages + [("user", "Respond with a real output.")]
             state = {
                 **state,
                 "messages": messages,
@@ -55,7 +62,11 @@ def get_initial_state():
 
 
 def route_tools(state: State):
-    """Route messages to appropriate tool nodes based on tool calls."""
+    """Route messages with tool calls to the tool scheduler.
+
+    Safe and sensitive tool calls go to the same node, which orders them by
+    the paths they touch instead of serializing the whole message.
+    """
     next_node = tools_condition(state)
     if next_node == END:
         return END
@@ -64,34 +75,37 @@ def route_tools(state: State):
     if not hasattr(ai_message, "tool_calls") or not ai_message.tool_calls:
         return END
 
-    has_sensitive_tools = any(
-        tool_call.get("name", "") in sensitive_tool_names
-        for tool_call in ai_message.tool_calls
-    )
-
-    return "sensitive_tools" if has_sensitive_tools else "safe_tools"
+    return "tools"
 
 
 builder = StateGraph(State)
 
-# Initialize assistant with all tools
-assistant_runnable = llm.bind_tools(safe_tools + sensitive_tools)
-builder.add_node("assistant", Assistant(assistant_runnable))
-builder.add_node("safe_tools", create_tool_node_with_fallback(safe_tools))
-builder.add_node("sensitive_tools", create_tool_node_with_fallback(sensitive_tools))
-builder.add_node("process_output", RunnableLambda(process_tools_output))
+if AGENT_MODE == "plan":
+    # The model plans all tool calls at once and is only asked again when needed
+    planner_runnable = llm.bind_tools(
+        safe_tools + sensitive_tools + [Plan], tool_choice="Plan"
+    )
+    add_plan_nodes(builder, planner_runnable, safe_tools + sensitive_tools)
+else:
+    # Initialize assistant with all tools
+    assistant_runnable = llm.bind_tools(safe_tools + sensitive_tools)
+    builder.add_node("assistant", Assistant(assistant_runnable))
+    builder.add_node(
+        "tools", create_tool_node_with_fallback(safe_tools + sensitive_tools)
+    )
+    builder.add_node("process_output", RunnableLambda(process_tools_output))
 
-builder.add_edge(START, "assistant")
-builder.add_conditional_edges(
-    "assistant", route_tools, ["safe_tools", "sensitive_tools", END]
-)
-builder.add_edge("safe_tools", "process_output")
-builder.add_edge("sensitive_tools", "process_output")
-builder.add_edge("process_output", "assistant")
+    builder.add_edge(START, "assistant")
+    builder.add_conditional_edges("assistant", route_tools, ["tools", END])
+    builder.add_edge("tools", "process_output")
+    builder.add_edge("process_output", "assistant")
 
-memory = MemorySaver()
+if CHECKPOINT_BACKEND == "sqlite":
+    memory = SqliteCheckpointSaver(CHECKPOINT_DB_PATH)
+else:
+    memory = MemorySaver()
 
 graph = builder.compile(
     checkpointer=memory,
-    # interrupt_before=["sensitive_tools"],
+    # interrupt_before=["tools"],
 )
@@ -0,0 +1,191 @@
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import (
+    KEYWORD_CLASSIFIER_NAME_WEIGHT,
+    KEYWORD_CLASSIFIER_STRONG_SCORE,
+)
+from categories_manager import CategoriesManager
+from categories import categories_manager
+
+# Each occurrence of a value after the first adds this share of its weight, up
+# to KEYWORD_MAX_OCCURRENCES occurrences
+REPEAT_WEIGHT = 0.25
+KEYWORD_MAX_OCCURRENCES = 5
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase a text and reduce everything but words to single spaces.
+
+    The result starts and ends with a space, so that patterns normalized the
+    same way only match whole words.
+    """
+    return " " + " ".join(re.sub(r"[\W_]+", " ", text.lower()).split()) + " "
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher finding all patterns in a single pass."""
+
+    def __init__(self, patterns: List[str]):
+        """Build the automaton.
+
+        Args:
+            patterns (List[str]): The patterns to find
+        """
+        self.patterns = patterns
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(pattern_id)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = (
+                    self._output[next_state] + self._output[self._fail[next_state]]
+                )
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Find the patterns occurring in a text, including overlapping ones.
+
+        Args:
+            text (str): The text to scan
+
+        Yields:
+            Tuple[int, int]: The pattern index and the end position of each occurrence
+        """
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for pattern_id in self._output[state]:
+                yield pattern_id, position
+
+
+@dataclass
+class CategoryMatch:
+    """The category found for a document by keyword matching."""
+
+    category: str
+    confidence: float
+    score: float
+    keywords: List[str] = field(default_factory=list)
+
+
+class KeywordClassifier:
+    """Local pre-classifier matching category values in document names and text.
+
+    The values listed for each category (e.g. "board resolution") are compiled
+    into one Aho-Corasick automaton, so a document is scanned once whatever
+    the number of categories. The automaton is rebuilt whenever the version of
+    the categories changes.
+    """
+
+    def __init__(self, manager: CategoriesManager):
+        """Initialize the classifier.
+
+        Args:
+            manager (CategoriesManager): The manager holding the categories
+        """
+        self.manager = manager
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._matcher: Optional[AhoCorasick] = None
+        # Normalized pattern index mapped to the categories listing it, with its original value
+        self._pattern_categories: List[List[Tuple[str, str]]] = []
+
+    def _get_matcher(self) -> Tuple[AhoCorasick, List[List[Tuple[str, str]]]]:
+        """Return the automaton of the current categories, rebuilding it if they changed."""
+        version = self.manager.get_version()
+        with self._lock:
+            if self._matcher is None or self._version != version:
+                patterns: Dict[str, List[Tuple[str, str]]] = {}
+                for category, values in self.manager.get_categories().items():
+                    for value in values:
+                        pattern = normalize_text(value)
+                        if pattern.strip():
+                            patterns.setdefault(pattern, []).append((category, value))
+                self._matcher = AhoCorasick(list(patterns))
+                self._pattern_categories = list(patterns.values())
+                self._version = version
+            return self._matcher, self._pattern_categories
+
+    def classify(self, file_name: str, text: str = "") -> Optional[CategoryMatch]:
+        """Find the category whose values best match a document.
+
+        Values found in the file name weigh more than values found in the text,
+        and longer values weigh more than single words. The confidence is the
+        share of the best category in the total score, reduced when the best
+        score is below KEYWORD_CLASSIFIER_STRONG_SCORE.
+
+        Args:
+            file_name (str): Name of the document file
+            text (str): Text extracted from the document
+
+        Returns:
+            Optional[CategoryMatch]: The best category, or None if no value matched
+        """
+        matcher, pattern_categories = self._get_matcher()
+        if not matcher.patterns:
+            return None
+
+        occurrences: Dict[int, int] = {}
+        in_name = {
+            pattern_id
+            for pattern_id, _ in matcher.iter_matches(
+                normalize_text(re.sub(r"\.\w+$", "", file_name))
+            )
+        }
+        for pattern_id, _ in matcher.iter_matches(normalize_text(text)):
+            occurrences[pattern_id] = occurrences.get(pattern_id, 0) + 1
+
+        scores: Dict[str, float] = {}
+        keywords: Dict[str, List[str]] = {}
+        for pattern_id in in_name | set(occurrences):
+            weight = len(matcher.patterns[pattern_id].split())
+            count = min(occurrences.get(pattern_id, 0), KEYWORD_MAX_OCCURRENCES)
+            score = weight * (
+                (KEYWORD_CLASSIFIER_NAME_WEIGHT if pattern_id in in_name else 0)
+                + (1 + REPEAT_WEIGHT * (count - 1) if count else 0)
+            )
+            for category, value in pattern_categories[pattern_id]:
+                scores[category] = scores.get(category, 0) + score
+                keywords.setdefault(category, []).append(value)
+
+        if not scores:
+            return None
+        best = max(scores, key=lambda category: (scores[category], category))
+        confidence = (scores[best] / sum(scores.values())) * min(
+            1.0, scores[best] / KEYWORD_CLASSIFIER_STRONG_SCORE
+        )
+        return CategoryMatch(
+            category=best,
+            confidence=round(confidence, 3),
+            score=scores[best],
+            keywords=sorted(keywords[best]),
+        )
+
+
+keyword_classifier = KeywordClassifier(categories_manager)
@@ -1,8 +1,8 @@
 import time
 import json
-import boto3
 from langchain_aws import ChatBedrock as Bedrock
 from config import BEDROCK_INSTRUCTIONS_MODEL_ID, AWS_DEFAULT_REGION, DEBUG_LLM
+from bedrock_client import get_bedrock_client
 
 
 class TimedBedrock(Bedrock):
@@ -152,10 +152,6 @@ class TimedBedrock(Bedrock):
         return result
 
 
-def get_bedrock_client(region):
-    return boto3.client("bedrock-runtime", region_name=region)
-
-
 def create_bedrock_llm(client):
     return TimedBedrock(
         model_id=BEDROCK_INSTRUCTIONS_MODEL_ID,
@@ -165,4 +161,4 @@ def create_bedrock_llm(client):
     )
 
 
-llm = create_bedrock_llm(get_bedrock_client(region="us-east-1"))
+llm = create_bedrock_llm(get_bedrock_client(region=AWS_DEFAULT_REGION))
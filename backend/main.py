@@ -1,6 +1,7 @@
 import os
+import argparse
 import warnings
-from agent_runner import AgentRunner
+from agent_runner import AgentRunner, StreamEvent
 import config
 
 # Suppress the specific deprecation warning from botocore
@@ -12,13 +13,47 @@ def setup_aws_credentials():
     os.environ["AWS_DEFAULT_REGION"] = config.AWS_DEFAULT_REGION
 
 
+def print_stream_event(event: StreamEvent):
+    """Print the assistant's tokens and tool calls as they happen."""
+    if event.kind == "token":
+        print(event.text, end="", flush=True)
+    elif event.kind == "tool_start":
+        args = ", ".join(
+            f"{key}={value!r}"
+            for key, value in event.tool_args.items()
+            if key != "working_directory"
+        )
+        print(f"\n\033[96m→ {event.tool_name}({args})\033[0m", flush=True)
+    elif event.kind == "tool_end":
+        if event.is_error:
+            print(f"\033[91m✗ {event.tool_name} failed\033[0m", flush=True)
+        else:
+            print(f"\033[96m✓ {event.tool_name} done\033[0m", flush=True)
+    elif event.kind == "progress":
+        print(f"\033[96m  {event.text}\033[0m", flush=True)
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Folder Bot")
+    parser.add_argument(
+        "--resume", metavar="THREAD_ID", help="Resume a previous conversation"
+    )
+    args = parser.parse_args()
+
     setup_aws_credentials()
 
-    working_directory = config.WORKING_DIRECTORY
-    agent_runner = AgentRunner(working_directory, debug=True)
+    # The per-event debug dump would be interleaved with the streamed output
+    agent_runner = AgentRunner(
+        config.WORKING_DIRECTORY,
+        debug=not config.STREAM_OUTPUT,
+        thread_id=args.resume,
+    )
+    working_directory = agent_runner.working_directory
+    if args.resume and not agent_runner.resumed:
+        print(f"No saved conversation {args.resume}, starting a new one")
 
     print(f"Folder Bot initialized! Working directory: {working_directory}")
+    print(f"Conversation: {agent_runner.thread_id}")
     print("Type 'exit' to quit")
 
     while True:
@@ -29,8 +64,13 @@ def main():
         if user_input.lower() == "exit":
             break
 
-        result = agent_runner.run(user_input)
-        print(f"\nAI Response: {result.result_message}")
+        if config.STREAM_OUTPUT:
+            print("\nAI Response: ", end="", flush=True)
+            result = agent_runner.run(user_input, on_event=print_stream_event)
+            print()
+        else:
+            result = agent_runner.run(user_input)
+            print(f"\nAI Response: {result.result_message}")
         print(f"Analysis tokens used: {result.analysis_tokens}")
         print(f"Instruction tokens used: {result.instruction_tokens}")
         print(
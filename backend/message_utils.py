@@ -27,19 +27,20 @@ def filter_message_content(content: Any) -> Any:
     return content
 
 
+def filter_message(msg: AnyMessage) -> AnyMessage:
+    """Filter out specified fields from a message."""
+    if not FILTER_PROMPT_MESSAGES or not hasattr(msg, "content"):
+        return msg
+
+    return msg.__class__(
+        content=filter_message_content(msg.content),
+        **{k: v for k, v in msg.__dict__.items() if k != "content"}
+    )
+
+
 def filter_messages(messages: List[AnyMessage]) -> List[AnyMessage]:
     """Filter out specified fields from all messages."""
     if not FILTER_PROMPT_MESSAGES:
         return messages
 
-    return [
-        (
-            msg.__class__(
-                content=filter_message_content(msg.content),
-                **{k: v for k, v in msg.__dict__.items() if k != "content"}
-            )
-            if hasattr(msg, "content")
-            else msg
-        )
-        for msg in messages
-    ]
+    return [filter_message(msg) for msg in messages]
@@ -0,0 +1,194 @@
+import os
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+import datetime
+from typing import Dict, Optional
+
+from config import LOCAL_DATE_SEARCH_CHARS
+
+MONTHS = {
+    name: number
+    for number, names in enumerate(
+        [
+            ("january", "jan"),
+            ("february", "feb"),
+            ("march", "mar"),
+            ("april", "apr"),
+            ("may",),
+            ("june", "jun"),
+            ("july", "jul"),
+            ("august", "aug"),
+            ("september", "sep", "sept"),
+            ("october", "oct"),
+            ("november", "nov"),
+            ("december", "dec"),
+        ],
+        start=1,
+    )
+    for name in names
+}
+_MONTH = r"(?P<month_name>" + "|".join(sorted(MONTHS, key=len, reverse=True)) + r")\.?"
+_DAY = r"(?P<day>[0-3]?\d)(?:st|nd|rd|th)?"
+_YEAR = r"(?P<year>(?:19|20)\d{2})"
+
+# Unambiguous date notations; numeric day/month orders such as 03/04/2021 are
+# left to the model
+DATE_PATTERNS = [
+    re.compile(rf"(?<!\d){_YEAR}[-_. ](?P<month>[01]?\d)[-_. ](?P<day>[0-3]?\d)(?!\d)"),
+    re.compile(
+        rf"(?<!\d){_YEAR}(?P<month>0[1-9]|1[0-2])(?P<day>0[1-9]|[12]\d|3[01])(?!\d)"
+    ),
+    re.compile(rf"\b{_DAY}(?:\s+day)?(?:\s+of)?[\s,-]+{_MONTH}[\s,-]+{_YEAR}\b", re.I),
+    re.compile(rf"\b{_MONTH}[\s-]+{_DAY},?[\s-]+{_YEAR}\b", re.I),
+]
+
+# Phrases introducing the effective or signing date of a document
+DATED_LINE = re.compile(
+    r"\b(?:dated|effective(?:\s+date)?|made|entered\s+into|signed|executed)"
+    r"(?:\s+(?:as\s+)?(?:of|on|at))?(?:\s+the)?[\s:]+",
+    re.I,
+)
+
+# Titles set by templates and conversion tools rather than by the author
+GENERIC_TITLE = re.compile(
+    r"^(?:microsoft\s+(?:word|powerpoint|excel)\b.*|untitled.*|document\s*\d*"
+    r"|presentation\s*\d*|powerpoint\s+presentation|title|slide\s*\d*|draft"
+    r"|.*\.(?:docx?|pptx?|pdf|rtf|txt))$",
+    re.I,
+)
+
+CORE_PROPERTIES_NS = {"dc": "http://purl.org/dc/elements/1.1/"}
+
+
+def parse_date(text: str, anchored: bool = False) -> Optional[str]:
+    """Find the first unambiguous date in a text.
+
+    Args:
+        text (str): The text to search
+        anchored (bool): Whether the date has to start the text
+
+    Returns:
+        Optional[str]: The date in ISO format (YYYY-MM-DD), or None if none was found
+    """
+    found = []
+    for pattern in DATE_PATTERNS:
+        matches = [pattern.match(text)] if anchored else pattern.finditer(text)
+        for match in matches:
+            if match is None:
+                continue
+            groups = match.groupdict()
+            month = (
+                MONTHS[groups["month_name"].lower()]
+                if groups.get("month_name")
+                else int(groups["month"])
+            )
+            try:
+                value = datetime.date(int(groups["year"]), month, int(groups["day"]))
+            except ValueError:
+                continue
+            found.append((match.start(), value))
+            break
+    if not found:
+        return None
+    return min(found)[1].isoformat()
+
+
+def find_date_in_name(file_name: str) -> Optional[str]:
+    """Find a date in a file name such as "2021-03-04 Board Minutes.pdf"."""
+    return parse_date(os.path.splitext(file_name)[0])
+
+
+def find_dated_line(text: str) -> Optional[str]:
+    """Find the date of a document in an early line such as "dated as of 4 March 2021".
+
+    Args:
+        text (str): The text of the document
+
+    Returns:
+        Optional[str]: The date in ISO format, or None if no such line was found
+    """
+    head = text[:LOCAL_DATE_SEARCH_CHARS]
+    for match in DATED_LINE.finditer(head):
+        value = parse_date(head[match.end() : match.end() + 40], anchored=True)
+        if value:
+            return value
+    return None
+
+
+def _clean_title(title: Optional[str]) -> Optional[str]:
+    """Return a title from document properties, or None if it looks generic."""
+    if not title:
+        return None
+    title = " ".join(title.replace("\x00", "").split())
+    if len(title) < 3 or len(title) > 200 or not re.search(r"[^\W\d_]", title):
+        return None
+    if GENERIC_TITLE.match(title):
+        return None
+    return title
+
+
+def read_document_title(full_path: str) -> Optional[str]:
+    """Read the title recorded in the properties of a DOCX, PPTX or PDF file.
+
+    Args:
+        full_path (str): Path of the document
+
+    Returns:
+        Optional[str]: The title, or None if there is none or it looks generic
+    """
+    extension = os.path.splitext(full_path)[1].lower()
+    try:
+        if extension in (".docx", ".pptx", ".xlsx"):
+            with zipfile.ZipFile(full_path) as archive:
+                root = ET.fromstring(archive.read("docProps/core.xml"))
+            return _clean_title(root.findtext("dc:title", None, CORE_PROPERTIES_NS))
+        if extension == ".pdf":
+            from pdfminer.pdfparser import PDFParser
+            from pdfminer.pdfdocument import PDFDocument
+            from pdfminer.pdftypes import resolve1
+            from pdfminer.utils import decode_text
+
+            with open(full_path, "rb") as f:
+                document = PDFDocument(PDFParser(f))
+                for info in document.info:
+                    title = resolve1(info.get("Title"))
+                    if isinstance(title, bytes):
+                        title = decode_text(title)
+                    if isinstance(title, str):
+                        return _clean_title(title)
+    except Exception:
+        # Missing or damaged properties are left to the model
+        return None
+    return None
+
+
+def extract_fields(
+    full_path: str, title: bool = False, date: bool = False, text: str = ""
+) -> Dict[str, str]:
+    """Extract the title and date of a document without the model where reliable.
+
+    The title is read from the document properties. The date is taken from the
+    file name or, if the text is given, from a line such as "dated as of ...".
+
+    Args:
+        full_path (str): Path of the document
+        title (bool): Whether to extract the title
+        date (bool): Whether to extract the date
+        text (str): Text of the document; if empty, the text is not searched
+
+    Returns:
+        Dict[str, str]: The fields found, among "title" and "date"
+    """
+    results = {}
+    if title:
+        found_title = read_document_title(full_path)
+        if found_title:
+            results["title"] = found_title
+    if date:
+        found_date = find_date_in_name(os.path.basename(full_path))
+        if not found_date and text:
+            found_date = find_dated_line(text)
+        if found_date:
+            results["date"] = found_date
+    return results
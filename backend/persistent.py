@@ -0,0 +1,485 @@
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+# Number of children per node; 2**BITS
+BITS = 5
+WIDTH = 1 << BITS
+MASK = WIDTH - 1
+# Bits of the key hashes used by the map; keys with the same hash share a leaf
+HASH_BITS = 64
+# Maximum number of keys in a leaf of the map index before it is split
+LEAF_SIZE = 128
+
+
+class ChunkedList(Sequence):
+    """Immutable append-only list stored as a trie of fixed-size chunks.
+
+    Items are appended to a tail chunk; full chunks are moved into a trie with
+    WIDTH children per node. Appending copies at most the tail and one path of
+    the trie, so it takes O(log n) time whatever the length of the list, and
+    the other chunks are shared with the previous versions of the list.
+    """
+
+    __slots__ = ("_count", "_shift", "_root", "_tail")
+
+    def __init__(self, items: Iterable[Any] = ()):
+        """Create a list holding the given items."""
+        self._count = 0
+        self._shift = BITS
+        self._root: tuple = ()
+        self._tail: tuple = ()
+        if items:
+            self._extend_in_place(items)
+
+    @classmethod
+    def _make(cls, count: int, shift: int, root: tuple, tail: tuple) -> "ChunkedList":
+        result = cls.__new__(cls)
+        result._count = count
+        result._shift = shift
+        result._root = root
+        result._tail = tail
+        return result
+
+    def _tail_offset(self) -> int:
+        return self._count - len(self._tail)
+
+    def _push_chunk(self, level: int, node: tuple, chunk: tuple) -> tuple:
+        """Return a copy of a node with a full chunk added at the end of its subtree."""
+        index = ((self._count - 1) >> level) & MASK
+        if level == BITS:
+            child = chunk
+        elif index < len(node):
+            child = self._push_chunk(level - BITS, node[index], chunk)
+        else:
+            child = self._new_path(level - BITS, chunk)
+        if index < len(node):
+            return node[:index] + (child,) + node[index + 1 :]
+        return node + (child,)
+
+    @staticmethod
+    def _new_path(level: int, chunk: tuple) -> tuple:
+        node = chunk
+        while level > 0:
+            node = (node,)
+            level -= BITS
+        return node
+
+    def _set_chunk(self, level: int, node: tuple, index: int, chunk: tuple) -> tuple:
+        """Return a copy of a node with the chunk holding an index replaced."""
+        if level == 0:
+            return chunk
+        position = (index >> level) & MASK
+        child = self._set_chunk(level - BITS, node[position], index, chunk)
+        return node[:position] + (child,) + node[position + 1 :]
+
+    def _extend_in_place(self, items: Iterable[Any]) -> None:
+        """Append items to this instance; only used while it is not shared."""
+        tail = list(self._tail)
+        for item in items:
+            if len(tail) == WIDTH:
+                self._move_tail(tuple(tail))
+                tail = []
+            tail.append(item)
+            self._count += 1
+        self._tail = tuple(tail)
+
+    def _move_tail(self, chunk: tuple) -> None:
+        """Move a full tail chunk into the trie, adding a level if the trie is full."""
+        if (self._count >> BITS) > (1 << self._shift):
+            self._root = (self._root, self._new_path(self._shift, chunk))
+            self._shift += BITS
+        else:
+            self._root = self._push_chunk(self._shift, self._root, chunk)
+
+    def extend(self, items: Iterable[Any]) -> "ChunkedList":
+        """Return a new list with the items appended."""
+        result = self._make(self._count, self._shift, self._root, self._tail)
+        result._extend_in_place(items)
+        return result
+
+    def append(self, item: Any) -> "ChunkedList":
+        """Return a new list with the item appended."""
+        return self.extend((item,))
+
+    def replace(self, updates: Mapping) -> "ChunkedList":
+        """Return a new list with the items at some indexes replaced.
+
+        Args:
+            updates (Mapping): New items by index
+
+        Returns:
+            ChunkedList: The new list, sharing the unchanged chunks with this one
+        """
+        by_chunk: Dict[int, Dict[int, Any]] = {}
+        for index, item in updates.items():
+            if not 0 <= index < self._count:
+                raise IndexError("ChunkedList index out of range")
+            by_chunk.setdefault(index - (index & MASK), {})[index & MASK] = item
+
+        root, tail = self._root, self._tail
+        tail_offset = self._tail_offset()
+        for start, items in by_chunk.items():
+            chunk = list(tail if start >= tail_offset else self._chunk_for(start))
+            for position, item in items.items():
+                chunk[position] = item
+            if start >= tail_offset:
+                tail = tuple(chunk)
+            else:
+                root = self._set_chunk(self._shift, root, start, tuple(chunk))
+        return self._make(self._count, self._shift, root, tail)
+
+    def changes_since(self, other: "ChunkedList") -> Optional[Dict[int, Any]]:
+        """Find the items replaced or appended since an earlier version of the list.
+
+        Items are compared by identity, and the chunks shared with the other
+        version are skipped, so the cost depends on the number of changes
+        rather than on the length of the list.
+
+        Args:
+            other (ChunkedList): The earlier version
+
+        Returns:
+            Optional[Dict[int, Any]]: The changed items by index, or None if items were removed
+        """
+        if len(self) < len(other) or self._shift < other._shift:
+            return None
+        changes = {}
+        if other._tail_offset():
+            node = self._root
+            level = self._shift
+            while level > other._shift:
+                node = node[0]
+                level -= BITS
+            self._diff_nodes(node, other._root, level, 0, changes)
+        for index in range(other._tail_offset(), self._count):
+            item = self[index]
+            if index >= other._count or item is not other[index]:
+                changes[index] = item
+        return changes
+
+    @classmethod
+    def _diff_nodes(
+        cls, node: tuple, other: tuple, level: int, offset: int, changes: dict
+    ) -> None:
+        """Add the items of a subtree differing from the same subtree of another list."""
+        if node is other:
+            return
+        if level == 0:
+            for position, item in enumerate(other):
+                if node[position] is not item:
+                    changes[offset + position] = node[position]
+            return
+        for position, child in enumerate(other):
+            cls._diff_nodes(
+                node[position],
+                child,
+                level - BITS,
+                offset + (position << level),
+                changes,
+            )
+
+    def __add__(self, other: Iterable[Any]) -> "ChunkedList":
+        return self.extend(other)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _chunk_for(self, index: int) -> tuple:
+        if index >= self._tail_offset():
+            return self._tail
+        node = self._root
+        level = self._shift
+        while level > 0:
+            node = node[(index >> level) & MASK]
+            level -= BITS
+        return node
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("ChunkedList index out of range")
+        return self._chunk_for(index)[index & MASK]
+
+    def _iter_chunks(self, node: tuple, level: int) -> Iterator[tuple]:
+        if level == 0:
+            yield node
+            return
+        for child in node:
+            yield from self._iter_chunks(child, level - BITS)
+
+    def to_list(self) -> list:
+        """Return the items as a plain list."""
+        items = []
+        if self._count > len(self._tail):
+            for chunk in self._iter_chunks(self._root, self._shift):
+                items.extend(chunk)
+        items.extend(self._tail)
+        return items
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._count > len(self._tail):
+            for chunk in self._iter_chunks(self._root, self._shift):
+                yield from chunk
+        yield from self._tail
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, ChunkedList):
+            return self.to_list() == other.to_list()
+        if isinstance(other, (list, tuple)):
+            return self.to_list() == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ChunkedList({self.to_list()!r})"
+
+    def _asdict(self) -> dict:
+        """Plain representation used to serialize the list in checkpoints."""
+        return {"items": self.to_list()}
+
+
+def _hash(key: Any) -> int:
+    return hash(key) & ((1 << HASH_BITS) - 1)
+
+
+def _lookup(node, key_hash: int, key: Any) -> Optional[int]:
+    """Find the value of a key in a hash trie, or None if it is missing."""
+    shift = 0
+    while type(node) is list:
+        node = node[(key_hash >> shift) & MASK]
+        shift += BITS
+    return node.get(key)
+
+
+def _build(items: Dict[Any, int], shift: int = 0):
+    """Build a hash trie holding the items of a dict."""
+    if len(items) <= LEAF_SIZE or shift >= HASH_BITS:
+        return items
+    buckets = [{} for _ in range(WIDTH)]
+    for key, value in items.items():
+        buckets[(_hash(key) >> shift) & MASK][key] = value
+    return [_build(bucket, shift + BITS) for bucket in buckets]
+
+
+def _assoc(node, shift: int, key_hash: int, key: Any, value: int, owned: dict):
+    """Set a key below a hash trie node.
+
+    Nodes are lists of WIDTH children indexed by the next BITS of the key
+    hashes, and leaves are dicts of up to LEAF_SIZE keys. Nodes created by the
+    current operation, recorded in owned by id, are modified in place; the
+    others are copied.
+
+    Returns:
+        The node holding the key
+    """
+    if type(node) is list:
+        index = (key_hash >> shift) & MASK
+        child = node[index]
+        new_child = _assoc(child, shift + BITS, key_hash, key, value, owned)
+        if new_child is not child:
+            if id(node) not in owned:
+                node = list(node)
+                owned[id(node)] = node
+            node[index] = new_child
+        return node
+
+    if id(node) not in owned:
+        node = dict(node)
+        owned[id(node)] = node
+    node[key] = value
+    if len(node) <= LEAF_SIZE or shift >= HASH_BITS:
+        return node
+    children = _build(node, shift)
+    owned[id(children)] = children
+    for child in children:
+        owned[id(child)] = child
+    return children
+
+
+class HashMap(Mapping):
+    """Immutable insertion-ordered map with structural sharing.
+
+    The keys and values are stored in two ChunkedLists, in insertion order,
+    and a hash array mapped trie (HAMT) maps each key to its position. The
+    leaves of the trie are small dicts rather than single keys, which keeps it
+    shallow. Setting a key copies a few chunks and one leaf with the paths
+    leading to them, instead of the whole map; the other nodes are shared with
+    the previous versions of the map.
+    """
+
+    __slots__ = ("_keys", "_values", "_index")
+
+    def __init__(
+        self,
+        items: Union[Mapping, Iterable[Tuple[Any, Any]], None] = None,
+        keys: Optional[Iterable[Any]] = None,
+        values: Optional[Iterable[Any]] = None,
+    ):
+        """Create a map holding the given items.
+
+        Args:
+            items (Union[Mapping, Iterable[Tuple[Any, Any]], None]): A mapping or (key, value) pairs, as taken by dict()
+            keys (Optional[Iterable[Any]]): Keys of the items, when given apart from their values
+            values (Optional[Iterable[Any]]): Values of the items, in the order of the keys
+        """
+        if keys is not None:
+            items = zip(keys, values)
+        items = dict(items or ())
+        self._keys = ChunkedList(items.keys())
+        self._values = ChunkedList(items.values())
+        self._index = _build({key: idx for idx, key in enumerate(items)})
+
+    @classmethod
+    def _make(cls, keys: ChunkedList, values: ChunkedList, index) -> "HashMap":
+        result = cls.__new__(cls)
+        result._keys = keys
+        result._values = values
+        result._index = index
+        return result
+
+    def set(self, key: Any, value: Any) -> "HashMap":
+        """Return a new map with a key set to a value."""
+        return self.merge({key: value})
+
+    def merge(self, items: Mapping) -> "HashMap":
+        """Return a new map with all items of a mapping set.
+
+        New keys are added after the existing ones, in the order of the mapping.
+        The nodes copied for the first items are reused for the next ones, so
+        each node is copied at most once per merge.
+        """
+        if not self._keys:
+            return HashMap(items)
+        index = self._index
+        count = len(self._keys)
+        owned = {}
+        replaced = {}
+        added = {}
+        for key, value in items.items():
+            key_hash = _hash(key)
+            position = _lookup(index, key_hash, key)
+            if position is None:
+                index = _assoc(index, 0, key_hash, key, count + len(added), owned)
+                added[key] = value
+            else:
+                replaced[position] = value
+        keys, values = self._keys, self._values
+        if replaced:
+            values = values.replace(replaced)
+        if added:
+            keys = keys.extend(added.keys())
+            values = values.extend(added.values())
+        return self._make(keys, values, index)
+
+    def changes_since(self, other: "HashMap") -> Optional[Dict[Any, Any]]:
+        """Find the items set since an earlier version of the map.
+
+        Args:
+            other (HashMap): The earlier version
+
+        Returns:
+            Optional[Dict[Any, Any]]: The items set, with new keys in insertion order, or None if the map was not derived from the other one
+        """
+        keys = self._keys.changes_since(other._keys)
+        if keys is None or any(index < len(other) for index in keys):
+            return None
+        values = self._values.changes_since(other._values)
+        if values is None:
+            return None
+        return {
+            keys[index] if index in keys else self._keys[index]: values[index]
+            for index in sorted(values)
+        }
+
+    def __getitem__(self, key: Any) -> Any:
+        position = _lookup(self._index, _hash(key), key)
+        if position is None:
+            raise KeyError(key)
+        return self._values[position]
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        position = _lookup(self._index, _hash(key), key)
+        return default if position is None else self._values[position]
+
+    def __contains__(self, key: Any) -> bool:
+        return _lookup(self._index, _hash(key), key) is not None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def to_dict(self) -> dict:
+        """Return the items of the map as a plain dict."""
+        return dict(zip(self._keys.to_list(), self._values.to_list()))
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._keys)
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def values(self):
+        return self.to_dict().values()
+
+    def items(self):
+        return self.to_dict().items()
+
+    def copy(self) -> "HashMap":
+        # The map is immutable, so copies can share it
+        return self
+
+    def __repr__(self) -> str:
+        return f"HashMap({self.to_dict()!r})"
+
+    def _asdict(self) -> dict:
+        """Plain representation used to serialize the map in checkpoints.
+
+        The keys and values are given as two lists, which serialize as fast as
+        a dict without having to build one.
+        """
+        return {"keys": self._keys.to_list(), "values": self._values.to_list()}
+
+
+def make_delta(old: Any, new: Any) -> Optional[Dict[str, list]]:
+    """Describe the changes between two versions of a persistent collection.
+
+    Args:
+        old (Any): The earlier version
+        new (Any): The later version
+
+    Returns:
+        Optional[Dict[str, list]]: The changes, to be passed to apply_delta, or None if new is not a later version of old or if the changes cover more than half of it
+    """
+    if type(old) is not type(new) or not isinstance(new, (ChunkedList, HashMap)):
+        return None
+    changes = new.changes_since(old)
+    if changes is None or len(changes) * 2 > len(new):
+        return None
+    if isinstance(new, HashMap):
+        return {"keys": list(changes), "values": list(changes.values())}
+    return {"indexes": list(changes), "items": list(changes.values())}
+
+
+def apply_delta(base: Any, delta: Dict[str, list]) -> Any:
+    """Apply changes found by make_delta to the earlier version of a collection.
+
+    Args:
+        base (Any): The earlier version, a ChunkedList or a HashMap
+        delta (Dict[str, list]): The changes
+
+    Returns:
+        Any: The later version
+    """
+    if isinstance(base, HashMap):
+        return base.merge(dict(zip(delta["keys"], delta["values"])))
+    replaced = {}
+    appended = []
+    for index, item in sorted(
+        zip(delta["indexes"], delta["items"]), key=lambda change: change[0]
+    ):
+        if index < len(base):
+            replaced[index] = item
+        else:
+            appended.append(item)
+    return base.replace(replaced).extend(appended)
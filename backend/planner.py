@@ -0,0 +1,231 @@
+import uuid
+from typing import Any, Dict, List, Optional
+
+from typing_extensions import TypedDict
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+from langgraph.graph import StateGraph, START, END
+from langgraph.prebuilt import tools_condition
+from langgraph.store.base import BaseStore
+
+from config import PLAN_MAX_ROUNDS, WORKING_DIRECTORY
+from conversation_context import _get_text, conversation_context
+from prompts import planner_prompt
+from state import State
+from tool_scheduler import ToolScheduler, is_failed_result
+from tools import create_tool_node_with_fallback, process_tools_output
+
+
+class PlanStep(TypedDict):
+    """One tool call of a plan.
+
+    Args:
+        id: Short unique name of the step, e.g. "find_leases"
+        tool: Name of the tool to call
+        args: Arguments of the tool call
+        depends_on: Ids of earlier steps that must succeed before this step runs
+        review: Whether the result of the step is needed to decide what to do next
+    """
+
+    id: str
+    tool: str
+    args: Dict[str, Any]
+    depends_on: List[str]
+    review: bool
+
+
+class Plan(TypedDict):
+    """Plan the tool calls needed for the request; they are run without asking you again.
+
+    Args:
+        steps: The tool calls, in the order they should run
+        response: The answer for the user once all steps succeeded
+    """
+
+    steps: List[PlanStep]
+    response: str
+
+
+def _count_plans(messages: list) -> int:
+    """Count the plans made since the last message of the user."""
+    plans = 0
+    for msg in reversed(messages):
+        if isinstance(msg, HumanMessage):
+            break
+        if isinstance(msg, AIMessage) and msg.tool_calls:
+            plans += 1
+    return plans
+
+
+class Planner:
+    """Node asking the model for a plan of all the tool calls of a request.
+
+    The steps of the plan become the tool calls of the returned message, so the
+    tool results that follow are paired with them as in the react loop. The
+    dependencies between steps, the steps to review and the response are
+    kept in the "plan" state for the executor and the routing.
+    """
+
+    def __init__(self, runnable: Runnable, max_rounds: int = PLAN_MAX_ROUNDS):
+        """Initialize the planner.
+
+        Args:
+            runnable (Runnable): The model, bound to the tools and forced to call Plan
+            max_rounds (int): Plans made for one request before giving up
+        """
+        self.runnable = runnable
+        self.max_rounds = max_rounds
+
+    def __call__(self, state: State):
+        if _count_plans(state["messages"]) >= self.max_rounds:
+            return {
+                "messages": AIMessage(
+                    content=f"Stopped after {self.max_rounds} plans without completing the request."
+                ),
+                "plan": {},
+            }
+
+        current_wd = state.get("working_directory", WORKING_DIRECTORY)
+        messages = conversation_context.build(state["messages"])
+        current_runnable = (
+            planner_prompt.partial(working_directory=current_wd) | self.runnable
+        )
+        result = current_runnable.invoke({**state, "messages": messages})
+
+        plan = next(
+            (
+                tool_call["args"]
+                for tool_call in result.tool_calls
+                if tool_call["name"] == "Plan"
+            ),
+            None,
+        )
+        if plan is None:
+            # The model answered or called the tools directly
+            return {"messages": result, "plan": {}}
+
+        tool_calls = []
+        steps = []
+        index_of = {}
+        for step in plan.get("steps") or []:
+            if not isinstance(step, dict) or not step.get("tool"):
+                continue
+            step_id = str(step.get("id") or len(steps) + 1)
+            tool_calls.append(
+                {
+                    "name": step["tool"],
+                    "args": step.get("args") or {},
+                    "id": f"call_{uuid.uuid4().hex[:24]}",
+                    "type": "tool_call",
+                }
+            )
+            # Only earlier steps can be waited for
+            steps.append(
+                {
+                    "id": step_id,
+                    "requires": sorted(
+                        {
+                            index_of[dep]
+                            for dep in step.get("depends_on") or []
+                            if dep in index_of
+                        }
+                    ),
+                    "review": bool(step.get("review")),
+                }
+            )
+            index_of[step_id] = len(steps) - 1
+
+        response = plan.get("response") or ""
+        usage = {
+            key: value
+            for key, value in result.additional_kwargs.items()
+            if key == "usage"
+        }
+        if not tool_calls:
+            message = AIMessage(
+                content=response or _get_text(result.content) or "Nothing to do.",
+                additional_kwargs=usage,
+            )
+        else:
+            message = AIMessage(
+                content=_get_text(result.content),
+                tool_calls=tool_calls,
+                additional_kwargs=usage,
+            )
+        return {"messages": message, "plan": {"steps": steps, "response": response}}
+
+
+class PlanExecutor(ToolScheduler):
+    """Tool node running a plan without calling the model.
+
+    Besides the path conflicts, each step waits for the steps it depends on,
+    and is not run if one of them failed.
+    """
+
+    def _func(
+        self, input: Any, config: RunnableConfig, *, store: Optional[BaseStore]
+    ) -> Any:
+        tool_calls, input_type = self._parse_input(input, store)
+        plan = (input.get("plan") if isinstance(input, dict) else None) or {}
+        steps = plan.get("steps") or []
+        requires = (
+            [set(step["requires"]) for step in steps]
+            if len(steps) == len(tool_calls)
+            else None
+        )
+        outputs = self._schedule(tool_calls, input_type, config, requires)
+        return self._combine_outputs(outputs, input_type)
+
+
+def route_plan(state: State):
+    """Run the plan if it has steps, else the planner answered the user."""
+    return "executor" if tools_condition(state) == "tools" else END
+
+
+def route_plan_results(state: State):
+    """Plan again if a step failed or needs to be reviewed, else respond."""
+    results = []
+    for msg in reversed(state["messages"]):
+        if not isinstance(msg, ToolMessage):
+            break
+        results.append(msg)
+
+    steps = (state.get("plan") or {}).get("steps") or []
+    # Tool calls made directly by the model are returned to it like in the react loop
+    if not steps or any(step["review"] for step in steps):
+        return "planner"
+    if any(is_failed_result(msg) for msg in results):
+        return "planner"
+    return "respond"
+
+
+def respond(state: State):
+    """Give the response of the plan once all its steps succeeded."""
+    response = (state.get("plan") or {}).get("response")
+    return {"messages": AIMessage(content=response or "Done.")}
+
+
+def add_plan_nodes(builder: StateGraph, runnable: Runnable, tools: list) -> None:
+    """Add the plan-then-execute nodes to a graph builder.
+
+    The planner asks the model for a plan, the executor runs it and the model
+    is only called again when a step failed or its result needs reviewing:
+    planner -> executor -> process_output -> planner or respond.
+
+    Args:
+        builder (StateGraph): The builder of the graph
+        runnable (Runnable): The model, bound to the tools and forced to call Plan
+        tools (list): The tools the plan can call
+    """
+    builder.add_node("planner", Planner(runnable))
+    builder.add_node("executor", create_tool_node_with_fallback(tools, PlanExecutor))
+    builder.add_node("process_output", RunnableLambda(process_tools_output))
+    builder.add_node("respond", respond)
+
+    builder.add_edge(START, "planner")
+    builder.add_conditional_edges("planner", route_plan, ["executor", END])
+    builder.add_edge("executor", "process_output")
+    builder.add_conditional_edges(
+        "process_output", route_plan_results, ["planner", "respond"]
+    )
+    builder.add_edge("respond", END)
@@ -2,6 +2,8 @@ from typing import TypeVar, List, Union, Literal, Dict, Any
 from dataclasses import dataclass
 from typing_extensions import TypedDict, Annotated
 
+from persistent import ChunkedList, HashMap
+
 T = TypeVar("T")
 
 
@@ -15,6 +17,9 @@ class ClearList:
 def accumulate_list(current: List[T], new: Union[List[T], ClearList]) -> List[T]:
     """Generic reducer function that accumulates items in a list with clear capability.
 
+    The result is a ChunkedList sharing its items with the current list, so
+    appending a few items does not copy the whole list.
+
     Args:
         current: The current list
         new: Either a list to accumulate or a ClearList action to clear the list
@@ -23,8 +28,10 @@ def accumulate_list(current: List[T], new: Union[List[T], ClearList]) -> List[T]
         The modified list
     """
     if isinstance(new, ClearList):
-        return []
-    return current + new
+        return ChunkedList()
+    if not isinstance(current, ChunkedList):
+        current = ChunkedList(current or [])
+    return current.extend(new)
 
 
 # Type alias for convenience
@@ -55,6 +62,9 @@ def flexible_map(
 ) -> Dict[str, Dict[str, Any]]:
     """Reducer for a map that supports full updates, partial updates, and clearing.
 
+    The result is a HashMap sharing its entries with the current map, so
+    updating a few files does not copy the metadata of all of them.
+
     Args:
         current: The current map of file paths to their metadata
         new: Either:
@@ -66,17 +76,15 @@ def flexible_map(
         The modified map
     """
     if isinstance(new, ClearMap):
-        return {}
+        return HashMap()
+    if not isinstance(current, HashMap):
+        current = HashMap(current)
 
     if isinstance(new, UpdateItem):
-        result = current.copy()
-        if new.path not in result:
-            result[new.path] = {}
-        result[new.path] = {**result[new.path], **new.updates}
-        return result
+        return current.set(new.path, {**current.get(new.path, {}), **new.updates})
 
     # If it's a dict, merge it with current state
-    return {**current, **new}
+    return current.merge(new)
 
 
 # Type alias for convenience
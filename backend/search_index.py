@@ -0,0 +1,298 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from config import (
+    SEARCH_INDEX_ENABLED,
+    SEARCH_INDEX_PATH,
+    SEARCH_INDEX_EXTENSIONS,
+    SEARCH_INDEX_MAX_CHARS,
+    SEARCH_INDEX_MAX_WORKERS,
+    SEARCH_INDEX_REFRESH_INTERVAL,
+    SEARCH_INDEX_WAIT_SECONDS,
+    TRASH_DIRECTORY_NAME,
+)
+from content_extractor import get_content
+
+# Number of documents written to the index per transaction
+WRITE_BATCH_SIZE = 50
+
+
+@dataclass
+class SearchHit:
+    """A document matching a search query."""
+
+    path: str
+    snippet: str
+    score: float
+
+
+class SearchIndex:
+    """Local full-text index of workspace documents.
+
+    The text returned by get_content is stored in a SQLite FTS5 table together
+    with the file name. The index is refreshed incrementally: only files whose
+    size or mtime changed since they were indexed are extracted again, and
+    files that disappeared are dropped. Refreshes run in the background, so a
+    search answers from the index as it is while a large workspace is indexed.
+    """
+
+    def __init__(self, db_path: str, enabled: bool = True):
+        """Initialize the index.
+
+        Args:
+            db_path (str): Path of the SQLite database file
+            enabled (bool): Whether documents are indexed at all
+        """
+        self.db_path = db_path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn = None
+        self._refreshes: Dict[str, threading.Thread] = {}
+        self._refreshed_at: Dict[str, float] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use and create the schema if needed."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL
+                )
+                """)
+            self._conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                    name, content, tokenize = 'unicode61 remove_diacritics 2'
+                )
+                """)
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _path_range(root: str) -> Tuple[str, str]:
+        """Return the bounds of the paths below a folder in sort order."""
+        prefix = os.path.join(root, "")
+        return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+    def _scan(self, root: str) -> Dict[str, Tuple[int, int]]:
+        """List the indexable files below a folder with their size and mtime.
+
+        Files are stat'ed directly rather than read from the directory index,
+        whose entries are not updated when a file is edited in place.
+        """
+        files = {}
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name == TRASH_DIRECTORY_NAME or entry.is_symlink():
+                            continue
+                        if entry.is_dir():
+                            stack.append(entry.path)
+                        elif (
+                            os.path.splitext(entry.name)[1].lower()
+                            in SEARCH_INDEX_EXTENSIONS
+                        ):
+                            stat = entry.stat()
+                            files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue
+        return files
+
+    def _extract(self, full_path: str) -> str:
+        """Extract the text of a file, or an empty string if it cannot be read."""
+        try:
+            content = get_content(
+                os.path.dirname(full_path),
+                os.path.basename(full_path),
+                max_words=SEARCH_INDEX_MAX_CHARS // 6,
+                max_chars=SEARCH_INDEX_MAX_CHARS,
+            )
+        except Exception:
+            return ""
+        name = os.path.basename(full_path)
+        if content.startswith(f"Error reading file '{name}'") or content.startswith(
+            f"Path '{name}'"
+        ):
+            return ""
+        return content.replace(f"Content of '{name}':\n", "", 1)
+
+    def _write(self, documents: List[Tuple[str, int, int, str]]) -> None:
+        """Insert or replace indexed documents."""
+        with self._lock:
+            conn = self._connect()
+            for path, size, mtime_ns, content in documents:
+                row = conn.execute(
+                    "SELECT id FROM documents WHERE path = ?", (path,)
+                ).fetchone()
+                if row:
+                    doc_id = row[0]
+                    conn.execute(
+                        "UPDATE documents SET size = ?, mtime_ns = ? WHERE id = ?",
+                        (size, mtime_ns, doc_id),
+                    )
+                    conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (doc_id,))
+                else:
+                    doc_id = conn.execute(
+                        "INSERT INTO documents (path, size, mtime_ns) VALUES (?, ?, ?)",
+                        (path, size, mtime_ns),
+                    ).lastrowid
+                conn.execute(
+                    "INSERT INTO documents_fts (rowid, name, content) VALUES (?, ?, ?)",
+                    (doc_id, os.path.basename(path), content),
+                )
+            conn.commit()
+
+    def _remove(self, paths: List[str]) -> None:
+        """Drop documents that no longer exist."""
+        with self._lock:
+            conn = self._connect()
+            for path in paths:
+                row = conn.execute(
+                    "SELECT id FROM documents WHERE path = ?", (path,)
+                ).fetchone()
+                if row:
+                    conn.execute("DELETE FROM documents_fts WHERE rowid = ?", row)
+                    conn.execute("DELETE FROM documents WHERE id = ?", row)
+            conn.commit()
+
+    def refresh(self, root: str) -> int:
+        """Bring the index of a folder up to date.
+
+        Args:
+            root (str): Path of the folder to index
+
+        Returns:
+            int: The number of documents extracted
+        """
+        root = os.path.normpath(os.path.abspath(root))
+        files = self._scan(root)
+
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT path, size, mtime_ns FROM documents "
+                    "WHERE path >= ? AND path < ?",
+                    self._path_range(root),
+                )
+                .fetchall()
+            )
+        indexed = {path: (size, mtime_ns) for path, size, mtime_ns in rows}
+
+        self._remove([path for path in indexed if path not in files])
+        changed = [path for path, stat in files.items() if indexed.get(path) != stat]
+
+        def extract(path: str) -> Tuple[str, int, int, str]:
+            return (path, *files[path], self._extract(path))
+
+        with ThreadPoolExecutor(max_workers=SEARCH_INDEX_MAX_WORKERS) as executor:
+            batch = []
+            for document in executor.map(extract, changed):
+                batch.append(document)
+                if len(batch) >= WRITE_BATCH_SIZE:
+                    self._write(batch)
+                    batch = []
+            if batch:
+                self._write(batch)
+        return len(changed)
+
+    def ensure_fresh(self, root: str, wait: float = SEARCH_INDEX_WAIT_SECONDS) -> bool:
+        """Refresh a folder in the background unless it was refreshed recently.
+
+        Args:
+            root (str): Path of the folder to index
+            wait (float): Seconds to wait for the refresh to finish
+
+        Returns:
+            bool: Whether the index of the folder is complete
+        """
+        root = os.path.normpath(os.path.abspath(root))
+        with self._lock:
+            thread = self._refreshes.get(root)
+            recent = (
+                time.monotonic() - self._refreshed_at.get(root, float("-inf"))
+                < SEARCH_INDEX_REFRESH_INTERVAL
+            )
+            if not thread and not recent:
+
+                def run():
+                    try:
+                        self.refresh(root)
+                    finally:
+                        with self._lock:
+                            self._refreshes.pop(root, None)
+                            self._refreshed_at[root] = time.monotonic()
+
+                thread = threading.Thread(
+                    target=run, name="search-index-refresh", daemon=True
+                )
+                self._refreshes[root] = thread
+                thread.start()
+
+        if thread:
+            thread.join(wait)
+            return not thread.is_alive()
+        return True
+
+    def search(
+        self, root: str, query: str, limit: int = 10, match_all: bool = False
+    ) -> List[SearchHit]:
+        """Find the documents below a folder that best match a query.
+
+        The words of the query are searched in the file names and contents, and
+        documents are ranked by BM25, with matches in file names weighted higher.
+
+        Args:
+            root (str): Path of the folder to search
+            query (str): Words to search for
+            limit (int): Maximum number of documents to return
+            match_all (bool): Whether documents must contain every word instead of any
+
+        Returns:
+            List[SearchHit]: The matching documents, best first
+        """
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return []
+        match = (" AND " if match_all else " OR ").join(f'"{term}"' for term in terms)
+
+        root = os.path.normpath(os.path.abspath(root))
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    """
+                    SELECT documents.path,
+                           snippet(documents_fts, 1, '[', ']', '…', 16),
+                           bm25(documents_fts, 5.0, 1.0) AS rank
+                    FROM documents_fts
+                    JOIN documents ON documents.id = documents_fts.rowid
+                    WHERE documents_fts MATCH ?
+                      AND documents.path >= ? AND documents.path < ?
+                    ORDER BY rank
+                    LIMIT ?
+                    """,
+                    (match, *self._path_range(root), limit),
+                )
+                .fetchall()
+            )
+        return [
+            SearchHit(path=path, snippet=" ".join(snippet.split()), score=-rank)
+            for path, snippet, rank in rows
+        ]
+
+
+search_index = SearchIndex(SEARCH_INDEX_PATH, enabled=SEARCH_INDEX_ENABLED)
@@ -0,0 +1,660 @@
+import os
+import time
+import zlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.serde.types import TASKS
+
+from config import (
+    CHECKPOINT_KEEP_LAST,
+    CHECKPOINT_THREAD_TTL_SECONDS,
+    CHECKPOINT_COMPRESS_MIN_BYTES,
+    CHECKPOINT_DELTA_CHANNELS,
+    CHECKPOINT_SNAPSHOT_INTERVAL,
+)
+from persistent import apply_delta, make_delta
+
+# Suffix of the serialization type of compressed blobs
+COMPRESSED_SUFFIX = "+zlib"
+# Seconds between two removals of idle threads
+EXPIRY_INTERVAL = 3600
+# Serialization type of delta channels without a value
+EMPTY_TYPE = "empty"
+# Number of delta channel values kept in memory to compute the next deltas
+MAX_CACHED_CHANNELS = 256
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[str]):
+    """Durable checkpointer storing graph checkpoints in SQLite.
+
+    Only the last keep_last checkpoints of each thread are kept, and threads
+    that have not been updated for thread_ttl seconds are removed. Serialized
+    checkpoints, metadata and writes larger than compress_min_bytes are stored
+    zlib-compressed. Resuming a thread reads its latest checkpoint only.
+
+    The delta channels, which hold the large state collections, are stored
+    apart from the checkpoints as the changes made since the parent checkpoint,
+    with a full copy every snapshot_interval checkpoints. Their values are
+    rebuilt from the latest full copy when a checkpoint is read. The latest
+    value of each channel is kept in memory to compute the next changes, so
+    writing a checkpoint costs what its step changed rather than the size of
+    the collections.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        keep_last: Optional[int] = CHECKPOINT_KEEP_LAST,
+        thread_ttl: Optional[float] = CHECKPOINT_THREAD_TTL_SECONDS,
+        compress_min_bytes: int = CHECKPOINT_COMPRESS_MIN_BYTES,
+        delta_channels: Sequence[str] = CHECKPOINT_DELTA_CHANNELS,
+        snapshot_interval: int = CHECKPOINT_SNAPSHOT_INTERVAL,
+        *,
+        serde: Optional[SerializerProtocol] = None,
+    ):
+        """Initialize the checkpointer.
+
+        Args:
+            db_path (str): Path of the SQLite database file
+            keep_last (Optional[int]): Number of checkpoints kept per thread, or None to keep all
+            thread_ttl (Optional[float]): Seconds after which an idle thread is removed, or None to keep them
+            compress_min_bytes (int): Serialized values of at least this size are compressed
+            delta_channels (Sequence[str]): Channels stored as changes against the parent checkpoint
+            snapshot_interval (int): Number of checkpoints between two full copies of a delta channel
+            serde (Optional[SerializerProtocol]): The serializer, defaults to LangGraph's
+        """
+        super().__init__(serde=serde)
+        self.db_path = db_path
+        # The latest checkpoint reads the pending sends of its parent
+        self.keep_last = max(keep_last, 2) if keep_last else None
+        self.thread_ttl = thread_ttl
+        self.compress_min_bytes = compress_min_bytes
+        self.delta_channels = tuple(delta_channels)
+        self.snapshot_interval = snapshot_interval
+        self._lock = threading.RLock()
+        # (thread_id, checkpoint_ns, channel) mapped to the checkpoint id, value,
+        # number of deltas since the last full copy and id of that copy
+        self._channels: OrderedDict = OrderedDict()
+        self._conn = None
+        self._expired_at = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use and create the schema if needed."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL,
+                    checkpoint_id TEXT NOT NULL,
+                    parent_checkpoint_id TEXT,
+                    type TEXT NOT NULL,
+                    checkpoint BLOB NOT NULL,
+                    metadata_type TEXT NOT NULL,
+                    metadata BLOB NOT NULL,
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+                );
+                CREATE TABLE IF NOT EXISTS writes (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL,
+                    checkpoint_id TEXT NOT NULL,
+                    task_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    channel TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    task_path TEXT NOT NULL,
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+                );
+                CREATE TABLE IF NOT EXISTS channel_deltas (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL,
+                    checkpoint_id TEXT NOT NULL,
+                    channel TEXT NOT NULL,
+                    base_checkpoint_id TEXT,
+                    snapshot_checkpoint_id TEXT NOT NULL,
+                    depth INTEGER NOT NULL,
+                    type TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, channel)
+                );
+                CREATE TABLE IF NOT EXISTS threads (
+                    thread_id TEXT PRIMARY KEY,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS threads_updated_at ON threads (updated_at);
+                """)
+            self._conn.commit()
+        return self._conn
+
+    def _dump(self, value: Any) -> Tuple[str, bytes]:
+        """Serialize a value, compressing it if it is large."""
+        type_, data = self.serde.dumps_typed(value)
+        if len(data) >= self.compress_min_bytes:
+            return type_ + COMPRESSED_SUFFIX, zlib.compress(data)
+        return type_, data
+
+    def _load(self, type_: str, data: bytes) -> Any:
+        """Deserialize a value stored by _dump."""
+        if type_.endswith(COMPRESSED_SUFFIX):
+            type_ = type_[: -len(COMPRESSED_SUFFIX)]
+            data = zlib.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+    def _make_tuple(
+        self,
+        conn: sqlite3.Connection,
+        thread_id: str,
+        checkpoint_ns: str,
+        row: tuple,
+        metadata: Optional[CheckpointMetadata] = None,
+        cache: bool = False,
+    ) -> CheckpointTuple:
+        """Build a checkpoint tuple from a row of the checkpoints table.
+
+        The values of the delta channels are cached if cache is True, so the
+        next checkpoint of the thread can be stored as changes against them.
+        """
+        (
+            checkpoint_id,
+            parent_checkpoint_id,
+            type_,
+            data,
+            metadata_type,
+            metadata_data,
+        ) = row
+        writes = conn.execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+            "ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        sends = []
+        if parent_checkpoint_id:
+            sends = conn.execute(
+                "SELECT type, value FROM writes "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+                "AND channel = ? ORDER BY task_path, task_id, idx",
+                (thread_id, checkpoint_ns, parent_checkpoint_id, TASKS),
+            ).fetchall()
+
+        checkpoint = self._load(type_, data)
+        channel_values = dict(checkpoint.get("channel_values", {}))
+        for channel in self.delta_channels:
+            value = self._load_channel(
+                conn, thread_id, checkpoint_ns, checkpoint_id, channel, cache
+            )
+            if value is not None:
+                channel_values[channel] = value
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **checkpoint,
+                "channel_values": channel_values,
+                "pending_sends": [self._load(*send) for send in sends],
+            },
+            metadata=(
+                metadata
+                if metadata is not None
+                else self._load(metadata_type, metadata_data)
+            ),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self._load(value_type, value))
+                for task_id, channel, value_type, value in writes
+            ],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Get the checkpoint given by the config, or the latest one of its thread.
+
+        Args:
+            config (RunnableConfig): The config of the thread, optionally with a checkpoint_id
+
+        Returns:
+            Optional[CheckpointTuple]: The checkpoint tuple, or None if there is none
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+        with self._lock:
+            conn = self._connect()
+            if checkpoint_id := get_checkpoint_id(config):
+                row = conn.execute(
+                    f"SELECT {columns} FROM checkpoints "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    f"SELECT {columns} FROM checkpoints "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            if row is None:
+                return None
+            return self._make_tuple(conn, thread_id, checkpoint_ns, row, cache=True)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints, newest first.
+
+        Args:
+            config (Optional[RunnableConfig]): The config of the thread to list, or None for all threads
+            filter (Optional[Dict[str, Any]]): Metadata values the checkpoints must have
+            before (Optional[RunnableConfig]): Only list checkpoints older than this one
+            limit (Optional[int]): Maximum number of checkpoints to return
+
+        Yields:
+            CheckpointTuple: The matching checkpoint tuples
+        """
+        conditions = []
+        params: List[Any] = []
+        if config:
+            conditions.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (
+                checkpoint_ns := config["configurable"].get("checkpoint_ns")
+            ) is not None:
+                conditions.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                conditions.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_checkpoint_id := get_checkpoint_id(before)):
+            conditions.append("checkpoint_id < ?")
+            params.append(before_checkpoint_id)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+                f"type, checkpoint, metadata_type, metadata FROM checkpoints {where} "
+                "ORDER BY thread_id, checkpoint_ns, checkpoint_id DESC",
+                params,
+            ).fetchall()
+
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and limit <= 0:
+                break
+            metadata = self._load(row[4], row[5])
+            if filter and not all(
+                metadata.get(key) == value for key, value in filter.items()
+            ):
+                continue
+            if limit is not None:
+                limit -= 1
+            with self._lock:
+                checkpoint_tuple = self._make_tuple(
+                    self._connect(), thread_id, checkpoint_ns, tuple(row), metadata
+                )
+            yield checkpoint_tuple
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Save a checkpoint and prune the older checkpoints of its thread.
+
+        Args:
+            config (RunnableConfig): The config of the parent checkpoint
+            checkpoint (Checkpoint): The checkpoint to save
+            metadata (CheckpointMetadata): Metadata of the checkpoint
+            new_versions (ChannelVersions): Channel versions written by this checkpoint
+
+        Returns:
+            RunnableConfig: The config of the saved checkpoint
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        stored = checkpoint.copy()
+        stored.pop("pending_sends", None)
+        stored["channel_values"] = {
+            channel: value
+            for channel, value in checkpoint["channel_values"].items()
+            if channel not in self.delta_channels
+        }
+        type_, data = self._dump(stored)
+        metadata_type, metadata_data = self._dump(
+            get_checkpoint_metadata(config, metadata)
+        )
+
+        with self._lock:
+            conn = self._connect()
+            for channel in self.delta_channels:
+                self._put_channel(
+                    conn,
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    channel,
+                    checkpoint["channel_values"].get(channel),
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    type_,
+                    data,
+                    metadata_type,
+                    metadata_data,
+                ),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO threads VALUES (?, ?)", (thread_id, time.time())
+            )
+            if self.keep_last:
+                self._prune(conn, thread_id, checkpoint_ns)
+            conn.commit()
+            self._expire_threads()
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def _put_channel(
+        self,
+        conn: sqlite3.Connection,
+        thread_id: str,
+        checkpoint_ns: str,
+        checkpoint_id: str,
+        parent_checkpoint_id: Optional[str],
+        channel: str,
+        value: Any,
+    ) -> None:
+        """Store the value of a delta channel, as changes if its parent value is cached."""
+        key = (thread_id, checkpoint_ns, channel)
+        cached = self._channels.get(key)
+        delta = None
+        if (
+            cached is not None
+            and cached[0] == parent_checkpoint_id
+            and cached[2] + 1 < self.snapshot_interval
+        ):
+            delta = make_delta(cached[1], value)
+
+        if delta is not None:
+            base_id, snapshot_id, depth = parent_checkpoint_id, cached[3], cached[2] + 1
+            type_, data = self._dump(delta)
+        else:
+            base_id, snapshot_id, depth = None, checkpoint_id, 0
+            type_, data = (EMPTY_TYPE, b"") if value is None else self._dump(value)
+        conn.execute(
+            "INSERT OR REPLACE INTO channel_deltas VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                channel,
+                base_id,
+                snapshot_id,
+                depth,
+                type_,
+                data,
+            ),
+        )
+        self._cache_channel(key, (checkpoint_id, value, depth, snapshot_id))
+
+    def _cache_channel(self, key: tuple, entry: tuple) -> None:
+        """Remember the latest value of a delta channel, evicting the oldest ones."""
+        self._channels[key] = entry
+        self._channels.move_to_end(key)
+        while len(self._channels) > MAX_CACHED_CHANNELS:
+            self._channels.popitem(last=False)
+
+    def _load_channel(
+        self,
+        conn: sqlite3.Connection,
+        thread_id: str,
+        checkpoint_ns: str,
+        checkpoint_id: str,
+        channel: str,
+        cache: bool = False,
+    ) -> Any:
+        """Rebuild the value of a delta channel at a checkpoint.
+
+        The full copy the value is based on is loaded and the changes stored
+        since then are applied to it in order.
+
+        Returns:
+            Any: The value, or None if the channel was empty or not stored apart
+        """
+        key = (thread_id, checkpoint_ns, channel)
+        cached = self._channels.get(key)
+        if cached is not None and cached[0] == checkpoint_id:
+            return cached[1]
+
+        row = conn.execute(
+            "SELECT snapshot_checkpoint_id, depth FROM channel_deltas "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+            "AND channel = ?",
+            (thread_id, checkpoint_ns, checkpoint_id, channel),
+        ).fetchone()
+        if row is None:
+            return None
+        snapshot_id, depth = row
+        rows = {
+            row_id: (base_id, type_, data)
+            for row_id, base_id, type_, data in conn.execute(
+                "SELECT checkpoint_id, base_checkpoint_id, type, value "
+                "FROM channel_deltas WHERE thread_id = ? AND checkpoint_ns = ? "
+                "AND channel = ? AND checkpoint_id BETWEEN ? AND ?",
+                (thread_id, checkpoint_ns, channel, snapshot_id, checkpoint_id),
+            )
+        }
+        chain = []
+        row_id = checkpoint_id
+        while row_id is not None:
+            if row_id not in rows:
+                raise ValueError(
+                    f"Missing {channel} delta {row_id} of checkpoint {checkpoint_id}"
+                )
+            base_id, type_, data = rows[row_id]
+            chain.append((type_, data))
+            row_id = base_id
+
+        type_, data = chain.pop()
+        value = None if type_ == EMPTY_TYPE else self._load(type_, data)
+        while chain:
+            value = apply_delta(value, self._load(*chain.pop()))
+        if cache:
+            self._cache_channel(key, (checkpoint_id, value, depth, snapshot_id))
+        return value
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Save the intermediate writes of a task.
+
+        Args:
+            config (RunnableConfig): The config of the checkpoint the writes belong to
+            writes (Sequence[Tuple[str, Any]]): The channels and values written
+            task_id (str): Identifier of the task creating the writes
+            task_path (str): Path of the task creating the writes
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            rows.append(
+                (
+                    # Special writes replace earlier ones, regular ones are kept
+                    "REPLACE" if write_idx < 0 else "IGNORE",
+                    (
+                        thread_id,
+                        checkpoint_ns,
+                        checkpoint_id,
+                        task_id,
+                        write_idx,
+                        channel,
+                        *self._dump(value),
+                        task_path,
+                    ),
+                )
+            )
+
+        with self._lock:
+            conn = self._connect()
+            for conflict, row in rows:
+                conn.execute(
+                    f"INSERT OR {conflict} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    row,
+                )
+            conn.commit()
+
+    def _prune(
+        self, conn: sqlite3.Connection, thread_id: str, checkpoint_ns: str
+    ) -> None:
+        """Delete the checkpoints of a thread beyond the last keep_last, with their writes."""
+        oldest_kept = conn.execute(
+            "SELECT checkpoint_id FROM checkpoints "
+            "WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?",
+            (thread_id, checkpoint_ns, self.keep_last - 1),
+        ).fetchone()
+        if oldest_kept is None:
+            return
+        for table in ("checkpoints", "writes"):
+            conn.execute(
+                f"DELETE FROM {table} "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+                (thread_id, checkpoint_ns, oldest_kept[0]),
+            )
+        # Keep the full copies and changes the kept checkpoints are built from
+        oldest_needed = oldest_kept[0]
+        oldest_snapshot = conn.execute(
+            "SELECT MIN(snapshot_checkpoint_id) FROM channel_deltas "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id >= ?",
+            (thread_id, checkpoint_ns, oldest_needed),
+        ).fetchone()[0]
+        if oldest_snapshot is not None and oldest_snapshot < oldest_needed:
+            oldest_needed = oldest_snapshot
+        conn.execute(
+            "DELETE FROM channel_deltas "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+            (thread_id, checkpoint_ns, oldest_needed),
+        )
+
+    def _expire_threads(self) -> None:
+        """Delete the threads idle for longer than thread_ttl, at most once per EXPIRY_INTERVAL."""
+        now = time.time()
+        if not self.thread_ttl or now - self._expired_at < EXPIRY_INTERVAL:
+            return
+        self._expired_at = now
+        self.delete_threads_before(now - self.thread_ttl)
+
+    def delete_threads_before(self, timestamp: float) -> int:
+        """Delete the threads last updated before a time.
+
+        Args:
+            timestamp (float): Threads updated before this Unix time are deleted
+
+        Returns:
+            int: The number of threads deleted
+        """
+        with self._lock:
+            conn = self._connect()
+            thread_ids = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT thread_id FROM threads WHERE updated_at < ?", (timestamp,)
+                )
+            ]
+            for thread_id in thread_ids:
+                self._delete_thread(conn, thread_id)
+            conn.commit()
+        return len(thread_ids)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete all checkpoints and writes of a thread."""
+        with self._lock:
+            conn = self._connect()
+            self._delete_thread(conn, thread_id)
+            conn.commit()
+
+    def _delete_thread(self, conn: sqlite3.Connection, thread_id: str) -> None:
+        """Delete a thread without committing."""
+        for table in ("checkpoints", "writes", "channel_deltas", "threads"):
+            conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+        for key in [key for key in self._channels if key[0] == thread_id]:
+            del self._channels[key]
+
+    def list_threads(self, limit: int = 10) -> List[Tuple[str, float]]:
+        """List the most recently updated threads.
+
+        Args:
+            limit (int): Maximum number of threads to return
+
+        Returns:
+            List[Tuple[str, float]]: Thread ids with the Unix time of their last update, newest first
+        """
+        with self._lock:
+            return (
+                self._connect()
+                .execute(
+                    "SELECT thread_id, updated_at FROM threads "
+                    "ORDER BY updated_at DESC LIMIT ?",
+                    (limit,),
+                )
+                .fetchall()
+            )
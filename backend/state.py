@@ -1,4 +1,4 @@
-from typing import Annotated
+from typing import Annotated, Any, Dict
 from typing_extensions import TypedDict
 from langgraph.graph.message import AnyMessage, add_messages
 from reducers import AccumulatorList, FlexibleMap
@@ -12,3 +12,4 @@ class State(TypedDict):
     affected_files: AccumulatorList[str]
     file_metadata: FlexibleMap
     actions: AccumulatorList[ActionInfo]
+    plan: Dict[str, Any]
@@ -0,0 +1,18 @@
+from botocore.exceptions import ClientError
+
+
+def client_error(code: str) -> ClientError:
+    return ClientError(
+        {"Error": {"Code": code, "Message": code}}, "InvokeModelWithResponseStream"
+    )
+
+
+class NonStreamingClient:
+    """Stand-in for a bedrock-runtime client of a model without response streaming.
+
+    Used by analyzers answering from invoke_model, which the streaming call
+    falls back to.
+    """
+
+    def invoke_model_with_response_stream(self, **kwargs):
+        raise client_error("ValidationException")
@@ -0,0 +1,116 @@
+import os
+import sys
+import json
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START
+from langgraph.prebuilt import ToolNode, tools_condition
+
+from agent_runner import AgentRunner
+from state import State
+from text_analysis import _report_progress
+
+
+@tool
+def count_files(working_directory: str) -> str:
+    """Count the files in a directory."""
+    _report_progress("Counted 3 of 3 files")
+    return "3 files"
+
+
+class FakeStreamingModel(GenericFakeChatModel):
+    """Fake model streaming its content word by word, followed by its tool calls."""
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = next(self.messages)
+        words = message.content.split(" ")
+        for idx, word in enumerate(words):
+            chunk = ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content=word if idx == len(words) - 1 else word + " "
+                )
+            )
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+        if message.tool_calls:
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": tool_call["name"],
+                            "args": json.dumps(tool_call["args"]),
+                            "id": tool_call["id"],
+                            "index": idx,
+                        }
+                        for idx, tool_call in enumerate(message.tool_calls)
+                    ],
+                )
+            )
+
+
+def make_graph():
+    model = FakeStreamingModel(
+        messages=iter(
+            [
+                AIMessage(
+                    content="Counting.",
+                    tool_calls=[
+                        {
+                            "name": "count_files",
+                            "args": {"working_directory": "."},
+                            "id": "call_1",
+                        }
+                    ],
+                ),
+                AIMessage(content="There are 3 files here."),
+            ]
+        )
+    )
+    builder = StateGraph(State)
+    builder.add_node(
+        "assistant", lambda state: {"messages": model.invoke(state["messages"])}
+    )
+    builder.add_node("tools", ToolNode([count_files]))
+    builder.add_edge(START, "assistant")
+    builder.add_conditional_edges("assistant", tools_condition)
+    builder.add_edge("tools", "assistant")
+    return builder.compile(checkpointer=MemorySaver())
+
+
+def test_run_streams_tokens_and_tool_calls(tmp_path):
+    runner = AgentRunner(str(tmp_path))
+    runner.agent = make_graph()
+    events = []
+
+    result = runner.run("How many files?", on_event=events.append)
+
+    kinds = [event.kind for event in events]
+    start = kinds.index("tool_start")
+    assert "".join(event.text for event in events[:start]) == "Counting."
+    assert kinds[start : start + 3] == ["tool_start", "progress", "tool_end"]
+    tool_start, progress, tool_end = events[start : start + 3]
+    assert tool_start.tool_name == "count_files"
+    assert progress.text == "Counted 3 of 3 files"
+    assert tool_end.text == "3 files" and not tool_end.is_error
+    # The final answer arrives token by token
+    answer = events[start + 3 :]
+    assert len(answer) > 1 and {event.kind for event in answer} == {"token"}
+    assert "".join(event.text for event in answer) == "There are 3 files here."
+    # The result is the same as without streaming
+    assert result.result_message == "There are 3 files here."
+
+
+def test_run_without_callback_does_not_stream(tmp_path):
+    runner = AgentRunner(str(tmp_path))
+    runner.agent = make_graph()
+
+    result = runner.run("How many files?")
+
+    assert result.result_message == "There are 3 files here."
@@ -0,0 +1,113 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import text_analysis
+from analysis_store import AnalysisStore
+from text_analysis import TextAnalyzer, _analyze_file
+from tests.bedrock_stubs import NonStreamingClient
+
+
+class CountingAnalyzer(TextAnalyzer):
+    """TextAnalyzer that answers from a fixed response instead of calling Bedrock."""
+
+    def __init__(self, response):
+        super().__init__(client=NonStreamingClient())
+        self.response = response
+        self.prompts = []
+
+    def invoke_model(self, prompt):
+        self.prompts.append(prompt)
+        return self.response, 42
+
+
+def test_store_round_trip(tmp_path):
+    store = AnalysisStore(str(tmp_path / "store.db"))
+    store.save_results(
+        "abc",
+        {"title": "Lease", "category": "Contracts"},
+        {"title": "", "category": "v1"},
+    )
+
+    assert store.get_results("abc", {"title": "", "category": "v1"}) == {
+        "title": "Lease",
+        "category": "Contracts",
+    }
+    # A different category set version does not match
+    assert store.get_results("abc", {"category": "v2"}) == {}
+
+
+def test_content_hash_follows_file_changes(tmp_path):
+    store = AnalysisStore(str(tmp_path / "store.db"))
+    test_file = tmp_path / "doc.txt"
+    test_file.write_text("first version")
+    first = store.get_content_hash(str(test_file))
+
+    test_file.write_text("second version!")
+    second = store.get_content_hash(str(test_file))
+
+    assert first != second
+    assert store.get_content_hash(str(test_file)) == second
+
+
+def test_identical_content_is_analyzed_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        text_analysis, "analysis_store", AnalysisStore(str(tmp_path / "store.db"))
+    )
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a" / "minutes.txt").write_text("Minutes of the board of directors")
+    (tmp_path / "b" / "copy.txt").write_text("Minutes of the board of directors")
+    analyzer = CountingAnalyzer("<title>Board Minutes</title><date>N/A</date>")
+
+    first, first_tokens, _ = _analyze_file(
+        analyzer, str(tmp_path / "a"), "minutes.txt", title=True, date=True
+    )
+    second, second_tokens, _ = _analyze_file(
+        analyzer, str(tmp_path / "b"), "copy.txt", title=True, date=True
+    )
+
+    assert len(analyzer.prompts) == 1
+    assert (first_tokens, second_tokens) == (42, 0)
+    assert second["title"] == first["title"] == "Board Minutes"
+    assert second["content_hash"] == first["content_hash"]
+
+
+def test_stale_state_metadata_is_ignored(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        text_analysis, "analysis_store", AnalysisStore(str(tmp_path / "store.db"))
+    )
+    (tmp_path / "doc.txt").write_text("Updated content")
+    analyzer = CountingAnalyzer("<title>New Title</title>")
+
+    results, _, _ = _analyze_file(
+        analyzer,
+        str(tmp_path),
+        "doc.txt",
+        title=True,
+        existing_metadata={"title": "Old Title", "content_hash": "0000000000000000"},
+    )
+
+    assert results["title"] == "New Title"
+
+
+def test_fields_missing_from_the_response_are_asked_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        text_analysis, "analysis_store", AnalysisStore(str(tmp_path / "store.db"))
+    )
+    (tmp_path / "minutes.txt").write_text("Minutes of the board of directors")
+    # The response was cut off before the date
+    analyzer = CountingAnalyzer("<title>Board Minutes</title><date>2021-")
+
+    first, _, _ = _analyze_file(
+        analyzer, str(tmp_path), "minutes.txt", title=True, date=True
+    )
+    analyzer.response = "<date>2021-03-04</date>"
+    second, tokens, _ = _analyze_file(
+        analyzer, str(tmp_path), "minutes.txt", title=True, date=True
+    )
+
+    assert first["title"] == "Board Minutes" and "date" not in first
+    assert len(analyzer.prompts) == 2 and tokens == 42
+    assert "<title>" not in analyzer.prompts[1]
+    assert second["title"] == "Board Minutes" and second["date"] == "2021-03-04"
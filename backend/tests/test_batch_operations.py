@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from langchain_core.messages import ToolMessage
+import folder_operations
+from directory_index import DirectoryIndex
+from folder_operations import batch_operations, list_items
+from tools import extract_tool_result
+from trash import Trash
+
+
+def use_temp_index(tmp_path_factory, monkeypatch, **kwargs) -> DirectoryIndex:
+    # Kept out of the folders being organized, which the tests list
+    index = DirectoryIndex(str(tmp_path_factory.mktemp("index") / "index.db"), **kwargs)
+    monkeypatch.setattr(folder_operations, "directory_index", index)
+    return index
+
+
+def run_batch(root, operations):
+    return batch_operations.invoke(
+        {"working_directory": str(root), "operations": operations}
+    )
+
+
+def test_batch_reorganizes_files(tmp_path, tmp_path_factory, monkeypatch):
+    use_temp_index(tmp_path_factory, monkeypatch)
+    for idx in range(20):
+        (tmp_path / f"lease{idx}.txt").write_text(str(idx))
+    (tmp_path / "notes.txt").write_text("notes")
+
+    operations = [
+        {"operation": "create", "dest_path": "Leases", "item_type": "folder"}
+    ] + [
+        {
+            "operation": "move",
+            "source_path": f"lease{idx}.txt",
+            "dest_path": os.path.join("Leases", f"lease{idx}.txt"),
+        }
+        for idx in range(20)
+    ]
+    operations.append(
+        {"operation": "rename", "source_path": "notes.txt", "new_name": "memo.txt"}
+    )
+    result = run_batch(tmp_path, operations)
+
+    assert result["message"].startswith("Completed 22 of 22 operations")
+    assert sorted(os.listdir(tmp_path / "Leases")) == sorted(
+        f"lease{idx}.txt" for idx in range(20)
+    )
+    assert (tmp_path / "memo.txt").read_text() == "notes"
+    assert len(result["actions"]) == 22
+
+    state = {
+        "messages": [ToolMessage(content=json.dumps(result), tool_call_id="1")],
+        "analysis_tokens": 0,
+    }
+    assert len(extract_tool_result(state)["actions"]) == 22
+
+
+def test_invalid_batch_changes_nothing(tmp_path, tmp_path_factory, monkeypatch):
+    use_temp_index(tmp_path_factory, monkeypatch)
+    (tmp_path / "a.txt").write_text("a")
+    (tmp_path / "b.txt").write_text("b")
+
+    result = run_batch(
+        tmp_path,
+        [
+            {"operation": "move", "source_path": "a.txt", "dest_path": "c.txt"},
+            {"operation": "copy", "source_path": "b.txt", "dest_path": "c.txt"},
+            {"operation": "delete", "source_path": "missing.txt"},
+        ],
+    )
+
+    assert result["message"].splitlines() == [
+        "No operations were performed:",
+        "Operation 2: Destination path 'c.txt' already exists",
+        "Operation 3: Source path 'missing.txt' does not exist",
+    ]
+    assert sorted(os.listdir(tmp_path)) == ["a.txt", "b.txt"]
+
+
+def test_later_operations_see_earlier_moves(tmp_path, tmp_path_factory, monkeypatch):
+    use_temp_index(tmp_path_factory, monkeypatch)
+    monkeypatch.setattr(folder_operations, "trash", Trash(root=str(tmp_path)))
+    (tmp_path / "old").mkdir()
+    (tmp_path / "old" / "deed.txt").write_text("deed")
+
+    result = run_batch(
+        tmp_path,
+        [
+            {"operation": "move", "source_path": "old", "dest_path": "new"},
+            {
+                "operation": "move",
+                "source_path": os.path.join("new", "deed.txt"),
+                "dest_path": os.path.join("archive", "deed.txt"),
+            },
+            {"operation": "move", "source_path": "new", "dest_path": "new2"},
+            {"operation": "delete", "source_path": "new2", "item_type": "folder"},
+        ],
+    )
+
+    assert result["message"].startswith("Completed 4 of 4 operations")
+    # The deleted folder waits in the trash
+    assert sorted(os.listdir(tmp_path)) == [".file_flow_trash", "archive"]
+    assert (tmp_path / "archive" / "deed.txt").read_text() == "deed"
+
+
+def test_batch_checks_paths_on_the_filesystem(tmp_path, tmp_path_factory, monkeypatch):
+    use_temp_index(tmp_path_factory, monkeypatch, verify_interval=3600)
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.txt").write_text("SRC")
+    list_items.invoke({"working_directory": str(tmp_path), "path": "sub"})
+
+    # Created outside the tools, after the listing was trusted
+    (tmp_path / "sub" / "b.txt").write_text("PRECIOUS")
+    result = run_batch(
+        tmp_path,
+        [
+            {
+                "operation": "move",
+                "source_path": "a.txt",
+                "dest_path": os.path.join("sub", "b.txt"),
+            }
+        ],
+    )
+
+    assert result["message"].startswith("No operations were performed")
+    assert (tmp_path / "sub" / "b.txt").read_text() == "PRECIOUS"
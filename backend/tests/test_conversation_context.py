@@ -0,0 +1,106 @@
+import os
+import sys
+import json
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+import conversation_context as context_module
+from conversation_context import ConversationContext, count_tokens
+
+
+def make_turn(idx):
+    call_id = f"call_{idx}"
+    return [
+        HumanMessage(content=f"Move the leases of batch {idx}", id=f"h{idx}"),
+        AIMessage(
+            content="",
+            id=f"a{idx}",
+            tool_calls=[
+                {"name": "list_items", "args": {"path": f"batch{idx}"}, "id": call_id}
+            ],
+        ),
+        ToolMessage(
+            content=json.dumps(
+                {"message": "lease.pdf " * 500, "affected_files": ["x"] * 50}
+            ),
+            tool_call_id=call_id,
+            id=f"t{idx}",
+        ),
+        AIMessage(content=f"Moved batch {idx}", id=f"r{idx}"),
+    ]
+
+
+def test_history_is_bounded_and_summarized():
+    context = ConversationContext(
+        token_budget=3000, old_tool_result_tokens=50, summary_max_tokens=500
+    )
+    history = [msg for idx in range(40) for msg in make_turn(idx)]
+    history.append(HumanMessage(content="Now rename them", id="current"))
+
+    messages = context.build(history)
+
+    assert isinstance(messages[0], HumanMessage)
+    assert messages[0].content.startswith("[Summary of the earlier conversation]")
+    assert "Tools used: list_items" in messages[0].content
+    assert messages[-1].content == "Now rename them"
+    assert sum(count_tokens(msg) for msg in messages) <= 3000
+    # Tool results of past turns are shortened and stripped of ignored fields
+    tool_messages = [msg for msg in messages if isinstance(msg, ToolMessage)]
+    assert tool_messages
+    assert all(msg.content.endswith("[shortened]") for msg in tool_messages)
+    assert all("affected_files" not in msg.content for msg in tool_messages)
+    # Every tool result follows the call it answers
+    for idx, msg in enumerate(messages):
+        if isinstance(msg, ToolMessage):
+            assert messages[idx - 1].tool_calls[0]["id"] == msg.tool_call_id
+
+
+def test_short_history_is_sent_in_full():
+    context = ConversationContext(token_budget=100000)
+    history = make_turn(0) + [HumanMessage(content="Thanks", id="current")]
+
+    messages = context.build(history)
+
+    assert [msg.id for msg in messages] == [msg.id for msg in history]
+    # Only tool results of past turns are shortened
+    assert messages[2].content.endswith("[shortened]")
+    assert "[shortened]" not in context.build(make_turn(1))[2].content
+
+
+def test_messages_are_processed_once(monkeypatch):
+    calls = []
+
+    def counting_filter(msg):
+        calls.append(msg.id)
+        return msg
+
+    monkeypatch.setattr(context_module, "filter_message", counting_filter)
+    context = ConversationContext(token_budget=100000)
+    history = make_turn(0)
+
+    context.build(history)
+    history = history + make_turn(1)
+    context.build(history)
+
+    # Each message is filtered once while current and once when it becomes past
+    assert sorted(calls).count("t0") == 2
+    assert calls.count("t1") == 1
+
+
+def test_long_current_turn_is_shortened():
+    context = ConversationContext(
+        token_budget=4000, old_tool_result_tokens=50, summary_max_tokens=500
+    )
+    # One request making 20 tool calls, each returning a long result
+    history = make_turn(0)[:1]
+    for idx in range(20):
+        history += make_turn(idx)[1:3]
+
+    messages = context.build(history)
+
+    assert [msg.id for msg in messages] == [msg.id for msg in history]
+    assert sum(count_tokens(msg) for msg in messages) <= 4000
+    # The result of the latest call is kept in full, the older ones are shortened
+    assert "[shortened]" not in messages[-1].content
+    assert all(msg.content.endswith("[shortened]") for msg in messages[2:-1:2])
+    assert count_tokens(messages[-1]) > 1000
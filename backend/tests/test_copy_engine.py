@@ -0,0 +1,92 @@
+import os
+import sys
+import errno
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from langgraph.graph import StateGraph, START
+from typing_extensions import TypedDict
+
+import copy_engine
+import folder_operations
+from copy_engine import copy_file, copy_tree
+from directory_index import DirectoryIndex
+from folder_operations import copy_item
+
+
+def make_tree(root):
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "top.txt").write_text("top")
+    (root / "a" / "one.txt").write_text("one" * 1000)
+    (root / "a" / "b" / "empty.txt").write_text("")
+    os.utime(root / "a" / "one.txt", (1_000_000_000, 1_000_000_000))
+
+
+def read_tree(root):
+    return {
+        os.path.relpath(os.path.join(folder, name), root): open(
+            os.path.join(folder, name), "rb"
+        ).read()
+        for folder, _, files in os.walk(root)
+        for name in files
+    }
+
+
+def test_copy_tree_matches_source(tmp_path):
+    make_tree(tmp_path / "source")
+    updates = []
+
+    stats = copy_tree(
+        str(tmp_path / "source"),
+        str(tmp_path / "dest"),
+        progress=lambda progress: updates.append(progress.copied_files),
+    )
+
+    assert read_tree(tmp_path / "dest") == read_tree(tmp_path / "source")
+    assert (stats.copied_files, stats.copied_bytes) == (3, 3003)
+    assert stats.total_files == 3
+    assert sorted(updates) == [1, 2, 3]
+    assert os.stat(tmp_path / "dest" / "a" / "one.txt").st_mtime == 1_000_000_000
+
+
+def test_copy_file_falls_back_when_kernel_copy_unsupported(tmp_path, monkeypatch):
+    def unsupported(*args):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(copy_engine.os, "copy_file_range", unsupported, raising=False)
+    monkeypatch.setattr(copy_engine, "fcntl", None)
+    monkeypatch.setattr(copy_engine, "_unsupported", set())
+    (tmp_path / "source.txt").write_text("content")
+
+    copied = copy_file(str(tmp_path / "source.txt"), str(tmp_path / "dest.txt"))
+
+    assert copied == len("content")
+    assert (tmp_path / "dest.txt").read_text() == "content"
+
+
+class CopyState(TypedDict):
+    working_directory: str
+
+
+def test_copy_item_reports_progress_in_a_graph(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        folder_operations, "directory_index", DirectoryIndex(str(tmp_path / "i.db"))
+    )
+    make_tree(tmp_path / "source")
+
+    def copy(state: CopyState):
+        copy_item.func(state["working_directory"], "source", "dest")
+        return {}
+
+    builder = StateGraph(CopyState)
+    builder.add_node("copy", copy)
+    builder.add_edge(START, "copy")
+    chunks = list(
+        builder.compile().stream(
+            {"working_directory": str(tmp_path)}, stream_mode="custom"
+        )
+    )
+
+    assert chunks and all("progress" in chunk for chunk in chunks)
+    assert chunks[-1]["progress"] == "Copied 3 of 3 files (3003 of 3003 bytes)"
+    # Outside of a graph the copy does not report anything
+    assert copy_item.func(str(tmp_path), "source", "dest2")["affected_files"]
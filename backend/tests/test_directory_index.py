@@ -0,0 +1,144 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import folder_operations
+from directory_index import DirectoryIndex
+from folder_operations import copy_item, list_items, move_item
+
+
+class CountingIndex(DirectoryIndex):
+    """DirectoryIndex counting the directories read from the filesystem."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scans = 0
+
+    def _scan(self, directory):
+        self.scans += 1
+        return super()._scan(directory)
+
+
+def make_tree(root):
+    (root / "contracts" / "2021").mkdir(parents=True)
+    (root / "letters").mkdir()
+    (root / "contracts" / "lease.txt").write_text("lease")
+    (root / "contracts" / "2021" / "nda.txt").write_text("nda")
+    (root / "letters" / "notice.txt").write_text("notice")
+    (root / "readme.txt").write_text("readme")
+
+
+def test_walk_matches_os_walk(tmp_path):
+    make_tree(tmp_path / "docs")
+    index = DirectoryIndex(str(tmp_path / "index.db"))
+
+    indexed = {
+        root: (sorted(dirs), sorted(files))
+        for root, dirs, files in index.walk(str(tmp_path / "docs"))
+    }
+    expected = {
+        root: (sorted(dirs), sorted(files))
+        for root, dirs, files in os.walk(str(tmp_path / "docs"))
+    }
+
+    assert indexed == expected
+
+
+def test_repeat_listing_reads_only_changed_directories(tmp_path):
+    docs = tmp_path / "docs"
+    make_tree(docs)
+    index = CountingIndex(str(tmp_path / "index.db"))
+    list(index.walk(str(docs)))
+    assert index.scans == 4
+
+    list(index.walk(str(docs)))
+    assert index.scans == 4
+
+    (docs / "letters" / "reply.txt").write_text("reply")
+    names = [entry.name for entry in index.scandir(str(docs / "letters"))]
+    assert names == ["notice.txt", "reply.txt"]
+    assert index.scans == 5
+
+
+def test_index_persists_across_instances(tmp_path):
+    docs = tmp_path / "docs"
+    make_tree(docs)
+    list(DirectoryIndex(str(tmp_path / "index.db")).walk(str(docs)))
+
+    index = CountingIndex(str(tmp_path / "index.db"))
+    entries = index.scandir(str(docs / "contracts"))
+
+    assert index.scans == 0
+    assert [(entry.name, entry.is_dir) for entry in entries] == [
+        ("2021", True),
+        ("lease.txt", False),
+    ]
+    assert entries[1].size == len("lease")
+
+
+def test_tool_changes_are_visible_in_trusted_listings(tmp_path, monkeypatch):
+    docs = tmp_path / "docs"
+    make_tree(docs)
+    # Listings are never verified by mtime, only tool invalidations update them
+    index = DirectoryIndex(str(tmp_path / "index.db"), verify_interval=3600)
+    monkeypatch.setattr(folder_operations, "directory_index", index)
+    list_items.invoke({"working_directory": str(docs), "recursive": True})
+
+    move_item.invoke(
+        {
+            "working_directory": str(docs),
+            "source_path": "readme.txt",
+            "dest_path": os.path.join("archive", "old", "readme.txt"),
+        }
+    )
+    listing = list_items.invoke({"working_directory": str(docs), "recursive": True})
+
+    assert f"📄 {os.path.join('archive', 'old', 'readme.txt')}" in listing
+    assert "📄 readme.txt" not in listing
+    assert "readme.txt" not in [entry.name for entry in index.scandir(str(docs))]
+
+
+def test_file_operations_do_not_trust_listings_for_existence(tmp_path, monkeypatch):
+    docs = tmp_path / "docs"
+    (docs / "sub").mkdir(parents=True)
+    (docs / "a.txt").write_text("SRC")
+    index = DirectoryIndex(str(tmp_path / "index.db"), verify_interval=3600)
+    monkeypatch.setattr(folder_operations, "directory_index", index)
+    list_items.invoke({"working_directory": str(docs), "path": "sub"})
+
+    # Created outside the tools, after the listing was trusted
+    (docs / "sub" / "b.txt").write_text("PRECIOUS")
+    args = {
+        "working_directory": str(docs),
+        "source_path": "a.txt",
+        "dest_path": os.path.join("sub", "b.txt"),
+    }
+    moved = move_item.invoke(args)
+    copied = copy_item.invoke(args)
+
+    assert "already exists" in moved["message"] and not moved["affected_files"]
+    assert "already exists" in copied["message"] and not copied["affected_files"]
+    assert (docs / "sub" / "b.txt").read_text() == "PRECIOUS"
+    assert (docs / "a.txt").read_text() == "SRC"
+
+
+def test_copy_follows_symbolic_links(tmp_path, monkeypatch):
+    docs = tmp_path / "docs"
+    (docs / "folder").mkdir(parents=True)
+    (docs / "folder" / "a.txt").write_text("a")
+    os.symlink(docs / "folder", docs / "link")
+    os.symlink(docs / "missing", docs / "broken")
+    index = DirectoryIndex(str(tmp_path / "index.db"))
+    monkeypatch.setattr(folder_operations, "directory_index", index)
+
+    copied = copy_item.invoke(
+        {"working_directory": str(docs), "source_path": "link", "dest_path": "copy"}
+    )
+    broken = copy_item.invoke(
+        {"working_directory": str(docs), "source_path": "broken", "dest_path": "x"}
+    )
+
+    assert copied["affected_files"]
+    assert (docs / "copy" / "a.txt").read_text() == "a"
+    assert broken["message"] == "Source path 'broken' does not exist"
+    assert not (docs / "x").exists()
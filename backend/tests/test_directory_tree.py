@@ -0,0 +1,54 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import tools
+from directory_index import DirectoryIndex
+from tools import get_directory_tree
+
+
+def test_recursive_tree_expands_only_changed_folders(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        tools, "directory_index", DirectoryIndex(str(tmp_path / "i.db"))
+    )
+    docs = tmp_path / "docs"
+    (docs / "contracts" / "2021").mkdir(parents=True)
+    (docs / "letters").mkdir()
+    (docs / "contracts" / "2021" / "nda.txt").write_text("nda")
+    (docs / "letters" / "notice.txt").write_text("notice")
+    (docs / "readme.txt").write_text("readme")
+
+    tree = get_directory_tree(
+        str(docs),
+        [os.path.join(str(docs), "contracts", "2021", "nda.txt")],
+        recursive=True,
+    )
+
+    assert tree.splitlines() == [
+        "├── 📁 contracts",
+        "│   └── 📁 2021",
+        "│       └── 📄 nda.txt *",
+        "├── 📁 letters",
+        "└── 📄 readme.txt",
+    ]
+
+
+def test_entry_cap_keeps_affected_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        tools, "directory_index", DirectoryIndex(str(tmp_path / "i.db"))
+    )
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for idx in range(10):
+        (docs / f"file{idx}.txt").write_text(str(idx))
+
+    tree = get_directory_tree(
+        str(docs), [str(docs / "file7.txt")], max_entries=3
+    ).splitlines()
+
+    assert tree == [
+        "├── 📄 file0.txt",
+        "├── 📄 file1.txt",
+        "├── 📄 file7.txt *",
+        "└── … 7 more",
+    ]
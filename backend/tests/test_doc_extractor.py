@@ -0,0 +1,52 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from doc_extractor import (
+    read_fib,
+    read_piece_table,
+    iter_word_stream_text,
+)
+from tests.word_streams import build_word_streams
+
+
+def test_read_fib_and_piece_table():
+    word_stream, table_stream = build_word_streams(
+        [("Hello world\r", True), ("Grüße\r", False)]
+    )
+
+    fib = read_fib(word_stream)
+    pieces = read_piece_table(table_stream, fib)
+
+    assert fib.table_stream_name == "1Table"
+    assert fib.ccp_text == 18
+    assert [(p.cp_start, p.cp_end, p.compressed) for p in pieces] == [
+        (0, 12, True),
+        (12, 18, False),
+    ]
+
+
+def test_extract_compressed_and_unicode_pieces():
+    word_stream, table_stream = build_word_streams(
+        [("Board Resolution\r", True), ("Société Générale – 株式会社\r", False)]
+    )
+
+    text = "".join(iter_word_stream_text(word_stream, table_stream))
+
+    assert text == "Board Resolution\nSociété Générale – 株式会社\n"
+
+
+def test_field_instructions_are_removed():
+    word_stream, table_stream = build_word_streams(
+        [
+            (
+                'Dated \x13 DATE \\@ "d MMMM yyyy" \x144 March 2021\x15 by '
+                "\x13 HYPERLINK \x13 REF x \x14inner\x15\x14Acme\x15\x07\r",
+                True,
+            )
+        ]
+    )
+
+    text = "".join(iter_word_stream_text(word_stream, table_stream))
+
+    assert text == "Dated 4 March 2021 by Acme\t\n"
@@ -0,0 +1,74 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from extraction_cache import ExtractionCache
+
+
+def _counting_extractor(calls):
+    def extractor(file_path):
+        calls.append(file_path)
+        with open(file_path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    return extractor
+
+
+def test_cache_hit_skips_extraction(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache.db"))
+    test_file = tmp_path / "doc.txt"
+    test_file.write_text("Some extracted text")
+    calls = []
+
+    first = cache.get_or_extract(str(test_file), _counting_extractor(calls))
+    second = cache.get_or_extract(str(test_file), _counting_extractor(calls))
+
+    assert first == second == "Some extracted text"
+    assert len(calls) == 1
+
+
+def test_cache_survives_new_instance(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    test_file = tmp_path / "doc.txt"
+    test_file.write_text("Persistent text")
+    calls = []
+
+    ExtractionCache(db_path).get_or_extract(str(test_file), _counting_extractor(calls))
+    result = ExtractionCache(db_path).get_or_extract(
+        str(test_file), _counting_extractor(calls)
+    )
+
+    assert result == "Persistent text"
+    assert len(calls) == 1
+
+
+def test_cache_invalidated_when_file_changes(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache.db"))
+    test_file = tmp_path / "doc.txt"
+    test_file.write_text("Old content")
+    calls = []
+
+    cache.get_or_extract(str(test_file), _counting_extractor(calls))
+    test_file.write_text("New, longer content")
+    result = cache.get_or_extract(str(test_file), _counting_extractor(calls))
+
+    assert result == "New, longer content"
+    assert len(calls) == 2
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    # Random hex content compresses to roughly 900 bytes per entry
+    cache = ExtractionCache(str(tmp_path / "cache.db"), max_bytes=2000)
+    files = []
+    for idx in range(3):
+        test_file = tmp_path / f"doc{idx}.txt"
+        test_file.write_text(os.urandom(800).hex())
+        files.append(str(test_file))
+    calls = []
+
+    for file_path in files:
+        cache.get_or_extract(file_path, _counting_extractor(calls))
+
+    # The first file was evicted, the last one is still cached
+    assert cache.get(cache.make_key(files[0])) is None
+    assert cache.get(cache.make_key(files[2])) is not None
@@ -3,6 +3,7 @@ import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from folder_operations import get_content
+from utils import read_truncated_text, truncate_text
 from text_analysis import analyze_document, TextAnalyzer, PROMPT_TEMPLATES
 
 
@@ -70,6 +71,30 @@ def test_get_content_encoding_error(tmp_path):
     assert "Error reading file 'test.bin'" in result
 
 
+def test_get_content_large_text_file_is_truncated(tmp_path):
+    # Create a text file far larger than the truncation budget
+    test_file = tmp_path / "large.log"
+    line = "lorem ipsum dolor sit amet consectetur\n"
+    test_file.write_text(line * 200000)
+
+    # Test reading the file with an explicit budget
+    result = get_content(str(tmp_path), "large.log", max_words=2000, max_chars=8000)
+    expected = truncate_text(line * 200000, max_words=2000, max_chars=8000)
+    assert result == f"Content of 'large.log':\n{expected}"
+
+
+def test_read_truncated_text_matches_truncate_text():
+    import io
+
+    text = "alpha  beta\tgamma\n" * 500 + "x" * 3000 + " tail words here"
+    for max_words, max_chars in [(10, 50), (600, 100), (5, 20000), (2000, 8000)]:
+        for chunk_size in [1, 7, 64, 4096]:
+            result = read_truncated_text(
+                io.StringIO(text), max_words, max_chars, chunk_size=chunk_size
+            )
+            assert result == truncate_text(text, max_words, max_chars)
+
+
 def test_specific_file():
     """Test reading a specific file."""
     # Specify the working directory and file path
@@ -0,0 +1,74 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import text_analysis
+from analysis_store import AnalysisStore
+from categories_manager import CategoriesManager
+from keyword_classifier import AhoCorasick, KeywordClassifier
+from text_analysis import _prepare_analysis
+
+
+def make_classifier(tmp_path):
+    manager = CategoriesManager(str(tmp_path / "categories.json"))
+    manager.add_category(
+        "Board documents", ["minutes of the board", "board resolution"]
+    )
+    manager.add_category(
+        "Incorporation documents",
+        ["certificate of incorporation", "articles of incorporation"],
+    )
+    manager.add_category("Articles", ["articles of incorporation"])
+    return manager, KeywordClassifier(manager)
+
+
+def test_aho_corasick_finds_overlapping_patterns():
+    matcher = AhoCorasick(["he", "she", "hers", "his"])
+    matches = sorted(matcher.iter_matches("ushers"))
+    assert matches == [(0, 3), (1, 3), (2, 5)]
+
+
+def test_classify_by_name_and_text(tmp_path):
+    manager, classifier = make_classifier(tmp_path)
+
+    match = classifier.classify("2021_Board-Resolution.pdf")
+    assert (match.category, match.confidence) == ("Board documents", 1.0)
+
+    # A single mention in the text is not conclusive
+    match = classifier.classify("scan.pdf", "Attached is the board resolution.")
+    assert match.category == "Board documents"
+    assert match.confidence < 0.8
+
+    text = "MINUTES OF THE BOARD held on 1 May. The board resolution was adopted."
+    assert classifier.classify("scan.pdf", text).confidence == 1.0
+
+    # Values shared by two categories are ambiguous
+    match = classifier.classify("articles_of_incorporation.docx")
+    assert match.confidence == 0.5
+    assert classifier.classify("lease.pdf", "The tenant pays rent.") is None
+
+    # The matcher follows changes of the categories
+    manager.update_category("Board documents", ["directors meeting"])
+    assert classifier.classify("2021_Board-Resolution.pdf") is None
+    assert classifier.classify("Directors meeting.txt").category == "Board documents"
+
+
+def test_confident_match_skips_the_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        text_analysis, "analysis_store", AnalysisStore(str(tmp_path / "store.db"))
+    )
+    manager, classifier = make_classifier(tmp_path)
+    monkeypatch.setattr(text_analysis, "keyword_classifier", classifier)
+    (tmp_path / "scan.txt").write_text(
+        "Minutes of the board of directors. The board resolution was adopted."
+    )
+    (tmp_path / "letter.txt").write_text("Dear shareholders,")
+
+    job = _prepare_analysis(str(tmp_path), "scan.txt", categorize=True)
+    assert job.results["category"] == "Board documents"
+    assert not job.needs_analysis
+    assert job.content is None
+
+    job = _prepare_analysis(str(tmp_path), "letter.txt", categorize=True)
+    assert "category" not in job.results
+    assert job.fields_to_analyze == {"category": True}
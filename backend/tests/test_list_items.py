@@ -0,0 +1,90 @@
+import os
+import re
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import folder_operations
+from directory_index import DirectoryIndex
+from folder_operations import list_items
+
+
+def make_tree(root):
+    for folder in ["a", os.path.join("a", "sub"), "b"]:
+        (root / folder).mkdir(parents=True)
+    for name in [
+        "top.txt",
+        os.path.join("a", "one.pdf"),
+        os.path.join("a", "two.docx"),
+        os.path.join("a", "sub", "deep.pdf"),
+        os.path.join("b", "three.pdf"),
+    ]:
+        (root / name).write_text(name)
+
+
+def listing(root, **kwargs):
+    return list_items.invoke({"working_directory": str(root), **kwargs})
+
+
+def test_pages_cover_the_whole_listing_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        folder_operations, "directory_index", DirectoryIndex(str(tmp_path / "i.db"))
+    )
+    docs = tmp_path / "docs"
+    make_tree(docs)
+    full = listing(docs, recursive=True).splitlines()
+
+    paged, cursor = [], None
+    while True:
+        page = listing(docs, recursive=True, limit=2, cursor=cursor).splitlines()
+        match = re.search(r"cursor='(.*)'", page[-1])
+        if not match:
+            paged.extend(page)
+            break
+        paged.extend(page[:-1])
+        cursor = match.group(1)
+
+    assert len(full) == 8
+    assert paged == full
+
+
+def test_filters_and_depth(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        folder_operations, "directory_index", DirectoryIndex(str(tmp_path / "i.db"))
+    )
+    docs = tmp_path / "docs"
+    make_tree(docs)
+
+    pdfs = listing(docs, extensions=["pdf"], max_depth=2).splitlines()
+    assert pdfs == [
+        f"📄 {os.path.join('a', 'one.pdf')}",
+        f"📄 {os.path.join('b', 'three.pdf')}",
+    ]
+
+    matched = listing(docs, recursive=True, pattern="*o*").splitlines()
+    assert matched == [
+        "📄 top.txt",
+        f"📄 {os.path.join('a', 'one.pdf')}",
+        f"📄 {os.path.join('a', 'two.docx')}",
+    ]
+
+
+def test_grouped_format(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        folder_operations, "directory_index", DirectoryIndex(str(tmp_path / "i.db"))
+    )
+    docs = tmp_path / "docs"
+    make_tree(docs)
+
+    grouped = listing(docs, recursive=True, item_type="files", output_format="grouped")
+
+    assert grouped.splitlines() == [
+        "📁 ./",
+        "  📄 top.txt",
+        f"📁 {os.path.join('a', '')}",
+        "  📄 one.pdf",
+        "  📄 two.docx",
+        f"📁 {os.path.join('a', 'sub', '')}",
+        "  📄 deep.pdf",
+        f"📁 {os.path.join('b', '')}",
+        "  📄 three.pdf",
+    ]
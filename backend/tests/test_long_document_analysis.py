@@ -0,0 +1,88 @@
+import os
+import re
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import text_analysis
+from analysis_store import AnalysisStore
+from text_analysis import TextAnalyzer, _analyze_file
+from utils import split_text
+from tests.bedrock_stubs import NonStreamingClient
+
+
+class MapReduceAnalyzer(TextAnalyzer):
+    """TextAnalyzer answering chunk prompts with the part number and merging them."""
+
+    def __init__(self):
+        super().__init__(client=NonStreamingClient())
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def invoke_model(self, prompt):
+        with self._lock:
+            self.prompts.append(prompt)
+        if "Partial results:" in prompt:
+            parts = re.findall(r"<summary>(.*?)</summary>", prompt)
+            return f"<summary>{' + '.join(parts)}</summary>", 10
+        part = re.search(r"\(part (\d+) of \d+\)", prompt)
+        if part:
+            return f"<summary>part {part.group(1)}</summary>", 10
+        return "<title>Master Agreement</title>", 10
+
+
+def write_long_document(path, paragraphs):
+    path.write_text(
+        "\n\n".join(f"Clause {idx}. " + "term " * 200 for idx in range(paragraphs))
+    )
+
+
+def test_split_text_prefers_paragraph_boundaries():
+    text = "\n\n".join(["a" * 60, "b" * 60, "c" * 60])
+
+    chunks = split_text(text, 100)
+
+    assert chunks == ["a" * 60 + "\n\n", "b" * 60 + "\n\n", "c" * 60]
+    assert "".join(chunks) == text
+
+
+def test_long_document_summary_covers_all_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        text_analysis, "analysis_store", AnalysisStore(str(tmp_path / "store.db"))
+    )
+    write_long_document(tmp_path / "agreement.txt", 30)
+    analyzer = MapReduceAnalyzer()
+
+    results, total_tokens, _ = _analyze_file(
+        analyzer, str(tmp_path), "agreement.txt", title=True, summary=True
+    )
+
+    chunk_count = len(re.findall(r"\(part \d+ of ", "".join(analyzer.prompts)))
+    assert chunk_count > 1
+    # One request per chunk, one for the title and one to merge the summaries
+    assert len(analyzer.prompts) == chunk_count + 2
+    assert total_tokens == 10 * (chunk_count + 2)
+    assert results["title"] == "Master Agreement"
+    assert results["summary"] == " + ".join(
+        f"part {idx}" for idx in range(1, chunk_count + 1)
+    )
+
+
+def test_unchanged_chunks_are_not_analyzed_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        text_analysis, "analysis_store", AnalysisStore(str(tmp_path / "store.db"))
+    )
+    document = tmp_path / "agreement.txt"
+    write_long_document(document, 30)
+    analyzer = MapReduceAnalyzer()
+    _analyze_file(analyzer, str(tmp_path), "agreement.txt", summary=True)
+    first_prompts = len(analyzer.prompts)
+
+    # Appending to the document only changes the last chunk
+    document.write_text(document.read_text() + "\n\nSchedule A. Signatures.")
+    analyzer.prompts.clear()
+    _analyze_file(analyzer, str(tmp_path), "agreement.txt", summary=True)
+
+    assert first_prompts > 3
+    # The changed last chunk and the merge
+    assert len(analyzer.prompts) == 2
@@ -0,0 +1,79 @@
+import os
+import sys
+import zipfile
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import text_analysis
+from analysis_store import AnalysisStore
+from metadata_extractor import (
+    find_date_in_name,
+    find_dated_line,
+    read_document_title,
+)
+from text_analysis import _prepare_analysis, get_text_analyzer
+
+CORE_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<cp:coreProperties
+    xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties"
+    xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <dc:title>{title}</dc:title>
+</cp:coreProperties>"""
+
+PDF = b"""%PDF-1.4
+1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj
+2 0 obj << /Type /Pages /Kids [] /Count 0 >> endobj
+3 0 obj << /Title (Share Purchase Agreement) >> endobj
+trailer << /Root 1 0 R /Info 3 0 R >>
+%%EOF
+"""
+
+
+def make_docx(path, title):
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("docProps/core.xml", CORE_XML.format(title=title))
+
+
+def test_dates_from_names_and_text():
+    assert find_date_in_name("2021-03-04 Board Minutes.pdf") == "2021-03-04"
+    assert find_date_in_name("20210304_minutes.docx") == "2021-03-04"
+    assert find_date_in_name("Minutes March 4, 2021.pdf") == "2021-03-04"
+    # Day and month cannot be told apart
+    assert find_date_in_name("Minutes 03-04-2021.pdf") is None
+    assert find_date_in_name("2021-13-45 notes.pdf") is None
+
+    text = "SHARE PURCHASE AGREEMENT\nThis agreement is dated as of the 4th day of March, 2021"
+    assert find_dated_line(text) == "2021-03-04"
+    assert find_dated_line("Effective Date: January 1, 2020") == "2020-01-01"
+    assert find_dated_line("Made by and between the parties on 1 May 2020") is None
+
+
+def test_titles_from_document_properties(tmp_path):
+    make_docx(tmp_path / "a.docx", "Board Minutes")
+    make_docx(tmp_path / "b.docx", "Microsoft Word - b.docx")
+    (tmp_path / "c.pdf").write_bytes(PDF)
+    (tmp_path / "d.pdf").write_bytes(b"not a pdf")
+
+    assert read_document_title(str(tmp_path / "a.docx")) == "Board Minutes"
+    assert read_document_title(str(tmp_path / "b.docx")) is None
+    assert read_document_title(str(tmp_path / "c.pdf")) == "Share Purchase Agreement"
+    assert read_document_title(str(tmp_path / "d.pdf")) is None
+
+
+def test_local_fields_are_not_requested_from_the_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        text_analysis, "analysis_store", AnalysisStore(str(tmp_path / "store.db"))
+    )
+    (tmp_path / "2021-03-04 minutes.txt").write_text("Minutes of the meeting.")
+    (tmp_path / "lease.txt").write_text("This lease is made on 12 Sept 2019.")
+
+    job = _prepare_analysis(str(tmp_path), "2021-03-04 minutes.txt", date=True)
+    assert job.results["date"] == "2021-03-04"
+    assert not job.needs_analysis
+
+    job = _prepare_analysis(str(tmp_path), "lease.txt", title=True, date=True)
+    assert job.results["date"] == "2019-09-12"
+    assert job.fields_to_analyze == {"title": True}
+    prompt = get_text_analyzer().build_dynamic_prompt(
+        job.content, job.file_path, **job.analysis_kwargs()
+    )
+    assert "<title>" in prompt and "<date>" not in prompt
@@ -0,0 +1,90 @@
+import os
+import re
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import text_analysis
+from analysis_store import AnalysisStore
+from text_analysis import TextAnalyzer, AnalysisJob, _pack_jobs, analyze_documents
+from tests.bedrock_stubs import NonStreamingClient
+
+
+class PackedAnalyzer(TextAnalyzer):
+    """TextAnalyzer answering packed prompts with one title per document."""
+
+    def __init__(self):
+        super().__init__(client=NonStreamingClient())
+        self.prompts = []
+
+    def invoke_model(self, prompt):
+        self.prompts.append(prompt)
+        names = re.findall(r"<file_name>(.*?)</file_name>", prompt)
+        if len(names) == 1:
+            return f"<title>{names[0]}</title>", 10
+        response = "".join(
+            f'<result id="{idx}"><title>{name}</title></result>'
+            for idx, name in enumerate(names, 1)
+        )
+        return response, 10
+
+
+def test_parse_packed_response_demultiplexes_documents():
+    analyzer = TextAnalyzer(client=NonStreamingClient())
+    response = """
+    <result id="1"><title>Lease</title><date>2019-01-01</date></result>
+    <result id="3"><title>Notice</title><date>N/A</date></result>
+    """
+
+    results = analyzer.parse_packed_response(response, 3, get_title=True, get_date=True)
+
+    assert results[0] == {"title": "Lease", "date": "2019-01-01"}
+    assert results[1] is None
+    assert results[2] == {"title": "Notice", "date": "N/A"}
+
+
+def test_pack_jobs_respects_budget_and_fields():
+    small = [
+        AnalysisJob(f"doc{idx}.txt", {}, {"title": True}, content="x" * 4000)
+        for idx in range(5)
+    ]
+    other_fields = AnalysisJob("other.txt", {}, {"date": True}, content="short")
+    large = AnalysisJob("large.txt", {}, {"title": True}, content="x" * 40000)
+
+    batches = _pack_jobs(small + [other_fields, large])
+
+    sizes = sorted(len(batch) for batch in batches)
+    # 1000 estimated tokens each, so at most 12 fit the default budget
+    assert sizes == [1, 1, 5]
+    assert all(len({str(job.fields_to_analyze) for job in b}) == 1 for b in batches)
+
+
+def test_analyze_documents_packs_small_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        text_analysis, "analysis_store", AnalysisStore(str(tmp_path / "store.db"))
+    )
+    analyzer = PackedAnalyzer()
+    monkeypatch.setattr(text_analysis, "get_text_analyzer", lambda: analyzer)
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for idx in range(4):
+        (docs / f"letter{idx}.txt").write_text(f"Short letter number {idx}")
+
+    result = analyze_documents.invoke({"working_directory": str(docs), "title": True})
+
+    assert len(analyzer.prompts) == 1
+    assert result["total_tokens"] == 10
+    assert {path: meta["title"] for path, meta in result["file_metadata"].items()} == {
+        f"letter{idx}.txt": f"letter{idx}.txt" for idx in range(4)
+    }
+
+
+def test_analyze_documents_reports_missing_paths(tmp_path):
+    missing = str(tmp_path / "missing")
+
+    result = analyze_documents.invoke({"working_directory": missing, "title": True})
+    assert result["message"] == f"Path '{missing}' does not exist"
+
+    result = analyze_documents.invoke(
+        {"working_directory": str(tmp_path), "path": "leases", "title": True}
+    )
+    assert result["message"] == "Path 'leases' does not exist"
@@ -0,0 +1,127 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from persistent import ChunkedList, HashMap, apply_delta, make_delta
+from reducers import (
+    ClearList,
+    ClearMap,
+    UpdateItem,
+    accumulate_list,
+    flexible_map,
+)
+
+
+class CollidingKey:
+    """Key whose hash collides with all other keys."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __hash__(self):
+        return 42
+
+    def __eq__(self, other):
+        return isinstance(other, CollidingKey) and other.value == self.value
+
+
+def test_chunked_list_keeps_previous_versions():
+    versions = [ChunkedList()]
+    expected = []
+    for start in range(0, 5000, 37):
+        batch = list(range(start, start + 37))
+        versions.append(versions[-1].extend(batch))
+        expected.append(list(range(start + 37)))
+
+    for version, items in zip(versions[1:], expected):
+        assert len(version) == len(items)
+        assert list(version) == items
+    last = versions[-1]
+    assert last[0] == 0 and last[1057] == 1057 and last[-1] == expected[-1][-1]
+    assert last[10:13] == [10, 11, 12]
+    assert last.append("x")[-1] == "x" and len(last) == len(expected[-1])
+
+
+def test_hash_map_set_and_merge():
+    maps = [HashMap()]
+    for idx in range(3000):
+        maps.append(maps[-1].set(f"file{idx}.txt", {"index": idx}))
+
+    assert len(maps[1000]) == 1000 and "file1000.txt" not in maps[1000]
+    merged = maps[-1].merge({"file5.txt": {"index": -1}, "new.txt": {}})
+    assert len(merged) == 3001
+    assert merged["file5.txt"] == {"index": -1}
+    assert maps[-1]["file5.txt"] == {"index": 5}
+    assert list(merged)[:2] == ["file0.txt", "file1.txt"]
+    assert list(merged)[-1] == "new.txt"
+    assert merged == {
+        **dict(maps[-1].items()),
+        "file5.txt": {"index": -1},
+        "new.txt": {},
+    }
+
+
+def test_hash_map_handles_hash_collisions():
+    result = HashMap({"plain": 0})
+    for idx in range(20):
+        result = result.set(CollidingKey(idx), idx)
+    result = result.set(CollidingKey(3), "updated")
+
+    assert len(result) == 21
+    assert list(result)[:4] == [
+        "plain",
+        CollidingKey(0),
+        CollidingKey(1),
+        CollidingKey(2),
+    ]
+    assert result[CollidingKey(3)] == "updated"
+    assert result.get(CollidingKey(99)) is None
+    assert result["plain"] == 0
+
+
+def test_reducers_share_structure_and_clear():
+    files = accumulate_list([], ["a.txt", "b.txt"])
+    more = accumulate_list(files, ["c.txt"])
+    assert isinstance(more, ChunkedList)
+    assert list(files) == ["a.txt", "b.txt"] and more == ["a.txt", "b.txt", "c.txt"]
+    assert accumulate_list(more, ClearList()) == []
+
+    metadata = flexible_map({}, {"a.txt": {"category": "Leases"}})
+    updated = flexible_map(metadata, UpdateItem("a.txt", {"title": "Lease"}))
+    added = flexible_map(updated, UpdateItem("b.txt", {"title": "Deed"}))
+    assert metadata["a.txt"] == {"category": "Leases"}
+    assert updated["a.txt"] == {"category": "Leases", "title": "Lease"}
+    assert added["b.txt"] == {"title": "Deed"} and "b.txt" not in updated
+    assert len(flexible_map(added, ClearMap())) == 0
+
+
+def test_collections_round_trip_through_checkpoint_serializer():
+    serde = JsonPlusSerializer()
+    files = ChunkedList(f"file{idx}.txt" for idx in range(100))
+    metadata = HashMap({f"file{idx}.txt": {"index": idx} for idx in range(100)})
+
+    loaded_files = serde.loads_typed(serde.dumps_typed(files))
+    loaded_metadata = serde.loads_typed(serde.dumps_typed(metadata))
+
+    assert isinstance(loaded_files, ChunkedList) and loaded_files == files
+    assert isinstance(loaded_metadata, HashMap) and loaded_metadata == metadata
+
+
+def test_deltas_hold_only_the_changes():
+    files = ChunkedList(f"file{idx}.txt" for idx in range(1000))
+    more = files.replace({10: "renamed.txt"}).extend(["new.txt"])
+    delta = make_delta(files, more)
+    assert delta == {"indexes": [10, 1000], "items": ["renamed.txt", "new.txt"]}
+    assert apply_delta(files, delta) == more
+
+    metadata = HashMap({f"file{idx}.txt": {"index": idx} for idx in range(1000)})
+    updated = metadata.merge({"file3.txt": {"index": -3}, "new.txt": {}})
+    delta = make_delta(metadata, updated)
+    assert delta == {"keys": ["file3.txt", "new.txt"], "values": [{"index": -3}, {}]}
+    assert list(apply_delta(metadata, delta).items()) == list(updated.items())
+
+    # Unrelated or mostly rewritten versions need a full copy
+    assert make_delta(files, ChunkedList(["other.txt"])) is None
+    assert make_delta(metadata, HashMap({"other.txt": {}})) is None
@@ -0,0 +1,121 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph
+
+from agent_runner import AgentRunner
+from planner import add_plan_nodes
+from state import State
+
+moved = []
+
+
+@tool
+def list_items(working_directory: str, path: str) -> str:
+    """List a folder."""
+    return "a.pdf\nb.pdf"
+
+
+@tool
+def move_item(working_directory: str, source_path: str, dest_path: str) -> dict:
+    """Move an item."""
+    if source_path.startswith("missing"):
+        return {
+            "message": f"Source path '{source_path}' does not exist",
+            "affected_files": [],
+        }
+    moved.append(source_path)
+    return {"message": "Moved", "affected_files": [source_path, dest_path]}
+
+
+def plan(*steps, response="") -> AIMessage:
+    return AIMessage(
+        content="",
+        tool_calls=[
+            {
+                "name": "Plan",
+                "args": {"steps": list(steps), "response": response},
+                "id": "plan",
+            }
+        ],
+    )
+
+
+def step(step_id, tool_name, depends_on=(), review=False, **args):
+    return {
+        "id": step_id,
+        "tool": tool_name,
+        "args": {"working_directory": "/w", **args},
+        "depends_on": list(depends_on),
+        "review": review,
+    }
+
+
+def run(tmp_path, model_messages, request="Sort the files"):
+    moved.clear()
+    model = GenericFakeChatModel(messages=iter(model_messages))
+    builder = StateGraph(State)
+    add_plan_nodes(builder, model, [list_items, move_item])
+    runner = AgentRunner(str(tmp_path))
+    runner.agent = builder.compile(checkpointer=MemorySaver())
+    result = runner.run(request)
+    messages = runner.agent.get_state(runner.memory_config).values["messages"]
+    return result, messages
+
+
+def test_plan_runs_without_calling_the_model_again(tmp_path):
+    steps = [
+        step(
+            f"move{idx}",
+            "move_item",
+            source_path=f"f{idx}.pdf",
+            dest_path=f"d/f{idx}.pdf",
+        )
+        for idx in range(40)
+    ]
+    # The model can be called only once
+    result, messages = run(tmp_path, [plan(*steps, response="Sorted 40 files.")])
+
+    assert result.result_message == "Sorted 40 files."
+    assert sorted(moved) == sorted(f"f{idx}.pdf" for idx in range(40))
+    assert len([msg for msg in messages if isinstance(msg, ToolMessage)]) == 40
+    assert len(result.state["affected_files"]) == 80
+
+
+def test_replans_after_review_and_failure(tmp_path):
+    result, messages = run(
+        tmp_path,
+        [
+            plan(step("list", "list_items", review=True, path="inbox")),
+            plan(
+                step(
+                    "first", "move_item", source_path="missing.pdf", dest_path="x.pdf"
+                ),
+                step(
+                    "second",
+                    "move_item",
+                    depends_on=["first"],
+                    source_path="a.pdf",
+                    dest_path="x/a.pdf",
+                ),
+                step("third", "move_item", source_path="b.pdf", dest_path="y/b.pdf"),
+                response="Moved.",
+            ),
+            AIMessage(content="a.pdf could not be moved."),
+        ],
+    )
+
+    # The listing was reviewed, then the failed move led to a third plan
+    assert result.result_message == "a.pdf could not be moved."
+    assert moved == ["b.pdf"]
+    results = {
+        msg.tool_call_id: msg for msg in messages if isinstance(msg, ToolMessage)
+    }
+    second_plan = [msg for msg in messages if isinstance(msg, AIMessage)][1]
+    not_run = results[second_plan.tool_calls[1]["id"]]
+    assert not_run.status == "error" and "not run" in not_run.content
@@ -0,0 +1,73 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import folder_operations
+from search_index import SearchIndex
+from folder_operations import search_documents
+
+
+def make_documents(root):
+    (root / "leases").mkdir()
+    (root / "leases" / "office_lease.txt").write_text(
+        "The tenant shall pay the monthly rent to the landlord."
+    )
+    (root / "leases" / "warehouse.md").write_text(
+        "Warehouse agreement. Rent is due quarterly."
+    )
+    (root / "invoice.txt").write_text("Invoice for consulting services.")
+    (root / "image.png").write_bytes(b"rent")
+
+
+def test_search_ranks_and_updates_incrementally(tmp_path):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    make_documents(workspace)
+    index = SearchIndex(str(tmp_path / "search.db"))
+
+    assert index.refresh(str(workspace)) == 3
+    hits = index.search(str(workspace), "tenant rent")
+    assert [os.path.basename(hit.path) for hit in hits] == [
+        "office_lease.txt",
+        "warehouse.md",
+    ]
+    assert "[tenant]" in hits[0].snippet
+    assert index.search(str(workspace), "tenant rent", match_all=True)[0] == hits[0]
+    assert len(index.search(str(workspace), "tenant rent", match_all=True)) == 1
+
+    # Unchanged files are not extracted again
+    assert index.refresh(str(workspace)) == 0
+
+    (workspace / "invoice.txt").unlink()
+    (workspace / "leases" / "warehouse.md").write_text("Storage agreement for pallets.")
+    assert index.refresh(str(workspace)) == 1
+    assert index.search(str(workspace), "invoice") == []
+    assert [hit.path for hit in index.search(str(workspace), "pallets")] == [
+        str(workspace / "leases" / "warehouse.md")
+    ]
+    # Searches are limited to the requested folder
+    assert index.search(str(workspace / "leases"), "consulting") == []
+
+
+def test_search_documents_tool(tmp_path, monkeypatch):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    make_documents(workspace)
+    monkeypatch.setattr(
+        folder_operations, "search_index", SearchIndex(str(tmp_path / "search.db"))
+    )
+
+    result = search_documents.invoke(
+        {"working_directory": str(workspace), "query": "landlord"}
+    )
+
+    lines = result.splitlines()
+    assert len(lines) == 1
+    assert lines[0].startswith(f"📄 {os.path.join('leases', 'office_lease.txt')}: ")
+    assert "[landlord]" in lines[0]
+    assert (
+        search_documents.invoke(
+            {"working_directory": str(workspace), "query": "pallets"}
+        )
+        == "No documents found matching 'pallets'"
+    )
@@ -0,0 +1,127 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from langchain_core.messages import AIMessage
+from langgraph.graph import StateGraph, START, END
+
+from agent_runner import AgentRunner
+from action_types import ActionInfo, ActionType
+from sqlite_checkpointer import SqliteCheckpointSaver
+from state import State
+
+
+def organize(state):
+    count = len(state["messages"])
+    return {
+        "messages": AIMessage(content="Organized " * 200),
+        "affected_files": [f"file{count}.txt"],
+        "file_metadata": {f"file{count}.txt": {"category": "Leases"}},
+        "actions": [
+            ActionInfo(
+                action_type=ActionType.CREATE_FILE,
+                item_name=f"file{count}.txt",
+                target_path=f"file{count}.txt",
+            )
+        ],
+    }
+
+
+def make_graph(saver):
+    builder = StateGraph(State)
+    builder.add_node("assistant", organize)
+    builder.add_edge(START, "assistant")
+    builder.add_edge("assistant", END)
+    return builder.compile(checkpointer=saver)
+
+
+def test_runner_resumes_after_restart(tmp_path):
+    db_path = str(tmp_path / "checkpoints.db")
+    runner = AgentRunner(
+        str(tmp_path), agent=make_graph(SqliteCheckpointSaver(db_path, keep_last=3))
+    )
+    for idx in range(5):
+        result = runner.run(f"Organize batch {idx}")
+    assert result.actions[0].item_name == "file9.txt"
+
+    # A new process opens the same database
+    saver = SqliteCheckpointSaver(db_path, keep_last=3)
+    resumed = AgentRunner(
+        str(tmp_path / "other"), thread_id=runner.thread_id, agent=make_graph(saver)
+    )
+    assert resumed.resumed
+    assert resumed.working_directory == str(tmp_path)
+    assert resumed.affected_files == runner.affected_files
+    assert resumed.file_metadata["file9.txt"] == {"category": "Leases"}
+
+    # Only the last checkpoints are kept
+    config = {"configurable": {"thread_id": runner.thread_id}}
+    assert len(list(saver.list(config))) == 3
+    assert len(resumed.agent.get_state(config).values["messages"]) == 10
+
+    result = resumed.run("Organize once more")
+    assert result.result_message.startswith("Organized")
+    assert len(resumed.agent.get_state(config).values["messages"]) == 12
+
+
+def test_unknown_thread_starts_fresh(tmp_path):
+    saver = SqliteCheckpointSaver(str(tmp_path / "checkpoints.db"))
+    runner = AgentRunner(str(tmp_path), thread_id="missing", agent=make_graph(saver))
+    assert not runner.resumed
+    assert runner.thread_id == "missing"
+
+
+def test_large_values_are_compressed_and_idle_threads_expire(tmp_path):
+    saver = SqliteCheckpointSaver(
+        str(tmp_path / "checkpoints.db"), compress_min_bytes=512
+    )
+    graph = make_graph(saver)
+    graph.invoke(
+        {"messages": [("user", "hi")], "analysis_tokens": 0},
+        {"configurable": {"thread_id": "old"}},
+    )
+    types = {row[0] for row in saver._connect().execute("SELECT type FROM checkpoints")}
+    assert any(type_.endswith("+zlib") for type_ in types)
+
+    assert saver.delete_threads_before(time.time() - 60) == 0
+    assert saver.delete_threads_before(time.time() + 1) == 1
+    assert saver.get_tuple({"configurable": {"thread_id": "old"}}) is None
+    assert saver.list_threads() == []
+
+
+def test_large_channels_are_stored_as_deltas(tmp_path):
+    db_path = str(tmp_path / "checkpoints.db")
+    saver = SqliteCheckpointSaver(db_path, keep_last=3, snapshot_interval=4)
+    graph = make_graph(saver)
+    config = {"configurable": {"thread_id": "deltas"}}
+    for idx in range(8):
+        graph.invoke(
+            {"messages": [("user", f"Organize batch {idx}")], "analysis_tokens": 0},
+            config,
+        )
+    state = graph.get_state(config).values
+    assert len(state["affected_files"]) == 8
+
+    rows = (
+        saver._connect()
+        .execute("SELECT channel, base_checkpoint_id, depth FROM channel_deltas")
+        .fetchall()
+    )
+    assert {channel for channel, _, _ in rows} == {"affected_files", "file_metadata"}
+    assert any(base_id for _, base_id, _ in rows)
+    assert max(depth for _, _, depth in rows) == 3
+    # Pruned checkpoints only keep the rows the kept ones are built from
+    assert len(rows) <= 2 * 6
+
+    # A new process rebuilds the values from the stored changes
+    restored = make_graph(SqliteCheckpointSaver(db_path, keep_last=3))
+    restored_state = restored.get_state(config).values
+    assert list(restored_state["affected_files"]) == list(state["affected_files"])
+    assert dict(restored_state["file_metadata"]) == dict(state["file_metadata"])
+    type_, data = (
+        saver._connect()
+        .execute("SELECT type, checkpoint FROM checkpoints ORDER BY checkpoint_id DESC")
+        .fetchone()
+    )
+    assert "file_metadata" not in saver._load(type_, data)["channel_values"]
@@ -0,0 +1,110 @@
+import io
+import os
+import sys
+import json
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from text_analysis import TextAnalyzer, IncrementalTagParser
+from tests.bedrock_stubs import client_error
+
+
+class FakeEventStream:
+    """Stand-in for the botocore event stream of invoke_model_with_response_stream."""
+
+    def __init__(self, payloads):
+        self.payloads = payloads
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        for payload in self.payloads:
+            self.consumed += 1
+            yield {"chunk": {"bytes": json.dumps(payload).encode("utf-8")}}
+
+    def close(self):
+        self.closed = True
+
+
+class FakeStreamingClient:
+    def __init__(self, texts):
+        payloads = [
+            {"type": "message_start", "message": {"usage": {"input_tokens": 50}}}
+        ]
+        payloads += [
+            {"type": "content_block_delta", "delta": {"type": "text_delta", "text": t}}
+            for t in texts
+        ]
+        payloads.append({"type": "message_delta", "usage": {"output_tokens": 30}})
+        self.stream = FakeEventStream(payloads)
+
+    def invoke_model_with_response_stream(self, **kwargs):
+        return {"body": self.stream}
+
+
+def test_parser_handles_tags_split_across_pieces():
+    parser = IncrementalTagParser(["category", "date"])
+
+    completed = []
+    for piece in [
+        "<cate",
+        "gory>Board docu",
+        "ments</categ",
+        "ory>\n<date>2021",
+        "</date>",
+    ]:
+        completed.extend(parser.feed(piece))
+
+    assert completed == [("category", "Board documents"), ("date", "2021")]
+    assert parser.is_complete
+
+
+def test_stream_closes_once_all_tags_arrived():
+    client = FakeStreamingClient(
+        ["<category>Contracts</category>", "<date>N/A</date>", "<extra>unused", " text"]
+    )
+    analyzer = TextAnalyzer(client=client)
+    fields = []
+
+    response, total_tokens = analyzer.invoke_model_stream(
+        "prompt", ["category", "date"], on_field=lambda tag, value: fields.append(tag)
+    )
+
+    assert fields == ["category", "date"]
+    assert client.stream.closed
+    # message_start and the two deltas carrying the requested tags
+    assert client.stream.consumed == 3
+    assert analyzer.parse_response(response, categorize=True, get_date=True) == {
+        "category": "Contracts",
+        "date": "N/A",
+    }
+    assert total_tokens > 50
+
+
+class FailingStreamClient:
+    """Client whose streaming call fails with a service error, counting the plain calls."""
+
+    def __init__(self, code):
+        self.code = code
+        self.invoke_calls = 0
+
+    def invoke_model_with_response_stream(self, **kwargs):
+        raise client_error(self.code)
+
+    def invoke_model(self, **kwargs):
+        self.invoke_calls += 1
+        body = {"content": [{"text": "<title>Lease</title>"}], "usage": {}}
+        return {"body": io.BytesIO(json.dumps(body).encode("utf-8"))}
+
+
+def test_only_unsupported_streaming_falls_back():
+    client = FailingStreamClient("ValidationException")
+    response, _ = TextAnalyzer(client=client).invoke_model_stream("prompt", ["title"])
+    assert response == "<title>Lease</title>" and client.invoke_calls == 1
+
+    # Throttling is not retried as a second request
+    client = FailingStreamClient("ThrottlingException")
+    response, total_tokens = TextAnalyzer(client=client).invoke_model_stream(
+        "prompt", ["title"]
+    )
+    assert response.startswith("Error invoking Bedrock model")
+    assert total_tokens == 0 and client.invoke_calls == 0
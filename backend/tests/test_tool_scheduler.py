@@ -0,0 +1,160 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from typing import Annotated
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import InjectedToolCallId, tool
+from langgraph.graph import StateGraph, START, MessagesState
+from langgraph.types import Command
+
+from tool_scheduler import PathLockManager, ToolScheduler, get_tool_access
+
+events = []
+events_lock = threading.Lock()
+
+
+def record(name: str, delay: float) -> str:
+    with events_lock:
+        events.append(("start", name))
+    time.sleep(delay)
+    with events_lock:
+        events.append(("end", name))
+    return name
+
+
+@tool
+def list_items(working_directory: str, path: str) -> str:
+    """List a folder."""
+    return record(f"list {path}", 0.2)
+
+
+@tool
+def move_item(working_directory: str, source_path: str, dest_path: str) -> str:
+    """Move an item."""
+    return record(f"move {source_path}", 0.1)
+
+
+def call(idx: int, tool_name: str, **args) -> dict:
+    return {
+        "name": tool_name,
+        "args": {"working_directory": "/w", **args},
+        "id": f"c{idx}",
+    }
+
+
+def test_conflicts_follow_paths_and_folders():
+    read_a = get_tool_access(call(0, "list_items", path="a"))
+    read_a_file = get_tool_access(call(1, "analyze_document", file_path="a/x.pdf"))
+    move_to_a = get_tool_access(
+        call(2, "move_item", source_path="b/x", dest_path="a/x")
+    )
+    create_c = get_tool_access(call(3, "create_item", name="x", parent_path="c"))
+
+    assert not read_a.conflicts_with(read_a_file)
+    assert move_to_a.conflicts_with(read_a) and read_a.conflicts_with(move_to_a)
+    assert not move_to_a.conflicts_with(create_c)
+    assert get_tool_access(call(4, "unknown")).conflicts_with(read_a)
+    assert get_tool_access(call(5, "delete_item")).exclusive
+
+    batch = get_tool_access(
+        call(
+            6,
+            "batch_operations",
+            operations=[{"operation": "rename", "source_path": "c/x", "new_name": "y"}],
+        )
+    )
+    assert batch.conflicts_with(create_c) and not batch.conflicts_with(read_a)
+
+
+def test_scheduler_runs_independent_calls_concurrently_in_order():
+    events.clear()
+    scheduler = ToolScheduler([list_items, move_item])
+    message = AIMessage(
+        content="",
+        tool_calls=[
+            call(0, "list_items", path="a"),
+            call(1, "list_items", path="a"),
+            call(2, "move_item", source_path="b/x", dest_path="a/x"),
+            call(3, "move_item", source_path="c/x", dest_path="d/x"),
+        ],
+    )
+
+    result = scheduler.invoke({"messages": [message]})
+
+    assert [msg.tool_call_id for msg in result["messages"]] == ["c0", "c1", "c2", "c3"]
+    # Both reads and the unrelated move start before anything ends, the move
+    # into the listed folder only after both reads are done
+    assert sorted(events[:3]) == [
+        ("start", "list a"),
+        ("start", "list a"),
+        ("start", "move c/x"),
+    ]
+    assert events[-2:] == [("start", "move b/x"), ("end", "move b/x")]
+
+
+def test_lock_manager_excludes_conflicting_holders():
+    locks = PathLockManager()
+    write_a = get_tool_access(call(0, "delete_item", path="a"))
+    read_inside = get_tool_access(call(1, "list_items", path="a/b"))
+    read_other = get_tool_access(call(2, "list_items", path="b"))
+    acquired = []
+
+    def read(access, name):
+        with locks.hold(access):
+            acquired.append(name)
+
+    with locks.hold(write_a):
+        threads = [
+            threading.Thread(target=read, args=(read_inside, "inside")),
+            threading.Thread(target=read, args=(read_other, "other")),
+        ]
+        for thread in threads:
+            thread.start()
+        threads[1].join(timeout=5)
+        time.sleep(0.05)
+        assert acquired == ["other"]
+    threads[0].join(timeout=5)
+    assert acquired == ["other", "inside"]
+
+
+class ChangeDirectoryState(MessagesState):
+    working_directory: str
+
+
+@tool
+def change_directory(
+    working_directory: str,
+    new_path: str,
+    tool_call_id: Annotated[str, InjectedToolCallId],
+) -> Command:
+    """Change the working directory."""
+    return Command(
+        update={
+            "working_directory": new_path,
+            "messages": [ToolMessage(content="Changed", tool_call_id=tool_call_id)],
+        }
+    )
+
+
+def test_scheduler_applies_commands_returned_by_tools():
+    builder = StateGraph(ChangeDirectoryState)
+    builder.add_node("tools", ToolScheduler([list_items, change_directory]))
+    builder.add_edge(START, "tools")
+    message = AIMessage(
+        content="",
+        tool_calls=[
+            call(0, "list_items", path="a"),
+            call(1, "change_directory", new_path="/w/b"),
+        ],
+    )
+
+    result = builder.compile().invoke(
+        {"messages": [message], "working_directory": "/w"}
+    )
+
+    assert result["working_directory"] == "/w/b"
+    assert [msg.content for msg in result["messages"][1:]] == ["list a", "Changed"]
@@ -0,0 +1,114 @@
+import errno
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import folder_operations
+from directory_index import DirectoryIndex
+from trash import Trash
+from folder_operations import delete_item, list_items, trash_status
+
+
+def use_temp_index(tmp_path_factory, monkeypatch):
+    # Kept out of the folders being deleted, which the tests list
+    index_path = tmp_path_factory.mktemp("index") / "index.db"
+    monkeypatch.setattr(
+        folder_operations, "directory_index", DirectoryIndex(str(index_path))
+    )
+
+
+def make_matter(root):
+    for idx in range(3):
+        folder = root / "matter" / f"part{idx}"
+        folder.mkdir(parents=True)
+        for file_idx in range(20):
+            (folder / f"doc{file_idx}.txt").write_text("x")
+
+
+def test_delete_moves_folder_to_trash(tmp_path, tmp_path_factory, monkeypatch):
+    monkeypatch.setattr(folder_operations, "trash", Trash(root=str(tmp_path)))
+    use_temp_index(tmp_path_factory, monkeypatch)
+    make_matter(tmp_path)
+
+    result = delete_item.invoke({"working_directory": str(tmp_path), "path": "matter"})
+
+    assert not (tmp_path / "matter").exists()
+    trash_path = result["action"]["target_path"]
+    assert os.path.isdir(trash_path)
+    assert len(os.listdir(os.path.join(trash_path, "part0"))) == 20
+    assert "in trash at" in result["action"]["description"]
+
+    status = trash_status.invoke({"working_directory": str(tmp_path)})
+    assert f"{tmp_path / 'matter'} -> {trash_path}" in status
+    # The trash folder is not part of the listings
+    listing = list_items.invoke({"working_directory": str(tmp_path)})
+    assert listing == "No all found in working directory"
+
+
+def test_reap_and_restore(tmp_path):
+    trash = Trash(root=str(tmp_path), retention_seconds=3600, max_workers=4)
+    make_matter(tmp_path)
+    (tmp_path / "note.txt").write_text("note")
+    matter = trash.move_to_trash(str(tmp_path / "matter"))
+    note = trash.move_to_trash(str(tmp_path / "note.txt"))
+    trash_dir = trash.get_trash_dir()
+
+    # Nothing is reaped before the retention time has passed
+    assert trash.reap() == 0
+    assert trash.restore(note)
+    assert (tmp_path / "note.txt").read_text() == "note"
+
+    assert trash.reap(force=True) == 1
+    assert not os.path.exists(matter.trash_path)
+    assert trash.list_entries() == []
+    assert os.listdir(trash_dir) == []
+
+
+def test_delete_only_falls_back_across_filesystems(
+    tmp_path, tmp_path_factory, monkeypatch
+):
+    use_temp_index(tmp_path_factory, monkeypatch)
+    trash = Trash(root=str(tmp_path))
+    monkeypatch.setattr(folder_operations, "trash", trash)
+    (tmp_path / "a.txt").write_text("a")
+    (tmp_path / "b.txt").write_text("b")
+
+    def fail_with(error_number):
+        def move_to_trash(full_path):
+            raise OSError(error_number, os.strerror(error_number))
+
+        return move_to_trash
+
+    monkeypatch.setattr(trash, "move_to_trash", fail_with(errno.EACCES))
+    result = delete_item.invoke({"working_directory": str(tmp_path), "path": "a.txt"})
+    assert result["affected_files"] == [] and "Error" in result["message"]
+    assert (tmp_path / "a.txt").exists()
+
+    monkeypatch.setattr(trash, "move_to_trash", fail_with(errno.EXDEV))
+    result = delete_item.invoke({"working_directory": str(tmp_path), "path": "b.txt"})
+    assert result["message"] == "Deleted file 'b.txt'"
+    assert not (tmp_path / "b.txt").exists()
+
+
+def test_trash_stays_at_the_workspace_root(tmp_path, tmp_path_factory, monkeypatch):
+    trash = Trash(root=str(tmp_path))
+    monkeypatch.setattr(folder_operations, "trash", trash)
+    use_temp_index(tmp_path_factory, monkeypatch)
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "a" / "b" / "x.txt").write_text("x")
+
+    # Deleting from a subfolder, then deleting that subfolder, keeps the entries
+    delete_item.invoke({"working_directory": str(tmp_path / "a"), "path": "b/x.txt"})
+    delete_item.invoke({"working_directory": str(tmp_path / "a"), "path": "b"})
+    delete_item.invoke({"working_directory": str(tmp_path), "path": "a"})
+    assert os.listdir(tmp_path) == [".file_flow_trash"]
+    assert len(trash.list_entries()) == 3
+
+    # A failed move does not leave an empty trash folder behind
+    other = Trash(root=str(tmp_path / "empty"))
+    (tmp_path / "empty").mkdir()
+    try:
+        other.move_to_trash(str(tmp_path / "missing.txt"))
+    except OSError:
+        pass
+    assert os.listdir(tmp_path / "empty") == []
@@ -0,0 +1,52 @@
+import io
+import struct
+
+from doc_extractor import FC_COMPRESSED_FLAG, WORD_BINARY_IDENT
+
+
+def build_word_streams(pieces):
+    """Build minimal WordDocument and 1Table streams holding the given pieces.
+
+    Args:
+        pieces (list): (text, compressed) tuples in document order
+
+    Returns:
+        tuple: WordDocument and table streams as BytesIO objects
+    """
+    ccp_text = sum(len(text) for text, _ in pieces)
+
+    fib = bytearray(32)
+    struct.pack_into("<HH", fib, 0, WORD_BINARY_IDENT, 0x00C1)
+    struct.pack_into("<H", fib, 0x0A, 0x0200)  # Use the 1Table stream
+    fib += struct.pack("<H", 14) + bytes(28)
+    rg_lw = bytearray(22 * 4)
+    struct.pack_into("<i", rg_lw, 3 * 4, ccp_text)
+    fib += struct.pack("<H", 22) + rg_lw
+    rg_fc_lcb = bytearray(93 * 8)
+    fib += struct.pack("<H", 93)
+    rg_fc_lcb_offset = len(fib)
+    fib += rg_fc_lcb
+
+    # Store the piece data after the FIB
+    word_data = bytearray(fib)
+    cps = [0]
+    pcds = b""
+    for text, compressed in pieces:
+        offset = len(word_data)
+        if compressed:
+            word_data += text.encode("cp1252")
+            fc = (offset * 2) | FC_COMPRESSED_FLAG
+        else:
+            word_data += text.encode("utf-16-le")
+            fc = offset
+        cps.append(cps[-1] + len(text))
+        pcds += struct.pack("<HIH", 0, fc, 0)
+
+    plc = struct.pack(f"<{len(cps)}I", *cps) + pcds
+    # A property modifier precedes the piece table descriptor
+    clx = b"\x01" + struct.pack("<h", 2) + b"\x00\x00"
+    clx += b"\x02" + struct.pack("<I", len(plc)) + plc
+    table_data = bytes(16) + clx
+    struct.pack_into("<II", word_data, rg_fc_lcb_offset + 33 * 8, 16, len(clx))
+
+    return io.BytesIO(bytes(word_data)), io.BytesIO(table_data)
@@ -1,17 +1,61 @@
 import os
+import glob
+import hashlib
 import json
 import re
-from typing import Dict, Optional, Any, Annotated
-import boto3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Any, Annotated
+import threading
+from botocore.exceptions import ClientError
 from langchain_core.tools import tool
 from langgraph.prebuilt import InjectedState
+from langgraph.config import get_stream_writer
 
-from utils import truncate_text
-from config import AWS_DEFAULT_REGION, BEDROCK_TEXT_MODEL_ID, DEBUG_LLM
+from utils import truncate_text, split_text
+from config import (
+    BEDROCK_TEXT_MODEL_ID,
+    DEBUG_LLM,
+    ANALYSIS_MAX_WORKERS,
+    BULK_ANALYSIS_MAX_FILES,
+    PACKED_PROMPT_TOKEN_BUDGET,
+    PACKED_DOCUMENT_MAX_TOKENS,
+    PACKED_MAX_DOCUMENTS,
+    ANALYSIS_STREAMING,
+    LONG_DOCUMENT_MAP_REDUCE,
+    LONG_DOCUMENT_TOKEN_BUDGET,
+    LONG_DOCUMENT_CHUNK_TOKENS,
+    LONG_DOCUMENT_CHUNK_OVERLAP_TOKENS,
+    LONG_DOCUMENT_MAX_WORKERS,
+    TRASH_DIRECTORY_NAME,
+    KEYWORD_CLASSIFIER_ENABLED,
+    KEYWORD_CLASSIFIER_MIN_CONFIDENCE,
+    LOCAL_METADATA_EXTRACTION,
+)
 from categories import categories_manager
+from keyword_classifier import keyword_classifier
+from metadata_extractor import extract_fields
+from bedrock_client import get_bedrock_client
+from analysis_store import analysis_store
 from folder_operations import _get_full_path, get_content
 
 
+# Maximum amount of document content sent to the model per analysis
+ANALYSIS_MAX_WORDS = 2000
+ANALYSIS_MAX_CHARS = 8000
+
+# Rough number of characters per token, used to estimate prompt sizes
+CHARS_PER_TOKEN = 4
+
+# Number of hex digits of the content hash recorded in the file metadata
+CONTENT_HASH_LENGTH = 16
+
+# Error codes of invoke_model_with_response_stream meaning streaming is not
+# allowed for the model or the credentials; invoke_model may still work
+STREAMING_UNSUPPORTED_ERRORS = {"AccessDeniedException", "ValidationException"}
+
+
 # Define prompt templates for each analysis type
 PROMPT_TEMPLATES = {
     "categorize": """
@@ -44,15 +88,93 @@ PROMPT_TEMPLATES = {
 }
 
 
+# Prompt templates for merging the partial results of a long document
+REDUCE_PROMPT_TEMPLATES = {
+    "summary": """
+    {number}. SUMMARY: Provide a SINGLE brief summary (3-5 sentences) of the whole document, combining the summaries of its parts.
+    Focus on the key information and main purpose of the document.
+    Surround the result with <summary> tag.
+    """,
+    "question": """
+    {number}. QUESTION: Question: {question}
+    Provide a SINGLE clear and concise answer to this question for the whole document, combining the answers found in its parts.
+    Ignore parts that do not address the question. If no part answers it, state that clearly.
+    Surround the result with <question> tag.
+    """,
+}
+
+
+# XML tag in the model response for each analysis argument
+ANALYSIS_TAGS = {
+    "categorize": "category",
+    "get_title": "title",
+    "get_date": "date",
+    "get_subject": "subject",
+    "get_summary": "summary",
+    "question": "question",
+}
+
+
+class IncrementalTagParser:
+    """Extract XML-tagged fields from a response that arrives in pieces."""
+
+    def __init__(self, tags: List[str]):
+        """Initialize the parser.
+
+        Args:
+            tags (List[str]): The tags to extract; only the first occurrence of each is kept
+        """
+        self.pending = set(tags)
+        self.fields: Dict[str, str] = {}
+        self._buffer = ""
+        self._pattern = re.compile(
+            r"<(" + "|".join(map(re.escape, tags)) + r")>(.*?)</\1>", re.DOTALL
+        )
+
+    @property
+    def is_complete(self) -> bool:
+        """Whether every requested tag has been closed."""
+        return not self.pending
+
+    def feed(self, text: str) -> List[tuple[str, str]]:
+        """Add the next piece of the response.
+
+        Args:
+            text (str): Newly received response text
+
+        Returns:
+            List[tuple[str, str]]: (tag, value) of each field completed by this piece
+        """
+        if not self.pending:
+            return []
+
+        self._buffer += text
+        completed = []
+        consumed = 0
+        for match in self._pattern.finditer(self._buffer):
+            tag = match.group(1)
+            if tag in self.pending:
+                value = match.group(2).strip()
+                self.pending.discard(tag)
+                self.fields[tag] = value
+                completed.append((tag, value))
+            consumed = match.end()
+
+        # Only text after the last complete field can still contain an open tag
+        self._buffer = self._buffer[consumed:]
+        return completed
+
+
 class TextAnalyzer:
-    def __init__(self, model_id: str = BEDROCK_TEXT_MODEL_ID):
+    def __init__(self, model_id: str = BEDROCK_TEXT_MODEL_ID, client=None):
         """Initialize the TextAnalyzer with the specified Bedrock model.
 
         Args:
             model_id (str): The Bedrock model ID to use for analysis
+            client: The bedrock-runtime client to use. If None, uses the shared client
         """
         self.model_id = model_id
-        self.client = boto3.client("bedrock-runtime", region_name=AWS_DEFAULT_REGION)
+        self.client = client or get_bedrock_client()
         self.categories_manager = categories_manager
 
     def invoke_model(self, prompt: str) -> tuple[str, int]:
@@ -72,18 +194,7 @@ class TextAnalyzer:
                 modelId=self.model_id,
                 contentType="application/json",
                 accept="application/json",
-                body=json.dumps(
-                    {
-                        "anthropic_version": "bedrock-2023-05-31",
-                        "max_tokens": 4096,
-                        "messages": [
-                            {
-                                "role": "user",
-                                "content": [{"type": "text", "text": prompt}],
-                            }
-                        ],
-                    }
-                ),
+                body=self._build_request_body(prompt),
             )
 
             response_body = json.loads(response.get("body").read())
@@ -105,12 +216,119 @@ class TextAnalyzer:
 
             return response_text, total_tokens
         except Exception as e:
-            error_msg = f"Error invoking Bedrock model: {str(e)}"
-            if DEBUG_LLM:
-                print(
-                    "\033[38;5;208m=== ERROR ===\n" + error_msg + "\n===========\033[0m"
-                )
-            return error_msg, 0
+            return self._error_response(e)
+
+    def _error_response(self, error: Exception) -> tuple[str, int]:
+        """Return the response of a failed model call, with the error as its text."""
+        error_msg = f"Error invoking Bedrock model: {str(error)}"
+        if DEBUG_LLM:
+            print("\033[38;5;208m=== ERROR ===\n" + error_msg + "\n===========\033[0m")
+        return error_msg, 0
+
+    def _build_request_body(self, prompt: str) -> str:
+        """Build the JSON request body for a single-message prompt."""
+        return json.dumps(
+            {
+                "anthropic_version": "bedrock-2023-05-31",
+                "max_tokens": 4096,
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": [{"type": "text", "text": prompt}],
+                    }
+                ],
+            }
+        )
+
+    def invoke_model_stream(
+        self,
+        prompt: str,
+        tags: List[str],
+        on_field: Optional[Callable[[str, str], None]] = None,
+    ) -> tuple[str, int]:
+        """Invoke the Bedrock model with a streaming response, stopping once all tags are complete.
+
+        Falls back to invoke_model if the model or the credentials do not allow
+        streaming; other errors, such as throttling, are returned like in invoke_model.
+
+        Args:
+            prompt (str): The prompt to send to the model
+            tags (List[str]): The XML tags expected in the response
+            on_field (Optional[Callable[[str, str], None]]): Called with the tag and value of each field as it completes
+
+        Returns:
+            tuple[str, int]: A tuple containing the model's response text and total tokens used
+        """
+        if DEBUG_LLM:
+            print("\033[38;5;208m=== PROMPT ===\n" + prompt + "\n=============\033[0m")
+
+        try:
+            response = self.client.invoke_model_with_response_stream(
+                modelId=self.model_id,
+                contentType="application/json",
+                accept="application/json",
+                body=self._build_request_body(prompt),
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in STREAMING_UNSUPPORTED_ERRORS:
+                if DEBUG_LLM:
+                    print(
+                        f"Streaming unavailable, falling back to invoke_model: {str(e)}"
+                    )
+                return self.invoke_model(prompt)
+            return self._error_response(e)
+        except Exception as e:
+            return self._error_response(e)
+
+        parser = IncrementalTagParser(tags)
+        text_parts = []
+        input_tokens = 0
+        output_tokens = None
+        stream = response["body"]
+
+        try:
+            for event in stream:
+                chunk = event.get("chunk")
+                if not chunk:
+                    continue
+                payload = json.loads(chunk["bytes"])
+
+                if payload.get("type") == "message_start":
+                    usage = payload.get("message", {}).get("usage", {})
+                    input_tokens = usage.get("input_tokens", 0)
+                elif payload.get("type") == "content_block_delta":
+                    text = payload.get("delta", {}).get("text", "")
+                    text_parts.append(text)
+                    for tag, value in parser.feed(text):
+                        if on_field:
+                            on_field(tag, value)
+                    if parser.is_complete:
+                        break
+                elif payload.get("type") == "message_delta":
+                    output_tokens = payload.get("usage", {}).get("output_tokens")
+        except Exception as e:
+            return self._error_response(e)
+        finally:
+            # Closing the stream early stops generation of output we would discard
+            stream.close()
+
+        response_text = "".join(text_parts)
+        if output_tokens is None:
+            # The final usage event is not received when the stream is closed early
+            output_tokens = len(response_text) // CHARS_PER_TOKEN + 1
+        total_tokens = input_tokens + output_tokens
+
+        if DEBUG_LLM:
+            print(
+                "\033[38;5;208m=== RESPONSE ===\n"
+                + response_text
+                + "\n==============\033[0m"
+            )
+            print(
+                f"\033[38;5;208m=== TOTAL TOKENS USED ===\n{total_tokens}\n==============\033[0m"
+            )
+
+        return response_text, total_tokens
 
     def build_instruction_section(
         self,
@@ -235,6 +453,176 @@ class TextAnalyzer:
 
         return prompt
 
+    def build_reduce_prompt(
+        self,
+        filename: str,
+        partial_results: List[Dict[str, Any]],
+        get_summary: bool = False,
+        question: Optional[str] = None,
+    ) -> str:
+        """Build a prompt merging the partial results of the parts of a long document.
+
+        Args:
+            filename (str): The name of the file
+            partial_results (List[Dict[str, Any]]): Results parsed for each part, in document order
+            get_summary (bool): Whether to create a summary
+            question (Optional[str]): A specific question to answer
+
+        Returns:
+            str: The complete prompt with instruction and partial results sections
+        """
+        instruction_parts = [
+            """
+            You are analyzing a long legal document that was split into consecutive parts. Each part
+            was analyzed separately and the partial results are provided below in document order.
+            For each analysis task, provide EXACTLY ONE response for the whole document within the
+            specified XML tags. Do not include any text outside the XML tags.
+            """
+        ]
+
+        number = 1
+        if get_summary:
+            instruction_parts.append(
+                REDUCE_PROMPT_TEMPLATES["summary"].format(number=number)
+            )
+            number += 1
+        if question:
+            instruction_parts.append(
+                REDUCE_PROMPT_TEMPLATES["question"].format(
+                    number=number, question=question
+                )
+            )
+
+        part_sections = []
+        for idx, results in enumerate(partial_results, 1):
+            lines = [f'<part id="{idx}">']
+            if "summary" in results:
+                lines.append(f"<summary>{results['summary']}</summary>")
+            if "question_answer" in results:
+                lines.append(f"<answer>{results['question_answer']['answer']}</answer>")
+            lines.append("</part>")
+            part_sections.append("\n".join(lines))
+
+        parts = "\n".join(part_sections)
+        instruction_section = "\n".join(instruction_parts)
+        prompt = f"""
+        {instruction_section}
+
+        Partial results:
+
+        {parts}
+        <file_name>{filename}</file_name>
+        """
+
+        return prompt
+
+    def build_packed_prompt(
+        self,
+        documents: List[tuple[str, str]],
+        categorize: bool = False,
+        get_title: bool = False,
+        get_date: bool = False,
+        get_subject: bool = False,
+        get_summary: bool = False,
+        question: Optional[str] = None,
+    ) -> str:
+        """Build a single prompt analyzing several documents with the same instructions.
+
+        Args:
+            documents (List[tuple[str, str]]): (content, filename) of each document
+            categorize (bool): Whether to categorize the documents
+            get_title (bool): Whether to extract the titles
+            get_date (bool): Whether to extract the dates
+            get_subject (bool): Whether to extract the subject matters
+            get_summary (bool): Whether to create summaries
+            question (Optional[str]): A specific question to answer about each document
+
+        Returns:
+            str: The complete prompt with the instruction section and all documents
+        """
+        instruction_section = self.build_instruction_section(
+            categorize=categorize,
+            get_title=get_title,
+            get_date=get_date,
+            get_subject=get_subject,
+            get_summary=get_summary,
+            question=question,
+        )
+
+        document_sections = "\n".join(f"""
+        <document id="{idx}">
+        <content>
+        {content}
+        </content>
+        <file_name>{filename}</file_name>
+        </document>
+        """ for idx, (content, filename) in enumerate(documents, 1))
+
+        prompt = f"""
+        {instruction_section}
+
+        There are {len(documents)} documents to analyze. Analyze each document independently.
+        For each document, surround all of its result tags with <result id="N"> tag, where N is the id of the document.
+
+        Documents to analyze:
+        {document_sections}
+        """
+
+        return prompt
+
+    def parse_packed_response(
+        self,
+        response: str,
+        document_count: int,
+        categorize: bool = False,
+        get_title: bool = False,
+        get_date: bool = False,
+        get_subject: bool = False,
+        get_summary: bool = False,
+        question: Optional[str] = None,
+        placeholder: Optional[str] = "N/A",
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Split the response to a packed prompt into the results of each document.
+
+        Args:
+            response (str): The model's response
+            document_count (int): Number of documents in the packed prompt
+            categorize (bool): Whether categorization was requested
+            get_title (bool): Whether title extraction was requested
+            get_date (bool): Whether date extraction was requested
+            get_subject (bool): Whether subject matter extraction was requested
+            get_summary (bool): Whether summarization was requested
+            question (Optional[str]): Whether a specific question was asked
+            placeholder (Optional[str]): Value of requested fields whose tag is missing, None leaves them out
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: Results in document order, None for documents missing from the response
+        """
+        sections = {
+            int(match.group(1)): match.group(2)
+            for match in re.finditer(
+                r'<result id="?(\d+)"?>(.*?)</result>', response, re.DOTALL
+            )
+        }
+
+        return [
+            (
+                self.parse_response(
+                    sections[idx],
+                    categorize=categorize,
+                    get_title=get_title,
+                    get_date=get_date,
+                    get_subject=get_subject,
+                    get_summary=get_summary,
+                    question=question,
+                    placeholder=placeholder,
+                )
+                if idx in sections
+                else None
+            )
+            for idx in range(1, document_count + 1)
+        ]
+
     def parse_response(
         self,
         response: str,
@@ -244,6 +632,7 @@ class TextAnalyzer:
         get_subject: bool = False,
         get_summary: bool = False,
         question: Optional[str] = None,
+        placeholder: Optional[str] = "N/A",
     ) -> Dict[str, Any]:
         """Parse the model's response to extract information from XML tags.
 
@@ -255,6 +644,8 @@ class TextAnalyzer:
             get_subject (bool): Whether subject matter extraction was requested
             get_summary (bool): Whether summarization was requested
             question (Optional[str]): Whether a specific question was asked
+            placeholder (Optional[str]): Value of the requested category, title, date and subject
+                whose tag is missing from the response; None leaves them out
 
         Returns:
             Dict[str, Any]: Dictionary containing the extracted information
@@ -267,29 +658,29 @@ class TextAnalyzer:
             )
             if category_match:
                 results["category"] = category_match.group(1).strip()
-            else:
-                results["category"] = "N/A"
+            elif placeholder is not None:
+                results["category"] = placeholder
 
         if get_title:
             title_match = re.search(r"<title>(.*?)</title>", response, re.DOTALL)
             if title_match:
                 results["title"] = title_match.group(1).strip()
-            else:
-                results["title"] = "N/A"
+            elif placeholder is not None:
+                results["title"] = placeholder
 
         if get_date:
             date_match = re.search(r"<date>(.*?)</date>", response, re.DOTALL)
             if date_match:
                 results["date"] = date_match.group(1).strip()
-            else:
-                results["date"] = "N/A"
+            elif placeholder is not None:
+                results["date"] = placeholder
 
         if get_subject:
             subject_match = re.search(r"<subject>(.*?)</subject>", response, re.DOTALL)
             if subject_match:
                 results["subject"] = subject_match.group(1).strip()
-            else:
-                results["subject"] = "N/A"
+            elif placeholder is not None:
+                results["subject"] = placeholder
 
         if get_summary:
             summary_match = re.search(r"<summary>(.*?)</summary>", response, re.DOTALL)
@@ -309,8 +700,175 @@ class TextAnalyzer:
         return results
 
 
-@tool
-def analyze_document(
+_text_analyzer: Optional[TextAnalyzer] = None
+_text_analyzer_lock = threading.Lock()
+
+
+def get_text_analyzer() -> TextAnalyzer:
+    """Return the process-wide TextAnalyzer, creating it on first use.
+
+    Returns:
+        TextAnalyzer: The shared analyzer, safe to use from concurrent tool calls
+    """
+    global _text_analyzer
+    if _text_analyzer is None:
+        with _text_analyzer_lock:
+            if _text_analyzer is None:
+                _text_analyzer = TextAnalyzer()
+    return _text_analyzer
+
+
+def _get_existing_metadata(
+    state: Optional[Dict[str, Any]], file_path: str
+) -> Dict[str, Any]:
+    """Return a copy of the metadata already stored in the state for a file.
+
+    Args:
+        state (Optional[Dict[str, Any]]): The current state of the model
+        file_path (str): Path to the file, relative to the working directory
+
+    Returns:
+        Dict[str, Any]: The existing metadata, or an empty dict
+    """
+    if not state or "file_metadata" not in state:
+        return {}
+    if file_path not in state["file_metadata"]:
+        return {}
+
+    existing_metadata = state["file_metadata"][file_path].copy()
+    print(f"\nRetrieved from state for {file_path}:")
+    for field, value in existing_metadata.items():
+        if field != "last_analyzed":  # Skip timestamp
+            print(f"  - {field}: {value}")
+    return existing_metadata
+
+
+def _get_store_variants(
+    fields_to_analyze: Dict[str, bool], question: Optional[str]
+) -> Dict[str, str]:
+    """Map the requested fields to their variant in the analysis store.
+
+    Args:
+        fields_to_analyze (Dict[str, bool]): Fields mapped to whether they are requested
+        question (Optional[str]): A specific question to answer about the document
+
+    Returns:
+        Dict[str, str]: Requested field names mapped to their store variant
+    """
+    variants = {
+        field: categories_manager.get_version() if field == "category" else ""
+        for field, requested in fields_to_analyze.items()
+        if requested
+    }
+    if question:
+        variants["question_answer"] = question.strip()
+    return variants
+
+
+@dataclass
+class AnalysisJob:
+    """The pending analysis of a single document."""
+
+    file_path: str
+    results: Dict[str, Any]
+    fields_to_analyze: Dict[str, bool]
+    question: Optional[str] = None
+    content_hash: Optional[str] = None
+    content: Optional[str] = None
+    chunks: Optional[List[str]] = None
+    error: Optional[str] = None
+
+    @property
+    def needs_analysis(self) -> bool:
+        """Whether any requested field still has to be obtained from the model."""
+        return any(self.fields_to_analyze.values()) or self.question is not None
+
+    @property
+    def estimated_tokens(self) -> int:
+        """Rough number of prompt tokens taken by the document content."""
+        return len(self.content or "") // CHARS_PER_TOKEN
+
+    def response_tags(self) -> List[str]:
+        """The XML tags expected in the model response."""
+        return [
+            ANALYSIS_TAGS[argument]
+            for argument, requested in self.analysis_kwargs().items()
+            if requested
+        ]
+
+    def analysis_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments for the TextAnalyzer prompt builders and parsers."""
+        return {
+            "categorize": self.fields_to_analyze.get("category", False),
+            "get_title": self.fields_to_analyze.get("title", False),
+            "get_date": self.fields_to_analyze.get("date", False),
+            "get_subject": self.fields_to_analyze.get("subject", False),
+            "get_summary": self.fields_to_analyze.get("summary", False),
+            "question": self.question,
+        }
+
+
+def _classify_by_keywords(job: AnalysisJob, text: str = "") -> None:
+    """Categorize a document locally if the category values match it confidently.
+
+    Args:
+        job (AnalysisJob): The job, whose category is set and no longer requested from the model on success
+        text (str): Text of the document; if empty, only the file name is matched
+    """
+    if not (KEYWORD_CLASSIFIER_ENABLED and job.fields_to_analyze.get("category")):
+        return
+
+    match = keyword_classifier.classify(os.path.basename(job.file_path), text)
+    if match is None or match.confidence < KEYWORD_CLASSIFIER_MIN_CONFIDENCE:
+        return
+
+    if DEBUG_LLM:
+        print(
+            f"\nCategorized {job.file_path} by keywords as {match.category} "
+            f"(confidence {match.confidence}, matched {', '.join(match.keywords)})"
+        )
+    job.results["category"] = match.category
+    job.fields_to_analyze = {
+        field: requested
+        for field, requested in job.fields_to_analyze.items()
+        if field != "category"
+    }
+
+
+def _extract_fields_locally(job: AnalysisJob, full_path: str, text: str = "") -> None:
+    """Fill the title and date of a document from its properties, name or text.
+
+    Args:
+        job (AnalysisJob): The job, whose fields found are set and no longer requested from the model
+        full_path (str): Path of the document
+        text (str): Text of the document; if empty, only the properties and file name are used
+    """
+    if not LOCAL_METADATA_EXTRACTION:
+        return
+
+    found = extract_fields(
+        full_path,
+        # The properties were already read on the first pass
+        title=job.fields_to_analyze.get("title", False) and not text,
+        date=job.fields_to_analyze.get("date", False),
+        text=text,
+    )
+    if not found:
+        return
+
+    if DEBUG_LLM:
+        print(f"\nExtracted locally for {job.file_path}:")
+        for field, value in found.items():
+            print(f"  - {field}: {value}")
+    job.results.update(found)
+    job.fields_to_analyze = {
+        field: requested
+        for field, requested in job.fields_to_analyze.items()
+        if field not in found
+    }
+
+
+def _prepare_analysis(
     working_directory: str,
     file_path: str,
     categorize: bool = False,
@@ -319,44 +877,39 @@ def analyze_document(
     subject: bool = False,
     summary: bool = False,
     question: Optional[str] = None,
-    state: Annotated[Dict[str, Any], InjectedState] = None,
-) -> Dict[str, Any]:
-    """Analyze a document using Amazon Bedrock's Titan model.
+    existing_metadata: Optional[Dict[str, Any]] = None,
+) -> AnalysisJob:
+    """Collect known results for a document and load its content if the model is needed.
 
     Args:
         working_directory (str): Base directory where operations are performed
         file_path (str): Path to the file to analyze, relative to working_directory
-        categorize (bool): Whether to categorize the document based on available categories
-        title (bool): Whether to extract the title from the document
-        date (bool): Whether to extract the date from the document
-        subject (bool): Whether to extract the subject matter from the document
-        summary (bool): Whether to create a summary of the document
+        categorize (bool): Whether to categorize the document
+        title (bool): Whether to extract the title
+        date (bool): Whether to extract the date
+        subject (bool): Whether to extract the subject matter
+        summary (bool): Whether to create a summary
         question (Optional[str]): A specific question to answer about the document
-        state (Annotated[Dict[str, Any], InjectedState]): The current state of the model, injected by LangGraph
+        existing_metadata (Optional[Dict[str, Any]]): Metadata already known for the file
 
     Returns:
-        Dict[str, Any]: Dictionary containing analysis results and metadata updates
+        AnalysisJob: The job, with its error set if the file cannot be read
     """
-    # Get the file content
-    content_result = get_content(working_directory, file_path)
-
-    # Check if there was an error getting the content
-    if content_result.startswith("Path") or content_result.startswith("Error"):
-        return {"message": content_result, "file_metadata": {}}
-
-    # Extract the actual content from the result
-    content = content_result.replace(f"Content of '{file_path}':\n", "", 1)
+    full_path = _get_full_path(working_directory, file_path)
+    if not os.path.exists(full_path):
+        return AnalysisJob(
+            file_path, {}, {}, error=f"Path '{file_path}' does not exist"
+        )
+    if not os.path.isfile(full_path):
+        return AnalysisJob(file_path, {}, {}, error=f"Path '{file_path}' is not a file")
 
-    # Initialize metadata update with existing data if available
-    from datetime import datetime
+    content_hash = analysis_store.get_content_hash(full_path)
+    short_hash = content_hash[:CONTENT_HASH_LENGTH] if content_hash else None
 
-    existing_metadata = {}
-    if state and "file_metadata" in state and file_path in state["file_metadata"]:
-        existing_metadata = state["file_metadata"][file_path].copy()
-        print(f"\nRetrieved from state for {file_path}:")
-        for field, value in existing_metadata.items():
-            if field != "last_analyzed":  # Skip timestamp
-                print(f"  - {field}: {value}")
+    existing_metadata = existing_metadata or {}
+    # Metadata recorded for an older version of the file is stale
+    if short_hash and existing_metadata.get("content_hash") not in (None, short_hash):
+        existing_metadata = {}
 
     # Determine which fields need to be analyzed
     fields_to_analyze = {
@@ -374,80 +927,700 @@ def analyze_document(
         if requested and field not in existing_metadata
     }
 
-    # Check if we need to analyze anything
-    need_analysis = any(fields_to_analyze.values()) or (question is not None)
-
     # Initialize results with existing metadata
-    results = existing_metadata.copy()
+    job = AnalysisJob(
+        file_path,
+        existing_metadata.copy(),
+        fields_to_analyze,
+        question=question,
+        content_hash=content_hash,
+    )
 
-    if need_analysis:
+    # Reuse results stored for the same content in earlier sessions
+    store_variants = _get_store_variants(fields_to_analyze, question)
+    stored_results = analysis_store.get_results(content_hash, store_variants)
+    if stored_results:
         if DEBUG_LLM:
-            print(f"\nAnalyzing with model for {file_path}:")
-            if fields_to_analyze:
-                print("  Fields to analyze:")
-                for field, requested in fields_to_analyze.items():
-                    if requested:
-                        print(f"    - {field}")
-            if question:
-                print(f"  Question to answer: {question}")
-
-        # Truncate content to a reasonable length for the model
-        truncated_content = truncate_text(content, max_words=2000, max_chars=8000)
-
-        # Get the filename from the path
-        filename = os.path.basename(file_path)
-
-        # Initialize the analyzer
-        analyzer = TextAnalyzer()
-
-        # Build a dynamic prompt based on requested analyses
-        prompt = analyzer.build_dynamic_prompt(
-            truncated_content,
-            filename,
-            categorize=fields_to_analyze.get("category", False),
-            get_title=fields_to_analyze.get("title", False),
-            get_date=fields_to_analyze.get("date", False),
-            get_subject=fields_to_analyze.get("subject", False),
-            get_summary=fields_to_analyze.get("summary", False),
-            question=question,
-        )
+            print(f"\nRetrieved from analysis store for {file_path}:")
+            for field, value in stored_results.items():
+                print(f"  - {field}: {value}")
+        job.results.update(stored_results)
+        job.fields_to_analyze = {
+            field: requested
+            for field, requested in fields_to_analyze.items()
+            if field not in stored_results
+        }
+        if "question_answer" in stored_results:
+            job.question = None
 
-        # Invoke the model with the combined prompt
-        response, total_tokens = analyzer.invoke_model(prompt)
-
-        # Parse the response to extract information from XML tags
-        new_results = analyzer.parse_response(
-            response,
-            categorize=fields_to_analyze.get("category", False),
-            get_title=fields_to_analyze.get("title", False),
-            get_date=fields_to_analyze.get("date", False),
-            get_subject=fields_to_analyze.get("subject", False),
-            get_summary=fields_to_analyze.get("summary", False),
-            question=question,
-        )
+    # The file name and properties can spare loading the content
+    _classify_by_keywords(job)
+    _extract_fields_locally(job, full_path)
+
+    if not job.needs_analysis:
         if DEBUG_LLM:
-            print("\n  Model results:")
-            for field, value in new_results.items():
-                if field != "last_analyzed":  # Skip timestamp
-                    print(f"    - {field}: {value}")
-            print(f"  Total tokens used: {total_tokens}")
+            print(
+                f"\nNo analysis needed for {file_path} - all requested fields exist in state"
+            )
+        return job
 
-        # Update results with new findings
-        results.update(new_results)
+    # Summaries and answers to questions take the whole document into account
+    long_document = LONG_DOCUMENT_MAP_REDUCE and (
+        job.fields_to_analyze.get("summary") or job.question is not None
+    )
+    if long_document:
+        max_chars = LONG_DOCUMENT_TOKEN_BUDGET * CHARS_PER_TOKEN
+        max_words = LONG_DOCUMENT_TOKEN_BUDGET * 3 // 4
+    else:
+        max_chars = ANALYSIS_MAX_CHARS
+        max_words = ANALYSIS_MAX_WORDS
 
-    elif DEBUG_LLM:
-        print(
-            f"\nNo analysis needed for {file_path} - all requested fields exist in state"
+    # Get the file content
+    content_result = get_content(
+        working_directory,
+        file_path,
+        max_words=max_words,
+        max_chars=max_chars,
+    )
+
+    # Check if there was an error getting the content
+    if content_result.startswith("Path") or content_result.startswith("Error"):
+        job.error = content_result
+        return job
+
+    # Extract the actual content from the result and truncate it to a reasonable length
+    content = content_result.replace(f"Content of '{file_path}':\n", "", 1)
+    job.content = truncate_text(
+        content, max_words=ANALYSIS_MAX_WORDS, max_chars=ANALYSIS_MAX_CHARS
+    )
+
+    _classify_by_keywords(job, content)
+    _extract_fields_locally(job, full_path, content)
+    if not job.needs_analysis:
+        job.content = None
+        return job
+
+    # Content that does not fit a single request is analyzed in chunks
+    if (
+        long_document
+        and len(content) > ANALYSIS_MAX_CHARS
+        and len(content.split()) > ANALYSIS_MAX_WORDS
+    ):
+        job.chunks = split_text(
+            content,
+            LONG_DOCUMENT_CHUNK_TOKENS * CHARS_PER_TOKEN,
+            LONG_DOCUMENT_CHUNK_OVERLAP_TOKENS * CHARS_PER_TOKEN,
+        )
+    return job
+
+
+def _finish_analysis(
+    job: AnalysisJob, new_results: Dict[str, Any], total_tokens: int
+) -> Dict[str, Any]:
+    """Merge model results into a job, store them and return the file metadata.
+
+    Args:
+        job (AnalysisJob): The analyzed job
+        new_results (Dict[str, Any]): Results parsed from the model response, without placeholders
+        total_tokens (int): Tokens used by the model call, 0 if it failed
+
+    Returns:
+        Dict[str, Any]: The complete metadata of the file
+    """
+    # Update results with new findings
+    job.results.update(new_results)
+
+    # A failed model call uses no tokens, its results are not kept. Fields
+    # missing from the response stay unset, so they are asked again
+    if total_tokens:
+        analysis_store.save_results(
+            job.content_hash,
+            new_results,
+            _get_store_variants(job.fields_to_analyze, job.question),
         )
 
     # Always update the last_analyzed timestamp
-    results["last_analyzed"] = datetime.now().isoformat()
+    job.results["last_analyzed"] = datetime.now().isoformat()
+    if job.content_hash:
+        job.results["content_hash"] = job.content_hash[:CONTENT_HASH_LENGTH]
+    return job.results
+
+
+def _report_progress(message: str) -> None:
+    """Send a progress message to the graph's custom stream, if the tool runs in a graph."""
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return
+    writer({"progress": message})
+
+
+def _print_streamed_field(tag: str, value: str) -> None:
+    """Print a field of a streamed model response as soon as it is complete."""
+    print(f"  Received {tag}: {value}")
+
+
+def _invoke_analyzer(
+    analyzer: TextAnalyzer, prompt: str, tags: List[str]
+) -> tuple[str, int]:
+    """Invoke the model, streaming the response if enabled.
+
+    Args:
+        analyzer (TextAnalyzer): The analyzer used to call the model
+        prompt (str): The prompt to send to the model
+        tags (List[str]): The XML tags expected in the response
+
+    Returns:
+        tuple[str, int]: The model's response text and total tokens used
+    """
+    if ANALYSIS_STREAMING:
+        return analyzer.invoke_model_stream(
+            prompt, tags, on_field=_print_streamed_field if DEBUG_LLM else None
+        )
+    return analyzer.invoke_model(prompt)
+
+
+def _run_single_analysis(
+    analyzer: TextAnalyzer, job: AnalysisJob
+) -> tuple[Dict[str, Any], int]:
+    """Analyze one prepared document with its own model call.
+
+    Args:
+        analyzer (TextAnalyzer): The analyzer used to call the model
+        job (AnalysisJob): The prepared job
+
+    Returns:
+        tuple[Dict[str, Any], int]: The file metadata and the total tokens used
+    """
+    if not job.needs_analysis:
+        return _finish_analysis(job, {}, 0), 0
+    if job.chunks:
+        return _run_map_reduce_analysis(analyzer, job)
+
+    if DEBUG_LLM:
+        print(f"\nAnalyzing with model for {job.file_path}:")
+        if job.fields_to_analyze:
+            print("  Fields to analyze:")
+            for field, requested in job.fields_to_analyze.items():
+                if requested:
+                    print(f"    - {field}")
+        if job.question:
+            print(f"  Question to answer: {job.question}")
+
+    # Build a dynamic prompt based on requested analyses
+    prompt = analyzer.build_dynamic_prompt(
+        job.content, os.path.basename(job.file_path), **job.analysis_kwargs()
+    )
+
+    # Invoke the model with the combined prompt
+    response, total_tokens = _invoke_analyzer(analyzer, prompt, job.response_tags())
+
+    # Parse the response to extract information from XML tags
+    new_results = analyzer.parse_response(
+        response, **job.analysis_kwargs(), placeholder=None
+    )
+    if DEBUG_LLM:
+        print("\n  Model results:")
+        for field, value in new_results.items():
+            print(f"    - {field}: {value}")
+        print(f"  Total tokens used: {total_tokens}")
+
+    return _finish_analysis(job, new_results, total_tokens), total_tokens
+
+
+def _analyze_chunk(
+    analyzer: TextAnalyzer,
+    chunk: str,
+    label: str,
+    get_summary: bool,
+    question: Optional[str],
+) -> tuple[Dict[str, Any], int]:
+    """Summarize one chunk of a long document or answer the question for it.
+
+    Results are stored under the hash of the chunk text, so chunks that did not
+    change between two versions of a document are not analyzed again.
+
+    Args:
+        analyzer (TextAnalyzer): The analyzer used to call the model
+        chunk (str): The chunk text
+        label (str): Name of the chunk shown to the model
+        get_summary (bool): Whether to summarize the chunk
+        question (Optional[str]): A specific question to answer
+
+    Returns:
+        tuple[Dict[str, Any], int]: The parsed results and the total tokens used
+    """
+    chunk_hash = "chunk:" + hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+    variants = _get_store_variants({"summary": get_summary}, question)
+    results = analysis_store.get_results(chunk_hash, variants)
+    if len(results) == len(variants):
+        return results, 0
+
+    # Only request what the store did not have
+    get_summary = get_summary and "summary" not in results
+    question = None if "question_answer" in results else question
+    prompt = analyzer.build_dynamic_prompt(
+        chunk, label, get_summary=get_summary, question=question
+    )
+    tags = (["summary"] if get_summary else []) + (["question"] if question else [])
+    response, total_tokens = _invoke_analyzer(analyzer, prompt, tags)
+    if not total_tokens:
+        return results, 0
+
+    new_results = analyzer.parse_response(
+        response, get_summary=get_summary, question=question, placeholder=None
+    )
+    analysis_store.save_results(chunk_hash, new_results, variants)
+    results.update(new_results)
+    return results, total_tokens
+
+
+def _run_map_reduce_analysis(
+    analyzer: TextAnalyzer, job: AnalysisJob
+) -> tuple[Dict[str, Any], int]:
+    """Analyze a document too long for a single request.
+
+    The summary and the question are answered for every chunk in parallel and
+    the partial results are merged by one more request. The other fields are
+    extracted from the start of the document, concurrently with the chunks.
+
+    Args:
+        analyzer (TextAnalyzer): The analyzer used to call the model
+        job (AnalysisJob): The prepared job, with its chunks set
+
+    Returns:
+        tuple[Dict[str, Any], int]: The file metadata and the total tokens used
+    """
+    analysis_kwargs = job.analysis_kwargs()
+    get_summary = analysis_kwargs.pop("get_summary")
+    question = analysis_kwargs.pop("question")
+    filename = os.path.basename(job.file_path)
+    if DEBUG_LLM:
+        print(f"\nAnalyzing {job.file_path} in {len(job.chunks)} chunks")
+
+    new_results = {}
+    total_tokens = 0
+    with ThreadPoolExecutor(max_workers=LONG_DOCUMENT_MAX_WORKERS) as executor:
+        head_future = None
+        if any(analysis_kwargs.values()):
+            head_prompt = analyzer.build_dynamic_prompt(
+                job.content, filename, **analysis_kwargs
+            )
+            head_tags = [
+                ANALYSIS_TAGS[argument]
+                for argument, requested in analysis_kwargs.items()
+                if requested
+            ]
+            head_future = executor.submit(
+                _invoke_analyzer, analyzer, head_prompt, head_tags
+            )
+
+        chunk_futures = [
+            executor.submit(
+                _analyze_chunk,
+                analyzer,
+                chunk,
+                f"{filename} (part {idx} of {len(job.chunks)})",
+                get_summary,
+                question,
+            )
+            for idx, chunk in enumerate(job.chunks, 1)
+        ]
+        partial_results = []
+        for future in chunk_futures:
+            results, tokens = future.result()
+            partial_results.append(results)
+            total_tokens += tokens
+
+        if head_future:
+            response, tokens = head_future.result()
+            # Placeholder results of a failed request are not kept
+            if tokens:
+                new_results.update(
+                    analyzer.parse_response(
+                        response, **analysis_kwargs, placeholder=None
+                    )
+                )
+                total_tokens += tokens
+
+    partial_results = [results for results in partial_results if results]
+    if partial_results:
+        reduce_prompt = analyzer.build_reduce_prompt(
+            filename, partial_results, get_summary=get_summary, question=question
+        )
+        reduce_tags = (["summary"] if get_summary else []) + (
+            ["question"] if question else []
+        )
+        response, tokens = _invoke_analyzer(analyzer, reduce_prompt, reduce_tags)
+        if tokens:
+            new_results.update(
+                analyzer.parse_response(
+                    response, get_summary=get_summary, question=question
+                )
+            )
+            total_tokens += tokens
+
+    if DEBUG_LLM:
+        print("\n  Model results:")
+        for field, value in new_results.items():
+            print(f"    - {field}: {value}")
+        print(f"  Total tokens used: {total_tokens}")
+
+    return _finish_analysis(job, new_results, total_tokens), total_tokens
+
+
+def _run_packed_analysis(
+    analyzer: TextAnalyzer, jobs: List[AnalysisJob]
+) -> tuple[Dict[str, Dict[str, Any]], int]:
+    """Analyze several small documents requesting the same fields in one model call.
+
+    Documents missing from the response are analyzed individually.
+
+    Args:
+        analyzer (TextAnalyzer): The analyzer used to call the model
+        jobs (List[AnalysisJob]): Prepared jobs sharing the same requested fields
+
+    Returns:
+        tuple[Dict[str, Dict[str, Any]], int]: Metadata per file path and the total tokens used
+    """
+    analysis_kwargs = jobs[0].analysis_kwargs()
+    prompt = analyzer.build_packed_prompt(
+        [(job.content, os.path.basename(job.file_path)) for job in jobs],
+        **analysis_kwargs,
+    )
+    response, total_tokens = analyzer.invoke_model(prompt)
+    packed_results = analyzer.parse_packed_response(
+        response, len(jobs), **analysis_kwargs, placeholder=None
+    )
+    if DEBUG_LLM:
+        print(f"\nPacked analysis of {len(jobs)} documents:")
+        print(f"  Total tokens used: {total_tokens}")
 
-    # Create the metadata update
-    metadata_update = {file_path: results}
+    metadata = {}
+    for job, new_results in zip(jobs, packed_results):
+        if new_results is None or not total_tokens:
+            metadata[job.file_path], tokens = _run_single_analysis(analyzer, job)
+            total_tokens += tokens
+        else:
+            metadata[job.file_path] = _finish_analysis(job, new_results, total_tokens)
+    return metadata, total_tokens
+
+
+def _run_batch(
+    analyzer: TextAnalyzer, batch: List[AnalysisJob]
+) -> tuple[Dict[str, Dict[str, Any]], int]:
+    """Analyze a batch of prepared jobs, packing them if there is more than one.
+
+    Args:
+        analyzer (TextAnalyzer): The analyzer used to call the model
+        batch (List[AnalysisJob]): Jobs produced by _pack_jobs
+
+    Returns:
+        tuple[Dict[str, Dict[str, Any]], int]: Metadata per file path and the total tokens used
+    """
+    if len(batch) > 1:
+        return _run_packed_analysis(analyzer, batch)
+
+    results, total_tokens = _run_single_analysis(analyzer, batch[0])
+    return {batch[0].file_path: results}, total_tokens
+
+
+def _pack_jobs(jobs: List[AnalysisJob]) -> List[List[AnalysisJob]]:
+    """Group prepared jobs into batches that share one model call.
+
+    Small documents requesting the same fields are packed together until the
+    prompt token budget or the document limit is reached; all other jobs get
+    a batch of their own.
+
+    Args:
+        jobs (List[AnalysisJob]): Prepared jobs that need the model
+
+    Returns:
+        List[List[AnalysisJob]]: The batches
+    """
+    batches = []
+    groups: Dict[tuple, List[AnalysisJob]] = {}
+    for job in jobs:
+        if job.chunks or job.estimated_tokens > PACKED_DOCUMENT_MAX_TOKENS:
+            batches.append([job])
+        else:
+            signature = tuple(sorted(job.analysis_kwargs().items(), key=str))
+            groups.setdefault(signature, []).append(job)
+
+    for group in groups.values():
+        batch, batch_tokens = [], 0
+        for job in group:
+            if batch and (
+                batch_tokens + job.estimated_tokens > PACKED_PROMPT_TOKEN_BUDGET
+                or len(batch) >= PACKED_MAX_DOCUMENTS
+            ):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(job)
+            batch_tokens += job.estimated_tokens
+        if batch:
+            batches.append(batch)
+    return batches
+
+
+def _analyze_file(
+    analyzer: TextAnalyzer,
+    working_directory: str,
+    file_path: str,
+    categorize: bool = False,
+    title: bool = False,
+    date: bool = False,
+    subject: bool = False,
+    summary: bool = False,
+    question: Optional[str] = None,
+    existing_metadata: Optional[Dict[str, Any]] = None,
+) -> tuple[Optional[Dict[str, Any]], int, str]:
+    """Analyze a single document, skipping fields that are already known.
+
+    Args:
+        analyzer (TextAnalyzer): The analyzer used to call the model
+        working_directory (str): Base directory where operations are performed
+        file_path (str): Path to the file to analyze, relative to working_directory
+        categorize (bool): Whether to categorize the document
+        title (bool): Whether to extract the title
+        date (bool): Whether to extract the date
+        subject (bool): Whether to extract the subject matter
+        summary (bool): Whether to create a summary
+        question (Optional[str]): A specific question to answer about the document
+        existing_metadata (Optional[Dict[str, Any]]): Metadata already known for the file
+
+    Returns:
+        tuple[Optional[Dict[str, Any]], int, str]: The file metadata (None on error),
+            the total tokens used and a status message
+    """
+    job = _prepare_analysis(
+        working_directory,
+        file_path,
+        categorize=categorize,
+        title=title,
+        date=date,
+        subject=subject,
+        summary=summary,
+        question=question,
+        existing_metadata=existing_metadata,
+    )
+    if job.error:
+        return None, 0, job.error
+
+    results, total_tokens = _run_single_analysis(analyzer, job)
+    return results, total_tokens, "Document analyzed successfully"
+
+
+def _resolve_document_paths(
+    working_directory: str, path: Optional[str], recursive: bool
+) -> List[str]:
+    """Find the files to analyze for a folder path or a glob pattern.
+
+    Args:
+        working_directory (str): Base directory where operations are performed
+        path (Optional[str]): Folder or glob pattern, relative to working_directory
+        recursive (bool): Whether to include files in subfolders of a folder
+
+    Returns:
+        List[str]: Sorted file paths, relative to working_directory
+    """
+    full_path = _get_full_path(working_directory, path)
+
+    if os.path.isdir(full_path):
+        file_paths = []
+        for root, dirs, files in os.walk(full_path):
+            # Deleted items waiting in the trash are not documents of the workspace
+            dirs[:] = [name for name in dirs if name != TRASH_DIRECTORY_NAME]
+            for name in files:
+                file_paths.append(
+                    os.path.relpath(os.path.join(root, name), working_directory)
+                )
+            if not recursive:
+                break
+    elif path:
+        file_paths = [
+            match
+            for match in glob.glob(path, root_dir=working_directory, recursive=True)
+            if os.path.isfile(os.path.join(working_directory, match))
+        ]
+    else:
+        file_paths = []
+
+    return sorted(file_paths)
+
+
+@tool
+def analyze_document(
+    working_directory: str,
+    file_path: str,
+    categorize: bool = False,
+    title: bool = False,
+    date: bool = False,
+    subject: bool = False,
+    summary: bool = False,
+    question: Optional[str] = None,
+    state: Annotated[Dict[str, Any], InjectedState] = None,
+) -> Dict[str, Any]:
+    """Analyze a document using Amazon Bedrock's Titan model.
+
+    Args:
+        working_directory (str): Base directory where operations are performed
+        file_path (str): Path to the file to analyze, relative to working_directory
+        categorize (bool): Whether to categorize the document based on available categories
+        title (bool): Whether to extract the title from the document
+        date (bool): Whether to extract the date from the document
+        subject (bool): Whether to extract the subject matter from the document
+        summary (bool): Whether to create a summary of the document
+        question (Optional[str]): A specific question to answer about the document
+        state (Annotated[Dict[str, Any], InjectedState]): The current state of the model, injected by LangGraph
+
+    Returns:
+        Dict[str, Any]: Dictionary containing analysis results and metadata updates
+    """
+    results, total_tokens, message = _analyze_file(
+        get_text_analyzer(),
+        working_directory,
+        file_path,
+        categorize=categorize,
+        title=title,
+        date=date,
+        subject=subject,
+        summary=summary,
+        question=question,
+        existing_metadata=_get_existing_metadata(state, file_path),
+    )
+
+    if results is None:
+        return {"message": message, "file_metadata": {}}
 
     return {
-        "message": "Document analyzed successfully",
+        "message": message,
+        "file_metadata": {file_path: results},
+        "total_tokens": total_tokens,
+    }
+
+
+@tool
+def analyze_documents(
+    working_directory: str,
+    path: Optional[str] = None,
+    recursive: bool = False,
+    categorize: bool = False,
+    title: bool = False,
+    date: bool = False,
+    subject: bool = False,
+    summary: bool = False,
+    question: Optional[str] = None,
+    state: Annotated[Dict[str, Any], InjectedState] = None,
+) -> Dict[str, Any]:
+    """Analyze all documents in a folder, or matching a glob pattern, in a single call.
+
+    Prefer this over calling analyze_document repeatedly when several files need the same analysis.
+
+    Args:
+        working_directory (str): Base directory where operations are performed
+        path (Optional[str]): Folder or glob pattern (e.g. "contracts/**/*.pdf"), relative to working_directory. If None, uses working_directory
+        recursive (bool): If path is a folder, whether to include files in its subfolders
+        categorize (bool): Whether to categorize the documents based on available categories
+        title (bool): Whether to extract the title from the documents
+        date (bool): Whether to extract the date from the documents
+        subject (bool): Whether to extract the subject matter from the documents
+        summary (bool): Whether to create a summary of the documents
+        question (Optional[str]): A specific question to answer about each document
+        state (Annotated[Dict[str, Any], InjectedState]): The current state of the model, injected by LangGraph
+
+    Returns:
+        Dict[str, Any]: Dictionary containing analysis results and metadata updates for all files
+    """
+    # Glob patterns are checked by matching them below
+    if (not path or not glob.has_magic(path)) and not os.path.exists(
+        _get_full_path(working_directory, path)
+    ):
+        return {
+            "message": f"Path '{path if path else working_directory}' does not exist",
+            "file_metadata": {},
+        }
+
+    file_paths = _resolve_document_paths(working_directory, path, recursive)
+    if not file_paths:
+        return {
+            "message": f"No files found in '{path if path else 'working directory'}'",
+            "file_metadata": {},
+        }
+
+    skipped = len(file_paths) - BULK_ANALYSIS_MAX_FILES
+    file_paths = file_paths[:BULK_ANALYSIS_MAX_FILES]
+
+    analyzer = get_text_analyzer()
+    metadata_update = {}
+    errors = {}
+    total_tokens = 0
+
+    with ThreadPoolExecutor(
+        max_workers=min(ANALYSIS_MAX_WORKERS, len(file_paths))
+    ) as executor:
+        # Look up known results and extract the content of every file
+        futures = {
+            executor.submit(
+                _prepare_analysis,
+                working_directory,
+                file_path,
+                categorize=categorize,
+                title=title,
+                date=date,
+                subject=subject,
+                summary=summary,
+                question=question,
+                existing_metadata=_get_existing_metadata(state, file_path),
+            ): file_path
+            for file_path in file_paths
+        }
+
+        pending_jobs = []
+        for future in as_completed(futures):
+            file_path = futures[future]
+            try:
+                job = future.result()
+            except Exception as e:
+                errors[file_path] = f"Error analyzing document: {str(e)}"
+                continue
+
+            if job.error:
+                errors[file_path] = job.error
+            elif job.needs_analysis:
+                pending_jobs.append(job)
+            else:
+                metadata_update[file_path] = _finish_analysis(job, {}, 0)
+
+        # Send the remaining documents to the model, packing small ones together
+        futures = {
+            executor.submit(_run_batch, analyzer, batch): batch
+            for batch in _pack_jobs(sorted(pending_jobs, key=lambda job: job.file_path))
+        }
+
+        for future in as_completed(futures):
+            try:
+                batch_metadata, tokens = future.result()
+            except Exception as e:
+                for job in futures[future]:
+                    errors[job.file_path] = f"Error analyzing document: {str(e)}"
+                continue
+
+            total_tokens += tokens
+            metadata_update.update(batch_metadata)
+            _report_progress(
+                f"Analyzed {len(metadata_update)} of {len(file_paths)} documents"
+            )
+
+    message = f"Analyzed {len(metadata_update)} of {len(file_paths)} documents"
+    if skipped > 0:
+        message += f" ({skipped} more files were not analyzed, narrow down the path)"
+
+    result = {
+        "message": message,
         "file_metadata": metadata_update,
         "total_tokens": total_tokens,
     }
+    if errors:
+        result["errors"] = errors
+    return result
@@ -0,0 +1,381 @@
+import asyncio
+import glob
+import json
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import get_config_list
+from langgraph.prebuilt import ToolNode
+from langgraph.types import Command
+from langgraph.store.base import BaseStore
+
+from categories import categories_file
+from config import TOOL_SCHEDULER_MAX_WORKERS
+from folder_operations import _get_full_path, _is_same_or_inside
+from trash import trash
+
+
+@dataclass(frozen=True)
+class ToolAccess:
+    """Full paths a tool call reads and writes.
+
+    A path covers everything below it. An exclusive access conflicts with every
+    other one; it is used for tool calls whose paths cannot be determined.
+    """
+
+    reads: Tuple[str, ...] = ()
+    writes: Tuple[str, ...] = ()
+    exclusive: bool = False
+
+    def conflicts_with(self, other: "ToolAccess") -> bool:
+        """Whether the two calls must not run at the same time.
+
+        Reads never conflict with reads; a write conflicts with any read or
+        write of the same path, of a folder containing it or of a path inside it.
+        """
+        if self.exclusive or other.exclusive:
+            return True
+        return _overlaps(self.writes, other.reads + other.writes) or _overlaps(
+            other.writes, self.reads
+        )
+
+
+EXCLUSIVE_ACCESS = ToolAccess(exclusive=True)
+
+
+def _overlaps(paths: Tuple[str, ...], others: Tuple[str, ...]) -> bool:
+    return any(
+        _is_same_or_inside(path, other) or _is_same_or_inside(other, path)
+        for path in paths
+        for other in others
+    )
+
+
+def _full(working_directory: str, path: Optional[str] = None) -> str:
+    return os.path.normpath(os.path.abspath(_get_full_path(working_directory, path)))
+
+
+def _pattern_root(working_directory: str, path: Optional[str]) -> str:
+    """Return the folder containing every file a folder path or glob pattern can match."""
+    if not path or not glob.has_magic(path):
+        return _full(working_directory, path)
+    parts = []
+    for part in os.path.normpath(path).split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return _full(working_directory, os.path.join(*parts) if parts else None)
+
+
+def _batch_access(
+    working_directory: str, operations: List[Dict[str, Any]]
+) -> ToolAccess:
+    reads, writes = [], []
+    for operation in operations:
+        kind_name = operation.get("operation")
+        source_path = operation.get("source_path")
+        dest_path = operation.get("dest_path")
+        if kind_name == "copy":
+            reads.append(_full(working_directory, source_path))
+            writes.append(_full(working_directory, dest_path))
+        elif kind_name == "move":
+            writes += [
+                _full(working_directory, source_path),
+                _full(working_directory, dest_path),
+            ]
+        elif kind_name == "rename":
+            source = _full(working_directory, source_path)
+            writes += [
+                source,
+                os.path.join(os.path.dirname(source), operation.get("new_name", "")),
+            ]
+        elif kind_name == "create":
+            writes.append(_full(working_directory, dest_path))
+        elif kind_name == "delete":
+            writes.append(_full(working_directory, source_path))
+    return ToolAccess(reads=tuple(reads), writes=tuple(writes))
+
+
+def get_tool_access(tool_call: Dict[str, Any]) -> ToolAccess:
+    """Determine the paths read and written by a tool call from its arguments.
+
+    The categories are stored in a file, so the category tools and the
+    categorizing analysis tools are scheduled as accesses to that file.
+
+    Args:
+        tool_call (Dict[str, Any]): The tool call, with its name and arguments
+
+    Returns:
+        ToolAccess: The paths read and written, or an exclusive access for unknown tools
+    """
+    name = tool_call.get("name")
+    args = tool_call.get("args") or {}
+
+    if name in ("list_categories", "get_category"):
+        return ToolAccess(reads=(categories_file,))
+    if name in (
+        "add_category",
+        "remove_category",
+        "update_category",
+        "clear_categories",
+    ):
+        return ToolAccess(writes=(categories_file,))
+
+    working_directory = args.get("working_directory")
+    if not isinstance(working_directory, str):
+        return EXCLUSIVE_ACCESS
+
+    try:
+        if name in ("list_items", "search_documents"):
+            return ToolAccess(reads=(_full(working_directory, args.get("path")),))
+        if name == "trash_status":
+            return ToolAccess(reads=(trash.get_trash_dir(),))
+        if name == "change_directory":
+            return ToolAccess(reads=(_full(working_directory, args.get("new_path")),))
+        if name in ("analyze_document", "analyze_documents"):
+            if name == "analyze_document":
+                reads = (_full(working_directory, args["file_path"]),)
+            else:
+                reads = (_pattern_root(working_directory, args.get("path")),)
+            if args.get("categorize"):
+                reads += (categories_file,)
+            return ToolAccess(reads=reads)
+        if name == "create_item":
+            parent = _full(working_directory, args.get("parent_path"))
+            return ToolAccess(writes=(os.path.join(parent, args["name"]),))
+        if name == "copy_item":
+            return ToolAccess(
+                reads=(_full(working_directory, args["source_path"]),),
+                writes=(_full(working_directory, args["dest_path"]),),
+            )
+        if name == "move_item":
+            return ToolAccess(
+                writes=(
+                    _full(working_directory, args["source_path"]),
+                    _full(working_directory, args["dest_path"]),
+                )
+            )
+        if name == "delete_item":
+            return ToolAccess(writes=(_full(working_directory, args["path"]),))
+        if name == "batch_operations":
+            return _batch_access(working_directory, args.get("operations") or [])
+    except (KeyError, TypeError, AttributeError):
+        # Malformed arguments: the tool reports the error, nothing may overlap it
+        pass
+    return EXCLUSIVE_ACCESS
+
+
+class PathLockManager:
+    """Per-path reader/writer locks covering the subtree below each path.
+
+    Any number of calls may read a path at once, while a call writing a path
+    excludes every other call reading or writing it, a folder above it or a
+    path below it.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._held: List[ToolAccess] = []
+
+    def _is_free(self, access: ToolAccess) -> bool:
+        return not any(access.conflicts_with(held) for held in self._held)
+
+    @contextmanager
+    def hold(self, access: ToolAccess) -> Iterator[None]:
+        """Block until the paths of the access are free and hold them meanwhile.
+
+        Args:
+            access (ToolAccess): The paths to lock
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._is_free(access))
+            self._held.append(access)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._held.remove(access)
+                self._condition.notify_all()
+
+
+def is_failed_result(message: Union[ToolMessage, Command]) -> bool:
+    """Whether a tool call failed.
+
+    Besides raised errors, a file operation that reports no affected files
+    did not do anything, as in batch_operations. A tool returning a Command
+    updates the state itself and is considered successful.
+
+    Args:
+        message (Union[ToolMessage, Command]): The result of the tool call
+
+    Returns:
+        bool: True if the call failed
+    """
+    if isinstance(message, Command):
+        return False
+    if getattr(message, "status", None) == "error":
+        return True
+    try:
+        content = json.loads(message.content)
+    except (TypeError, ValueError):
+        return False
+    return isinstance(content, dict) and content.get("affected_files") == []
+
+
+# Shared by all schedulers, so concurrent runs of the graph do not race either
+path_locks = PathLockManager()
+
+
+class ToolScheduler(ToolNode):
+    """Tool node running the tool calls of a message concurrently where it is safe.
+
+    Each call depends on the earlier calls of the message that conflict with
+    it, so conflicting calls run in the order the model gave them while the
+    others, such as reads or writes to separate folders, run in parallel. The
+    paths are also locked while a call runs, against other runs of the graph.
+    The results are returned in the order of the tool calls.
+    """
+
+    def __init__(
+        self,
+        tools: list,
+        max_workers: int = TOOL_SCHEDULER_MAX_WORKERS,
+        lock_manager: Optional[PathLockManager] = None,
+        **kwargs,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            tools (list): The tools that can be called
+            max_workers (int): Maximum number of tool calls running at once
+            lock_manager (Optional[PathLockManager]): Locks shared with other schedulers, defaults to path_locks
+        """
+        super().__init__(tools, **kwargs)
+        self.max_workers = max_workers
+        self.lock_manager = lock_manager or path_locks
+
+    def _run_locked(
+        self, access: ToolAccess, call: Dict[str, Any], input_type: str, config
+    ):
+        with self.lock_manager.hold(access):
+            return self._run_one(call, input_type, config)
+
+    def _schedule(
+        self,
+        tool_calls: List[Dict[str, Any]],
+        input_type: str,
+        config: RunnableConfig,
+        requires: Optional[List[Set[int]]] = None,
+    ) -> List[Union[ToolMessage, Command]]:
+        """Run the tool calls, each after the earlier calls it conflicts with.
+
+        Args:
+            tool_calls (List[Dict[str, Any]]): The tool calls to run
+            input_type (str): The kind of input the calls were parsed from
+            config (RunnableConfig): The config of the node
+            requires (Optional[List[Set[int]]]): For each call, the indexes of earlier calls
+                that must succeed for it to run; the others are answered with an error
+
+        Returns:
+            List[Union[ToolMessage, Command]]: The results, in the order of the tool calls
+        """
+        config_list = get_config_list(config, len(tool_calls))
+        accesses = [get_tool_access(call) for call in tool_calls]
+        requires = requires or [set() for _ in tool_calls]
+        waiting_on = [
+            {
+                earlier
+                for earlier in range(idx)
+                if accesses[idx].conflicts_with(accesses[earlier])
+            }
+            | requires[idx]
+            for idx in range(len(tool_calls))
+        ]
+
+        outputs: List[Any] = [None] * len(tool_calls)
+        failed = set()
+        pending = set(range(len(tool_calls)))
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                for idx in sorted(pending):
+                    if waiting_on[idx]:
+                        continue
+                    pending.discard(idx)
+                    failed_requirement = min(requires[idx] & failed, default=None)
+                    if failed_requirement is None:
+                        future = executor.submit(
+                            self._run_locked,
+                            accesses[idx],
+                            tool_calls[idx],
+                            input_type,
+                            config_list[idx],
+                        )
+                        running[future] = idx
+                        continue
+                    outputs[idx] = ToolMessage(
+                        content=f"Error: not run because tool call {tool_calls[failed_requirement]['id']} failed",
+                        name=tool_calls[idx]["name"],
+                        tool_call_id=tool_calls[idx]["id"],
+                        status="error",
+                    )
+                    failed.add(idx)
+                    for waiting in waiting_on:
+                        waiting.discard(idx)
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx = running.pop(future)
+                    outputs[idx] = future.result()
+                    if is_failed_result(outputs[idx]):
+                        failed.add(idx)
+                    for waiting in waiting_on:
+                        waiting.discard(idx)
+        return outputs
+
+    def _combine_outputs(
+        self, outputs: List[Union[ToolMessage, Command]], input_type: str
+    ) -> Any:
+        """Return the results as the node's update, like ToolNode does.
+
+        Args:
+            outputs (List[Union[ToolMessage, Command]]): The results, in the order of the tool calls
+            input_type (str): The kind of input the calls were parsed from
+
+        Returns:
+            Any: The messages, or a list of updates if a tool returned a Command
+        """
+        if not any(isinstance(output, Command) for output in outputs):
+            return outputs if input_type == "list" else {self.messages_key: outputs}
+
+        # LangGraph applies a list of Commands and plain updates in order
+        combined = []
+        for output in outputs:
+            if isinstance(output, Command):
+                combined.append(output)
+            elif input_type == "list":
+                combined.append([output])
+            else:
+                combined.append({self.messages_key: [output]})
+        return combined
+
+    def _func(
+        self, input: Any, config: RunnableConfig, *, store: Optional[BaseStore]
+    ) -> Any:
+        tool_calls, input_type = self._parse_input(input, store)
+        outputs = self._schedule(tool_calls, input_type, config)
+        return self._combine_outputs(outputs, input_type)
+
+    async def _afunc(
+        self, input: Any, config: RunnableConfig, *, store: Optional[BaseStore]
+    ) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, lambda: self._func(input, config, store=store)
+        )
@@ -1,7 +1,7 @@
 import os
+from typing import Iterable, Iterator, Optional
 from langchain_core.messages import ToolMessage
 from langchain_core.runnables import RunnableLambda
-from langgraph.prebuilt import ToolNode
 from langchain_core.messages.ai import AIMessage
 import json
 
@@ -11,6 +11,9 @@ from folder_operations import (
     list_items,
     copy_item,
     move_item,
+    batch_operations,
+    trash_status,
+    search_documents,
     change_directory,
 )
 
@@ -25,13 +28,19 @@ from category_tools import (
 
 from text_analysis import (
     analyze_document,
+    analyze_documents,
 )
 
 from action_types import ActionInfo, ActionType
+from directory_index import directory_index
+from config import DIRECTORY_TREE_MAX_ENTRIES, TRASH_DIRECTORY_NAME
+from tool_scheduler import ToolScheduler
 
 # Safe tools are read-only operations that don't modify the file system
 safe_tools = [
     list_items,
+    trash_status,
+    search_documents,
     change_directory,
     add_category,
     remove_category,
@@ -40,6 +49,7 @@ safe_tools = [
     list_categories,
     get_category,
     analyze_document,
+    analyze_documents,
 ]
 
 # Sensitive tools are operations that modify the file system
@@ -48,6 +58,7 @@ sensitive_tools = [
     move_item,
     copy_item,
     create_item,
+    batch_operations,
 ]
 
 # Create a set of sensitive tool names for quick lookup
@@ -58,36 +69,144 @@ class DisplayMessage(AIMessage):
     pass
 
 
-def get_directory_tree(working_directory: str, affected_files: list[str]) -> str:
-    """Display the directory structure in a tree-like format with icons.
+class AffectedPaths:
+    """Set of affected paths answering membership and ancestor queries in O(1).
+
+    Besides the normalized paths themselves, every folder above an affected
+    path is recorded, so a tree renderer can tell whether a subtree contains
+    changes without scanning the list of affected files.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        """Initialize the set.
+
+        Args:
+            paths (Iterable[str]): Full paths of the affected files and folders
+        """
+        self.paths = {os.path.normpath(os.path.abspath(path)) for path in paths}
+        self.ancestors = set()
+        for path in self.paths:
+            parent = os.path.dirname(path)
+            while parent not in self.ancestors and parent != os.path.dirname(parent):
+                self.ancestors.add(parent)
+                parent = os.path.dirname(parent)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.paths
+
+    def has_changes_below(self, path: str) -> bool:
+        """Whether an affected path lies inside the given folder."""
+        return path in self.ancestors
+
+
+def iter_directory_tree(
+    working_directory: str,
+    affected_files: Iterable[str],
+    recursive: bool = False,
+    max_depth: Optional[int] = None,
+    max_entries: Optional[int] = DIRECTORY_TREE_MAX_ENTRIES,
+    collapse_unchanged: bool = True,
+) -> Iterator[str]:
+    """Lazily render the directory structure in a tree-like format with icons.
 
     Args:
         working_directory (str): The directory to display
-        affected_files (list[str]): List of full file paths that should be marked with an asterisk
-
-    Returns:
-        str: Tree-like structure of the directory with icons
+        affected_files (Iterable[str]): Full paths that should be marked with an asterisk
+        recursive (bool): Whether to display subfolders as well
+        max_depth (Optional[int]): Number of folder levels to display when recursive, None for all
+        max_entries (Optional[int]): Maximum number of entries displayed per folder, None for all
+        collapse_unchanged (bool): Whether to skip the content of subfolders without affected paths
+
+    Yields:
+        str: The lines of the tree
     """
-    try:
-        tree_output = []
-
-        # Get all items in directory using scandir
-        with os.scandir(working_directory) as entries:
-            entries = list(entries)
+    affected = (
+        affected_files
+        if isinstance(affected_files, AffectedPaths)
+        else AffectedPaths(affected_files)
+    )
 
-            for idx, entry in enumerate(entries):
-                is_last = idx == len(entries) - 1
-                prefix = "└── " if is_last else "├── "
+    def render(directory: str, indent: str, depth: int) -> Iterator[str]:
+        entries = [
+            entry
+            for entry in directory_index.scandir(directory)
+            if entry.name != TRASH_DIRECTORY_NAME
+        ]
 
-                icon = "📁 " if entry.is_dir() else "📄 "
+        # Affected entries are always shown, the others fill the remaining room
+        if max_entries is not None and len(entries) > max_entries:
+            changed = {
+                entry.path
+                for entry in entries
+                if entry.path in affected or affected.has_changes_below(entry.path)
+            }
+            room = max(max_entries - len(changed), 0)
+            shown = []
+            for entry in entries:
+                if entry.path in changed:
+                    shown.append(entry)
+                elif room:
+                    shown.append(entry)
+                    room -= 1
+        else:
+            shown = entries
+        hidden = len(entries) - len(shown)
+
+        for idx, entry in enumerate(shown):
+            is_last = idx == len(shown) - 1 and not hidden
+            prefix = "└── " if is_last else "├── "
+            icon = "📁 " if entry.is_dir else "📄 "
+            affected_marker = " *" if entry.path in affected else ""
+            yield f"{indent}{prefix}{icon}{entry.name}{affected_marker}"
+
+            if (
+                recursive
+                and entry.is_dir
+                and not entry.is_link
+                and (max_depth is None or depth < max_depth)
+                and (not collapse_unchanged or affected.has_changes_below(entry.path))
+            ):
+                yield from render(
+                    entry.path, indent + ("    " if is_last else "│   "), depth + 1
+                )
+
+        if hidden:
+            yield f"{indent}└── … {hidden} more"
+
+    yield from render(os.path.normpath(os.path.abspath(working_directory)), "", 1)
+
+
+def get_directory_tree(
+    working_directory: str,
+    affected_files: Iterable[str],
+    recursive: bool = False,
+    max_depth: Optional[int] = None,
+    max_entries: Optional[int] = DIRECTORY_TREE_MAX_ENTRIES,
+) -> str:
+    """Display the directory structure in a tree-like format with icons.
 
-                # Check if the full path of the entry is in affected_files
-                full_path = os.path.join(working_directory, entry.name)
-                affected_marker = " *" if full_path in affected_files else ""
+    In recursive mode only subfolders containing affected paths are expanded.
 
-                tree_output.append(f"{prefix}{icon}{entry.name}{affected_marker}")
+    Args:
+        working_directory (str): The directory to display
+        affected_files (Iterable[str]): Full paths that should be marked with an asterisk
+        recursive (bool): Whether to display subfolders as well
+        max_depth (Optional[int]): Number of folder levels to display when recursive, None for all
+        max_entries (Optional[int]): Maximum number of entries displayed per folder, None for all
 
-        return "\n".join(tree_output)
+    Returns:
+        str: Tree-like structure of the directory with icons
+    """
+    try:
+        return "\n".join(
+            iter_directory_tree(
+                working_directory,
+                affected_files,
+                recursive=recursive,
+                max_depth=max_depth,
+                max_entries=max_entries,
+            )
+        )
     except Exception as e:
         return f"Error displaying directory tree: {str(e)}"
 
@@ -178,6 +297,14 @@ def extract_tool_result(state) -> dict:
                 result["actions"] = []
             result["actions"].append(ActionInfo.from_dict(content_dict["action"]))
 
+        # Handle the list of actions from batch operations
+        if content_dict.get("actions"):
+            if "actions" not in result:
+                result["actions"] = []
+            result["actions"].extend(
+                ActionInfo.from_dict(action) for action in content_dict["actions"]
+            )
+
     return result
 
 
@@ -211,17 +338,23 @@ def update_working_directory(state) -> dict:
     return {}
 
 
-def create_tool_node_with_fallback(tools: list) -> dict:
+def create_tool_node_with_fallback(
+    tools: list, node_class: type = ToolScheduler
+) -> dict:
     """
     Function to create a tool node with fallback error handling.
 
+    The node schedules the tool calls of a message by the paths they touch,
+    running non-conflicting calls concurrently.
+
     Args:
         tools (list): A list of tools to be included in the node.
+        node_class (type): The ToolScheduler class to create the node with.
 
     Returns:
         dict: A tool node that uses fallback behavior in case of errors.
     """
-    return ToolNode(tools).with_fallbacks(
+    return node_class(tools).with_fallbacks(
         [RunnableLambda(handle_tool_error)],
         exception_key="error",
     )
@@ -0,0 +1,263 @@
+import os
+import json
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from config import (
+    WORKING_DIRECTORY,
+    TRASH_DIRECTORY_NAME,
+    TRASH_RETENTION_SECONDS,
+    TRASH_REAPER_INTERVAL,
+    TRASH_REAPER_MAX_WORKERS,
+)
+
+
+@dataclass
+class TrashEntry:
+    """An item waiting in the trash to be removed."""
+
+    entry_id: str
+    original_path: str
+    trash_path: str
+    item_type: str
+    trashed_at: float
+    state: str = "pending"
+
+
+class Trash:
+    """Workspace trash for fast deletes.
+
+    Deleting moves the item into a trash folder at the root of the workspace,
+    which is a single rename on the same filesystem. The root is fixed, so the
+    trash stays in one place when the working directory changes. A background
+    reaper removes the items once their retention time has passed, deleting
+    the files of each item concurrently, so a deletion can be undone cheaply
+    until it is reaped.
+    """
+
+    def __init__(
+        self,
+        root: str = WORKING_DIRECTORY,
+        retention_seconds: float = TRASH_RETENTION_SECONDS,
+        reaper_interval: float = TRASH_REAPER_INTERVAL,
+        max_workers: int = TRASH_REAPER_MAX_WORKERS,
+    ):
+        """Initialize the trash.
+
+        Args:
+            root (str): Root folder of the workspace, holding the trash folder
+            retention_seconds (float): Seconds an item stays restorable before it is removed
+            reaper_interval (float): Seconds between two runs of the reaper
+            max_workers (int): Number of files removed concurrently
+        """
+        self.root = root
+        self.retention_seconds = retention_seconds
+        self.reaper_interval = reaper_interval
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._reaping: set = set()
+        self._reaper: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+
+    def get_trash_dir(self) -> str:
+        """Return the trash folder of the workspace."""
+        return os.path.join(os.path.abspath(self.root), TRASH_DIRECTORY_NAME)
+
+    def is_in_trash(self, path: str) -> bool:
+        """Whether a path lies inside a trash folder."""
+        return TRASH_DIRECTORY_NAME in os.path.normpath(path).split(os.sep)
+
+    def move_to_trash(self, full_path: str) -> TrashEntry:
+        """Move an item into the trash.
+
+        Args:
+            full_path (str): Path of the file or folder to delete
+
+        Returns:
+            TrashEntry: The trashed item
+
+        Raises:
+            OSError: If the item cannot be renamed into the trash, e.g. across filesystems
+        """
+        trash_dir = self.get_trash_dir()
+        entry_id = f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+        entry_dir = os.path.join(trash_dir, entry_id)
+        created_trash_dir = not os.path.isdir(trash_dir)
+        os.makedirs(entry_dir)
+
+        entry = TrashEntry(
+            entry_id=entry_id,
+            original_path=os.path.abspath(full_path),
+            trash_path=os.path.join(entry_dir, os.path.basename(full_path)),
+            item_type="folder" if os.path.isdir(full_path) else "file",
+            trashed_at=time.time(),
+        )
+        try:
+            os.rename(full_path, entry.trash_path)
+        except OSError:
+            os.rmdir(entry_dir)
+            if created_trash_dir:
+                try:
+                    os.rmdir(trash_dir)
+                except OSError:
+                    # Used by another item meanwhile
+                    pass
+            raise
+
+        with open(entry_dir + ".json", "w") as f:
+            json.dump(
+                {
+                    "original_path": entry.original_path,
+                    "item_type": entry.item_type,
+                    "trashed_at": entry.trashed_at,
+                },
+                f,
+            )
+        self._start_reaper()
+        return entry
+
+    def restore(self, entry: TrashEntry) -> bool:
+        """Move a trashed item back to its original location.
+
+        Args:
+            entry (TrashEntry): The item to restore
+
+        Returns:
+            bool: Whether the item was restored
+        """
+        with self._lock:
+            if entry.trash_path in self._reaping:
+                return False
+        if not os.path.exists(entry.trash_path) or os.path.exists(entry.original_path):
+            return False
+
+        os.rename(entry.trash_path, entry.original_path)
+        entry_dir = os.path.dirname(entry.trash_path)
+        os.rmdir(entry_dir)
+        if os.path.exists(entry_dir + ".json"):
+            os.remove(entry_dir + ".json")
+        return True
+
+    def list_entries(self) -> List[TrashEntry]:
+        """List the items in the trash, oldest first.
+
+        Returns:
+            List[TrashEntry]: The items not removed yet
+        """
+        trash_dir = self.get_trash_dir()
+        if not os.path.isdir(trash_dir):
+            return []
+        self._start_reaper()
+        return self._read_entries(trash_dir)
+
+    def _read_entries(self, trash_dir: str) -> List[TrashEntry]:
+        """Read the items of a trash folder from disk."""
+        entries = []
+        with os.scandir(trash_dir) as items:
+            for item in items:
+                if not item.is_dir(follow_symlinks=False):
+                    continue
+                metadata: Dict = {}
+                try:
+                    with open(item.path + ".json") as f:
+                        metadata = json.load(f)
+                except (OSError, ValueError):
+                    pass
+                names = os.listdir(item.path)
+                trash_path = os.path.join(item.path, names[0]) if names else item.path
+                with self._lock:
+                    state = "reaping" if item.path in self._reaping else "pending"
+                entries.append(
+                    TrashEntry(
+                        entry_id=item.name,
+                        original_path=metadata.get("original_path", ""),
+                        trash_path=trash_path,
+                        item_type=metadata.get("item_type", "unknown"),
+                        trashed_at=metadata.get(
+                            "trashed_at", item.stat(follow_symlinks=False).st_mtime
+                        ),
+                        state=state,
+                    )
+                )
+        return sorted(entries, key=lambda entry: entry.trashed_at)
+
+    def reap(self, force: bool = False) -> int:
+        """Remove the items of the trash whose retention time has passed.
+
+        Args:
+            force (bool): Whether to remove all items regardless of their age
+
+        Returns:
+            int: The number of items removed
+        """
+        trash_dir = self.get_trash_dir()
+        if not os.path.isdir(trash_dir):
+            return 0
+
+        removed = 0
+        now = time.time()
+        for entry in self._read_entries(trash_dir):
+            if not force and entry.trashed_at + self.retention_seconds > now:
+                continue
+            entry_dir = os.path.join(trash_dir, entry.entry_id)
+            with self._lock:
+                self._reaping.add(entry_dir)
+                self._reaping.add(entry.trash_path)
+            try:
+                self._remove_tree(entry_dir)
+                if os.path.exists(entry_dir + ".json"):
+                    os.remove(entry_dir + ".json")
+                removed += 1
+            except OSError:
+                # Retried on the next run
+                pass
+            finally:
+                with self._lock:
+                    self._reaping.discard(entry_dir)
+                    self._reaping.discard(entry.trash_path)
+        return removed
+
+    def _remove_tree(self, path: str) -> None:
+        """Remove a folder tree, deleting its files concurrently."""
+        files = []
+        folders = []
+        for root, dirs, names in os.walk(path, topdown=False):
+            files.extend(os.path.join(root, name) for name in names)
+            for name in dirs:
+                folder = os.path.join(root, name)
+                # Symbolic links to folders are removed, not followed
+                (files if os.path.islink(folder) else folders).append(folder)
+        folders.append(path)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for _ in executor.map(os.unlink, files):
+                pass
+        for folder in folders:
+            os.rmdir(folder)
+
+    def _start_reaper(self) -> None:
+        """Start the background reaper if needed."""
+        with self._lock:
+            if self._reaper and self._reaper.is_alive():
+                return
+            self._reaper = threading.Thread(
+                target=self._reap_forever, name="trash-reaper", daemon=True
+            )
+            self._reaper.start()
+
+    def _reap_forever(self) -> None:
+        """Body of the reaper thread."""
+        while True:
+            try:
+                self.reap()
+            except OSError:
+                pass
+            self._wake.wait(self.reaper_interval)
+            self._wake.clear()
+
+
+trash = Trash()
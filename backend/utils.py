@@ -1,4 +1,5 @@
-from typing import Optional
+import hashlib
+from typing import Iterable, List, Optional, TextIO
 
 MAX_WORDS = 500
 MAX_CHARS = 10000
@@ -31,3 +32,124 @@ def truncate_text(
     result = word_slice if len(word_slice) > len(char_slice) else char_slice
 
     return result
+
+
+def truncate_chunks(
+    chunks: Iterable[str],
+    max_words: Optional[int] = MAX_WORDS,
+    max_chars: Optional[int] = MAX_CHARS,
+) -> str:
+    """
+    Consume text chunks only until the truncation budget is met.
+
+    The result is identical to calling truncate_text on the concatenated chunks,
+    but the remaining chunks are never produced, so lazy producers can stop early.
+
+    Args:
+        chunks (Iterable[str]): Consecutive pieces of the text
+        max_words (int, optional): Maximum number of words to include
+        max_chars (int, optional): Maximum number of characters to include
+
+    Returns:
+        str: The truncated text
+    """
+    # truncate_text keeps the whole text unless both budgets are set
+    if not max_words or not max_chars:
+        return truncate_text("".join(chunks), max_words, max_chars)
+
+    consumed = []
+    total_chars = 0
+    word_count = 0
+    ends_in_word = False
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        consumed.append(chunk)
+        total_chars += len(chunk)
+
+        chunk_words = len(chunk.split())
+        # A word split across two chunks must only be counted once
+        if chunk_words and ends_in_word and not chunk[0].isspace():
+            chunk_words -= 1
+        word_count += chunk_words
+        ends_in_word = not chunk[-1].isspace()
+
+        # Once a word beyond the budget has started, the first max_words words are complete
+        if total_chars >= max_chars and word_count > max_words:
+            break
+
+    return truncate_text("".join(consumed), max_words, max_chars)
+
+
+def read_truncated_text(
+    file: TextIO,
+    max_words: Optional[int] = MAX_WORDS,
+    max_chars: Optional[int] = MAX_CHARS,
+    chunk_size: int = 64 * 1024,
+) -> str:
+    """
+    Read a text stream in chunks, stopping once the truncation budget is met.
+
+    Args:
+        file (TextIO): Text stream to read from
+        max_words (int, optional): Maximum number of words to include
+        max_chars (int, optional): Maximum number of characters to include
+        chunk_size (int, optional): Number of characters to read at a time
+
+    Returns:
+        str: The truncated text
+    """
+    return truncate_chunks(
+        iter(lambda: file.read(chunk_size), ""), max_words, max_chars
+    )
+
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 hash of a file's content without loading it into memory.
+
+    Args:
+        file_path (str): Path to the file to hash
+        chunk_size (int, optional): Number of bytes to read at a time
+
+    Returns:
+        str: Hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def split_text(text: str, chunk_chars: int, overlap_chars: int = 0) -> List[str]:
+    """
+    Split text into chunks of at most chunk_chars characters.
+
+    Chunks end at the last paragraph, line, sentence or word boundary in their
+    second half where possible, and consecutive chunks overlap by overlap_chars.
+
+    Args:
+        text (str): The input text to split
+        chunk_chars (int): Maximum number of characters per chunk
+        overlap_chars (int, optional): Number of characters repeated at the start of the next chunk
+
+    Returns:
+        List[str]: The chunks, in order
+    """
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_chars, len(text))
+        if end < len(text):
+            for separator in ("\n\n", "\n", ". ", " "):
+                boundary = text.rfind(separator, start + chunk_chars // 2, end)
+                if boundary != -1:
+                    end = boundary + len(separator)
+                    break
+        chunks.append(text[start:end])
+        if end >= len(text):
+            break
+        start = max(end - overlap_chars, start + 1)
+    return chunks